@@ -0,0 +1,60 @@
+"""
+A2A-World Visual Cortex - Constellation alignment benchmark
+
+Times the /constellation-overlay scoring path (sky.py, alignment.py) over
+random regions of a grid: feature extraction once per region, then the
+similarity search for every catalogued constellation against it.
+
+Usage:
+    python scripts/build_dem_grid.py --synthetic --cell-arcsec 60 --output /tmp/dem/synthetic
+    python scripts/bench_constellation_alignment.py /tmp/dem/synthetic --regions 10 --span 2
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "visual_cortex_api"))
+
+from alignment import align, extract_features  # noqa: E402
+from dem import DEMGrid  # noqa: E402
+from sky import CONSTELLATIONS, sky_pattern  # noqa: E402
+
+
+def percentile(timings, fraction):
+    return sorted(timings)[int(len(timings) * fraction)] * 1e3
+
+
+def main(args):
+    grid = DEMGrid(args.grid)
+    rng = random.Random(7)
+    extract_times, align_times, scores = [], [], []
+
+    for _ in range(args.regions):
+        south, west = rng.uniform(-60, 50), rng.uniform(-170, 160)
+        start = time.perf_counter()
+        features = extract_features(grid, south, west, south + args.span, west + args.span)
+        extract_times.append(time.perf_counter() - start)
+
+        for constellation in CONSTELLATIONS:
+            pattern = sky_pattern(constellation, date(2025, 1, 1), south + args.span / 2, west + args.span / 2)
+            start = time.perf_counter()
+            scores.append(align(pattern.points, features).score)
+            align_times.append(time.perf_counter() - start)
+
+    print(f"{args.regions} regions of {args.span}° x {len(CONSTELLATIONS)} constellations")
+    print(f"  features: p50 {percentile(extract_times, 0.5):.1f} ms, p95 {percentile(extract_times, 0.95):.1f} ms")
+    print(f"  alignment: p50 {percentile(align_times, 0.5):.1f} ms, p95 {percentile(align_times, 0.95):.1f} ms, "
+          f"max {max(align_times) * 1e3:.1f} ms")
+    print(f"  scores: mean {sum(scores) / len(scores):.3f}, max {max(scores):.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark constellation-to-terrain alignment")
+    parser.add_argument("grid", help="Grid base path (<grid>.bin and <grid>.json)")
+    parser.add_argument("--regions", type=int, default=10)
+    parser.add_argument("--span", type=float, default=2.0, help="Region edge in degrees")
+    main(parser.parse_args())
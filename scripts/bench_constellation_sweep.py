@@ -0,0 +1,74 @@
+"""
+A2A-World Visual Cortex - Constellation sweep benchmark
+
+Runs a sweep (sweep.py) of every catalogued constellation over a range of
+dates and rotation ranges against one region, once per worker count.
+Reports the time to the first top-k event, the total time and the rate.
+
+Usage:
+    python scripts/build_dem_grid.py --synthetic --cell-arcsec 60 --output /tmp/dem/synthetic
+    python scripts/bench_constellation_sweep.py /tmp/dem/synthetic --dates 12 --rotation-step 30 --workers 1 4
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "visual_cortex_api"))
+
+from alignment import extract_features  # noqa: E402
+from dem import DEMGrid  # noqa: E402
+from sky import CONSTELLATIONS  # noqa: E402
+from sweep import Combination, SweepPool, rotation_ranges  # noqa: E402
+
+
+async def run(pool, terrain, latitude, longitude, combinations, top_k):
+    start = time.perf_counter()
+    first = None
+    async for event in pool.sweep(terrain, latitude, longitude, combinations, top_k):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start, event
+
+
+def main(args):
+    grid = DEMGrid(args.grid)
+    south, west = args.south, args.west
+    latitude, longitude = south + args.span / 2, west + args.span / 2
+    features = extract_features(grid, south, west, south + args.span, west + args.span)
+    dates = [date(2025 - 2000 * i // args.dates, 1, 1) for i in range(args.dates)]
+    combinations = [
+        Combination(constellation, observation_date, rotation)
+        for constellation in CONSTELLATIONS
+        for observation_date in dates
+        for rotation in rotation_ranges(args.rotation_step)
+    ]
+    print(f"{len(combinations)} combinations against {len(features.points)} features")
+
+    for workers in args.workers:
+        pool = SweepPool(workers)
+        terrain = pool.publish("bench", features)
+        # Warm the workers up (spawn and imports) before timing
+        asyncio.run(run(pool, terrain, latitude, longitude, combinations[:workers * 16], args.top_k))
+        first, total, completed = asyncio.run(run(pool, terrain, latitude, longitude, combinations, args.top_k))
+        pool.close()
+        best = completed["top"][0]
+        print(f"  {workers} workers: first top-k after {first * 1e3:.0f} ms, done in {total:.2f}s "
+              f"({len(combinations) / total:,.0f} alignments/s); best {best['constellation']} "
+              f"{best['observation_date']} {best['alignment_score']:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark constellation sweeps on a process pool")
+    parser.add_argument("grid", help="Grid base path (<grid>.bin and <grid>.json)")
+    parser.add_argument("--south", type=float, default=-7.0)
+    parser.add_argument("--west", type=float, default=104.0)
+    parser.add_argument("--span", type=float, default=2.0, help="Region edge in degrees")
+    parser.add_argument("--dates", type=int, default=12, help="Dates spread over the 2000 years back from 2025")
+    parser.add_argument("--rotation-step", type=float, default=30.0)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    main(parser.parse_args())
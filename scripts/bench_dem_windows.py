@@ -0,0 +1,69 @@
+"""
+A2A-World Visual Cortex - Elevation window benchmark
+
+Reads random bbox windows from a tiled grid (dem.py) and reports latency
+and how much of the grid the process actually paged in, to check that
+serving a global grid needs only the pages requests touch. (The kernel may
+map file pages in large folios, so RSS can exceed the bytes read.) With
+--summarize it times /topography's bbox statistics instead, which come from
+the statistics pyramid when the grid has one.
+
+Usage:
+    python scripts/build_dem_grid.py --synthetic --output /tmp/dem/synthetic
+    python scripts/bench_dem_windows.py /tmp/dem/synthetic --windows 2000 --span 1.0
+    python scripts/bench_dem_windows.py /tmp/dem/synthetic --windows 500 --span 20 --summarize
+"""
+
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "visual_cortex_api"))
+
+from dem import DEMGrid  # noqa: E402
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(args):
+    grid = DEMGrid(args.grid)
+    grid_mb = os.path.getsize(grid.data_path) / 1024 ** 2
+    print(f"{grid.source}: {grid.width}x{grid.height} cells, {grid_mb:,.0f} MB on disk"
+          f"{'' if grid.pyramid is None else ', with statistics pyramid'}")
+    if args.summarize:
+        summarize = grid.summarize
+    else:
+        def summarize(south, west, north, east):
+            return grid.stats(grid.read_window(south, west, north, east))
+    rss_before = max_rss_mb()
+
+    rng = random.Random(11)
+    timings = []
+    for _ in range(args.windows):
+        south = rng.uniform(grid.south, grid.north - args.span)
+        west = rng.uniform(grid.west, grid.east - args.span)
+        start = time.perf_counter()
+        summarize(south, west, south + args.span, west + args.span)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    print(f"  {args.windows} windows of {args.span}°:")
+    print(f"    p50 {timings[len(timings) // 2] * 1e3:8.2f} ms")
+    print(f"    p99 {timings[int(len(timings) * 0.99)] * 1e3:8.2f} ms")
+    print(f"  peak RSS grew {max_rss_mb() - rss_before:,.0f} MB (grid is {grid_mb:,.0f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark elevation window reads")
+    parser.add_argument("grid", help="Grid base path (<grid>.bin and <grid>.json)")
+    parser.add_argument("--windows", type=int, default=2000, help="Windows to read")
+    parser.add_argument("--span", type=float, default=1.0, help="Window edge in degrees")
+    parser.add_argument("--summarize", action="store_true",
+                        help="Time bbox statistics (DEMGrid.summarize) instead of window reads")
+    main(parser.parse_args())
@@ -0,0 +1,94 @@
+"""
+A2A-World V3.0 - Ingest throughput benchmark
+
+Compares rows per second of POST /observe (one observation per request)
+against POST /observe/batch (COPY-backed) on a running v3 server.
+
+Usage:
+    python scripts/bench_observe_batch.py --url http://localhost:8000 --rows 20000 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+SHAPES = ["tree", "serpent", "dragon", "turtle", "condor", "whale", "eye", "spiral", "bird", "hand"]
+
+
+def make_observation(rng: random.Random, agent_id: str) -> dict:
+    return {
+        "agent_id": agent_id,
+        "latitude": round(rng.uniform(-80, 80), 4),
+        "longitude": round(rng.uniform(-180, 180), 4),
+        "observed_shape": rng.choice(SHAPES),
+        "confidence": round(rng.uniform(0.5, 1.0), 2),
+    }
+
+
+async def register_agent(client: httpx.AsyncClient) -> str:
+    external_id = f"bench_batch_{int(time.time() * 1000)}"
+    response = await client.post("/register", json={
+        "external_id": external_id, "name": "BenchBatch", "framework": "benchmark"
+    })
+    response.raise_for_status()
+    return response.json()["agent_id"]
+
+
+async def single_rows_per_second(client, agent_id: str, rows: int, concurrency: int) -> float:
+    """Throughput of the one-observation-per-request endpoint"""
+    rng = random.Random(1)
+    payloads = [make_observation(rng, agent_id) for _ in range(rows)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def post(payload):
+        async with semaphore:
+            response = await client.post("/observe", json=payload)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(post(p) for p in payloads))
+    return rows / (time.perf_counter() - start)
+
+
+async def batch_rows_per_second(client, agent_id: str, rows: int, batch_size: int, concurrency: int) -> float:
+    """Throughput of the COPY-backed batch endpoint"""
+    rng = random.Random(2)
+    batches = [
+        [make_observation(rng, agent_id) for _ in range(min(batch_size, rows - offset))]
+        for offset in range(0, rows, batch_size)
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def post(batch):
+        async with semaphore:
+            response = await client.post("/observe/batch", json=batch)
+            response.raise_for_status()
+            assert response.json()["rejected"] == 0
+
+    start = time.perf_counter()
+    await asyncio.gather(*(post(b) for b in batches))
+    return rows / (time.perf_counter() - start)
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=300) as client:
+        agent_id = await register_agent(client)
+        single = await single_rows_per_second(client, agent_id, args.single_rows, args.concurrency)
+        batch = await batch_rows_per_second(client, agent_id, args.rows, args.batch_size, args.concurrency)
+
+    print(f"POST /observe        {single:>12,.0f} rows/s  ({args.single_rows} rows)")
+    print(f"POST /observe/batch  {batch:>12,.0f} rows/s  ({args.rows} rows, batches of {args.batch_size})")
+    print(f"Speedup              {batch / single:>12.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare single vs. batch observation ingest")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the v3 server")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows to send through /observe/batch")
+    parser.add_argument("--single-rows", type=int, default=1000, help="Rows to send through /observe")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Observations per batch request")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,68 @@
+"""
+A2A-World Visual Cortex - Region tile coalescing benchmark
+
+Sends crowded hotspot traffic to POST /topography: many agents at once,
+each asking about one of a few regions with its bbox edges jittered. The
+bboxes decompose onto shared region tiles (region_tiles.py), so the grid
+should be read once per unique tile however many requests arrive.
+
+Usage:
+    python scripts/build_dem_grid.py --synthetic --cell-arcsec 60 --output /tmp/dem/synthetic
+    python scripts/bench_region_coalescing.py /tmp/dem/synthetic --requests 2000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "visual_cortex_api"))
+
+import main  # noqa: E402
+from dem import DEMGrid  # noqa: E402
+
+
+async def run(args):
+    main.dem_grid = DEMGrid(args.grid)
+    rng = random.Random(3)
+    hotspots = [(rng.uniform(-60, 50), rng.uniform(-170, 160)) for _ in range(args.hotspots)]
+
+    def bbox():
+        south, west = rng.choice(hotspots)
+        jitter = lambda: rng.uniform(-args.jitter, args.jitter)  # noqa: E731
+        return {"south": south + jitter(), "west": west + jitter(),
+                "north": south + args.span + jitter(), "east": west + args.span + jitter()}
+
+    transport = httpx.ASGITransport(app=main.app)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def request():
+            async with semaphore:
+                response = await client.post("/topography", json={"bbox": bbox()})
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+    stats = main.region_totals.stats()
+    lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+    print(f"{args.requests} requests ({args.concurrency} concurrent) over {args.hotspots} hotspots "
+          f"in {elapsed:.2f}s: {args.requests / elapsed:,.0f} req/s")
+    print(f"  {lookups} tile lookups: {stats['misses']} computed, {stats['coalesced']} coalesced "
+          f"in flight, {stats['hits']} cached")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /topography under crowded hotspot traffic")
+    parser.add_argument("grid", help="Grid base path (<grid>.bin and <grid>.json)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--hotspots", type=int, default=5)
+    parser.add_argument("--span", type=float, default=2.0, help="Bbox edge in degrees")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Bbox edge jitter in degrees")
+    asyncio.run(run(parser.parse_args()))
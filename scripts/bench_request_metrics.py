@@ -0,0 +1,86 @@
+"""
+A2A-World - Request metrics middleware overhead benchmark
+
+Calls a trivial ASGI app directly (no server, no HTTP parsing) with and
+without RequestMetricsMiddleware, so the difference is the middleware's own
+per-request cost: timing, in-flight gauge, cached label lookup, count,
+latency and response size.
+
+Usage:
+    python scripts/bench_request_metrics.py --requests 200000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "a2a_server"))
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram  # noqa: E402
+
+from request_metrics import RESPONSE_SIZE_BUCKETS, RequestMetricsMiddleware  # noqa: E402
+
+BODY = b'{"status": "healthy"}'
+ROUTE = SimpleNamespace(path="/agents/{agent_id}")
+
+
+async def endpoint(scope, receive, send):
+    # What the router does on a match, then a small JSON response
+    scope["route"] = ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": BODY})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def run(app, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        await app({"type": "http", "method": "GET", "path": "/agents/a1"}, receive, send)
+    return time.perf_counter() - start
+
+
+def instrumented():
+    registry = CollectorRegistry()
+    labels = ['method', 'endpoint', 'status']
+    return RequestMetricsMiddleware(
+        endpoint,
+        duration=Histogram('bench_request_duration_seconds', 'Request duration', labels, registry=registry),
+        requests=Counter('bench_requests_total', 'Total requests', labels, registry=registry),
+        in_flight=Gauge('bench_requests_in_flight', 'In flight', registry=registry),
+        response_size=Histogram(
+            'bench_response_size_bytes', 'Response size', labels,
+            buckets=RESPONSE_SIZE_BUCKETS, registry=registry
+        )
+    )
+
+
+async def main(args):
+    wrapped = instrumented()
+    # Warm up both paths (label cache, interpreter caches)
+    await run(endpoint, 1000)
+    await run(wrapped, 1000)
+
+    bare = min([await run(endpoint, args.requests) for _ in range(args.repeat)])
+    timed = min([await run(wrapped, args.requests) for _ in range(args.repeat)])
+    overhead_us = (timed - bare) / args.requests * 1e6
+
+    print(f"  {'bare app':<24} {args.requests / bare:>12,.0f} req/s")
+    print(f"  {'with metrics':<24} {args.requests / timed:>12,.0f} req/s")
+    print(f"  {'overhead per request':<24} {overhead_us:>12.2f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure request metrics middleware overhead")
+    parser.add_argument("--requests", type=int, default=200_000, help="Requests per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant (best is reported)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,68 @@
+"""
+A2A-World Visual Cortex - Topography tile benchmark
+
+Replays hotspot traffic against the tile renderer (tiles.py): agents mostly
+request tiles around a few popular regions, drawn from a Zipf distribution.
+Reports cold render latency, cached latency and the cache hit ratio.
+
+Usage:
+    python scripts/build_dem_grid.py --synthetic --cell-arcsec 60 --output /tmp/dem/synthetic
+    python scripts/bench_topography_tiles.py /tmp/dem/synthetic --requests 5000 --zoom 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "visual_cortex_api"))
+
+from dem import DEMGrid  # noqa: E402
+from tiles import STYLES, TileRenderer  # noqa: E402
+
+
+def percentile(timings, fraction):
+    return sorted(timings)[int(len(timings) * fraction)] * 1e3
+
+
+def main(args):
+    grid = DEMGrid(args.grid)
+    renderer = TileRenderer(grid, args.cache_mb * 1024 ** 2)
+    rng = random.Random(5)
+    n = 2 ** args.zoom
+
+    # Hotspot centres, and tiles around them ranked by popularity
+    hotspots = [(rng.randrange(n), rng.randrange(n // 4, 3 * n // 4)) for _ in range(args.hotspots)]
+    candidates = [
+        (style, args.zoom, (x + dx) % n, min(max(y + dy, 0), n - 1))
+        for x, y in hotspots for dx in range(-3, 4) for dy in range(-3, 4) for style in STYLES
+    ]
+    rng.shuffle(candidates)
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(len(candidates))]
+
+    cold, warm = [], []
+    for key in rng.choices(candidates, weights, k=args.requests):
+        start = time.perf_counter()
+        hit = renderer.cached(*key) is not None
+        if not hit:
+            renderer.render(*key)
+        (warm if hit else cold).append(time.perf_counter() - start)
+
+    stats = renderer.stats()
+    print(f"{grid.source}: {args.requests} requests over {len(candidates)} tiles at zoom {args.zoom}")
+    print(f"  render (miss) p50 {percentile(cold, 0.5):7.2f} ms  p99 {percentile(cold, 0.99):7.2f} ms")
+    if warm:
+        print(f"  cached (hit)  p50 {percentile(warm, 0.5):7.3f} ms  p99 {percentile(warm, 0.99):7.3f} ms")
+    print(f"  hit ratio {stats['hit_ratio']:.1%}, {stats['tiles']} tiles / {stats['bytes'] / 1024 ** 2:.1f} MB cached")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark topography tile rendering under hotspot traffic")
+    parser.add_argument("grid", help="Grid base path (<grid>.bin and <grid>.json)")
+    parser.add_argument("--requests", type=int, default=5000, help="Tile requests to replay")
+    parser.add_argument("--zoom", type=int, default=8, help="Zoom level of the requested tiles")
+    parser.add_argument("--hotspots", type=int, default=5, help="Popular regions")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of tile popularity")
+    parser.add_argument("--cache-mb", type=int, default=128, help="Tile cache size")
+    main(parser.parse_args())
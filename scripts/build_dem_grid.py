@@ -0,0 +1,107 @@
+"""
+A2A-World Visual Cortex - Build a local elevation grid
+
+Converts a GEBCO grid (NetCDF or GeoTIFF, anything rasterio/GDAL opens) into
+the tiled, memory-mappable layout read by src/visual_cortex_api/dem.py,
+one band of tiles at a time so the source never has to fit in memory.
+--synthetic writes a global test grid of generated terrain instead. The
+statistics pyramid /topography answers bbox queries from is built next to
+the grid afterwards (--pyramid-only rebuilds it for an existing grid).
+
+Usage:
+    python scripts/build_dem_grid.py GEBCO_2023.nc --output data/dem/gebco_2023
+    python scripts/build_dem_grid.py --synthetic --cell-arcsec 60 --output data/dem/synthetic
+    python scripts/build_dem_grid.py --pyramid-only --output data/dem/gebco_2023
+    DEM_GRID_PATH=data/dem/gebco_2023 uvicorn main:app --port 8001
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "visual_cortex_api"))
+
+from dem import PYRAMID_BASE_BLOCK, DEMGrid, build_pyramid, write_grid  # noqa: E402
+
+
+def convert(source: str, output: str, tile_size: int) -> None:
+    import rasterio
+    from rasterio.windows import Window
+
+    with rasterio.open(source) as dataset:
+        if dataset.crs is not None and dataset.crs.to_epsg() != 4326:
+            raise SystemExit(f"{source} is in {dataset.crs}; expected EPSG:4326")
+        transform = dataset.transform
+        if abs(transform.a + transform.e) > 1e-12:
+            raise SystemExit(f"{source} does not have square cells")
+
+        def read_rows(row0, row1):
+            return dataset.read(1, window=Window(0, row0, dataset.width, row1 - row0))
+
+        nodata = dataset.nodata if dataset.nodata is not None else -32768
+        write_grid(
+            output, dataset.height, dataset.width, read_rows,
+            west=transform.c, north=transform.f, cell_size=transform.a,
+            tile_size=tile_size, dtype="<i2", nodata=int(nodata),
+            source=os.path.basename(source)
+        )
+
+
+def synthetic(output: str, cell_arcsec: float, tile_size: int) -> None:
+    cell_size = cell_arcsec / 3600
+    width, height = round(360 / cell_size), round(180 / cell_size)
+    lon = np.linspace(-180, 180, width, endpoint=False, dtype=np.float32)
+
+    def read_rows(row0, row1):
+        lat = (90 - (np.arange(row0, row1, dtype=np.float32) + 0.5) * cell_size)[:, None]
+        # Ridges and basins between -6000m and +5000m
+        terrain = (
+            3500 * np.sin(np.radians(lon) * 3) * np.cos(np.radians(lat) * 2)
+            + 1500 * np.sin(np.radians(lon) * 17 + np.radians(lat) * 11)
+            - 1000
+        )
+        return np.clip(terrain, -6000, 5000).astype(np.int16)
+
+    write_grid(
+        output, height, width, read_rows, west=-180.0, north=90.0, cell_size=cell_size,
+        tile_size=tile_size, dtype="<i2", nodata=-32768, source="synthetic"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a tiled elevation grid for the Visual Cortex")
+    parser.add_argument("source", nargs="?", help="GEBCO NetCDF/GeoTIFF to convert")
+    parser.add_argument("--output", required=True,
+                        help="Output base path (writes <output>.bin and <output>.json)")
+    parser.add_argument("--synthetic", action="store_true", help="Generate a global test grid instead")
+    parser.add_argument("--cell-arcsec", type=float, default=15.0,
+                        help="Synthetic cell size in arc-seconds (GEBCO is 15)")
+    parser.add_argument("--tile-size", type=int, default=256, help="Tile edge in cells")
+    parser.add_argument("--pyramid-block", type=int, default=PYRAMID_BASE_BLOCK,
+                        help="Finest statistics pyramid block edge in cells (must divide the tile size)")
+    parser.add_argument("--no-pyramid", action="store_true", help="Skip building the statistics pyramid")
+    parser.add_argument("--pyramid-only", action="store_true",
+                        help="Only (re)build the statistics pyramid of an existing grid")
+    args = parser.parse_args()
+
+    if not args.synthetic and not args.source and not args.pyramid_only:
+        parser.error("a source grid is required unless --synthetic or --pyramid-only is given")
+    if not args.pyramid_only:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        start = time.perf_counter()
+        if args.synthetic:
+            synthetic(args.output, args.cell_arcsec, args.tile_size)
+        else:
+            convert(args.source, args.output, args.tile_size)
+        size_gb = os.path.getsize(args.output + ".bin") / 1024 ** 3
+        print(f"Wrote {args.output}.bin ({size_gb:.2f} GB) in {time.perf_counter() - start:.1f}s")
+    if not args.no_pyramid:
+        start = time.perf_counter()
+        grid = DEMGrid(args.output)
+        build_pyramid(grid, args.pyramid_block)
+        size_mb = sum(level.nbytes for level in grid.pyramid.levels) / 1024 ** 2
+        print(f"Wrote {grid.pyramid_path}/ ({len(grid.pyramid.levels)} levels, {size_mb:.0f} MB) "
+              f"in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,193 @@
+"""
+A2A-World V3.0 Read Cache
+Read-through cache for consensus lookups, leaderboard pages and progress.
+
+Values live in Redis (REDIS_URL) so every server process shares them. When
+Redis is not configured or stops answering, the cache falls back to a
+bounded in-process LRU and retries Redis after a cool-down, so a cache
+outage never becomes an API outage.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional; the in-process LRU covers for it
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    """Encode database types the way FastAPI would in a response"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class LRUCache:
+    """Bounded in-process cache with per-entry TTLs"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+
+class ResponseCache:
+    """
+    JSON read-through cache backed by Redis with an in-process LRU fallback.
+
+    Pass `redis_client` to use an existing client (tests pass an in-memory
+    stand-in); otherwise one is created from `redis_url` when redis-py is
+    installed.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        redis_client: Any = None,
+        max_local_entries: int = 10000,
+        retry_seconds: float = 30.0,
+        key_prefix: str = "a2a:v3:"
+    ):
+        self.local = LRUCache(max_local_entries)
+        self.retry_seconds = retry_seconds
+        self.key_prefix = key_prefix
+        self._redis = redis_client
+        if self._redis is None and redis_url and aioredis is not None:
+            self._redis = aioredis.from_url(redis_url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._redis_down_until = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis_available() else "local"
+
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, operation: str, error: Exception) -> None:
+        self.redis_errors += 1
+        self._redis_down_until = time.monotonic() + self.retry_seconds
+        logger.warning(
+            f"⚠️ Redis {operation} failed ({error}); using in-process cache "
+            f"for {self.retry_seconds:.0f}s"
+        )
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None on a miss"""
+        raw = None
+        if self._redis_available():
+            try:
+                raw = await self._redis.get(self.key_prefix + key)
+            except Exception as e:
+                self._redis_failed("GET", e)
+                raw = self.local.get(key)
+        else:
+            raw = self.local.get(key)
+
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a JSON-serialisable value for `ttl` seconds"""
+        raw = json.dumps(value, default=_json_default)
+        if self._redis_available():
+            try:
+                await self._redis.set(self.key_prefix + key, raw, ex=max(1, int(ttl)))
+                return
+            except Exception as e:
+                self._redis_failed("SET", e)
+        self.local.set(key, raw, ttl)
+
+    async def invalidate(self, *keys: str) -> None:
+        """Drop entries whose underlying data changed"""
+        if not keys:
+            return
+        self.invalidations += len(keys)
+        # Always clear the local copy too: it may hold entries written while Redis was down
+        for key in keys:
+            self.local.delete(key)
+        if self._redis_available():
+            try:
+                await self._redis.delete(*(self.key_prefix + key for key in keys))
+            except Exception as e:
+                self._redis_failed("DEL", e)
+
+    async def invalidate_prefix(self, prefix: str) -> None:
+        """Drop every entry under a key prefix (e.g. all leaderboard pages)"""
+        self.invalidations += 1
+        self.local.delete_prefix(prefix)
+        if self._redis_available():
+            try:
+                keys = [key async for key in self._redis.scan_iter(match=f"{self.key_prefix}{prefix}*")]
+                if keys:
+                    await self._redis.delete(*keys)
+            except Exception as e:
+                self._redis_failed("SCAN", e)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            close = getattr(self._redis, "aclose", None) or getattr(self._redis, "close", None)
+            if close is not None:
+                await close()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.local.evictions,
+            "expirations": self.local.expirations,
+            "invalidations": self.invalidations,
+            "redis_errors": self.redis_errors,
+            "local_entries": len(self.local),
+        }
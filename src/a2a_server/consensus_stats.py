@@ -0,0 +1,68 @@
+"""
+A2A-World V3.0 Consensus Statistics
+The consensus significance test, computed from sufficient statistics.
+
+A location's consensus depends only on the per-shape observation counts and
+confidence sums of the locations within its radius, so those sums are all
+that is stored (consensus_cell_stats) and all that is needed to recompute.
+The top shape's share is tested against agents picking uniformly among
+EXPECTED_SHAPE_CHOICES shapes with a one-degree-of-freedom chi-square test,
+whose exact p-value is erfc(sqrt(chi_square / 2)).
+
+These functions mirror chi_square_p_value() and consensus_p_value() in the
+schema, including its erfc approximation, so the rebuild job and the
+incremental SQL path produce the same p-values.
+"""
+
+import numpy as np
+
+# Shapes a random observer could pick
+EXPECTED_SHAPE_CHOICES = 10
+UNIFORM_SHARE = 1.0 / EXPECTED_SHAPE_CHOICES
+
+# How observations are weighted when picking the top shape and its share
+CONSENSUS_WEIGHTINGS = ("count", "confidence")
+
+# Numerical Recipes erfcc coefficients, highest order last
+_ERFC_COEFFICIENTS = (
+    -1.26551223, 1.00002368, 0.37409196, 0.09678418, -0.18628806,
+    0.27886807, -1.13520398, 1.48851587, -0.82215223, 0.17087277,
+)
+
+
+def erfc(x):
+    """Complementary error function for x >= 0 (fractional error < 1.2e-7)"""
+    z = np.asarray(x, dtype=np.float64)
+    t = 1.0 / (1.0 + 0.5 * z)
+    # Same evaluation order as the SQL function
+    poly = np.full_like(t, _ERFC_COEFFICIENTS[-1])
+    for coefficient in reversed(_ERFC_COEFFICIENTS[1:-1]):
+        poly = coefficient + t * poly
+    with np.errstate(under="ignore"):
+        return t * np.exp(-z * z + _ERFC_COEFFICIENTS[0] + t * poly)
+
+
+def chi_square_p_value(chi_square):
+    """Exact p-value of a chi-square statistic with one degree of freedom"""
+    chi_square = np.asarray(chi_square, dtype=np.float64)
+    z = np.sqrt(np.maximum(chi_square, 0.0) / 2.0)
+    p = np.where(z > 26.0, 0.0, erfc(np.minimum(z, 26.0)))
+    return np.where(chi_square > 0, p, 1.0)
+
+
+def consensus_p_value(top_share, observations):
+    """p-value of the top shape's share among `observations` against a uniform pick"""
+    top_share = np.asarray(top_share, dtype=np.float64)
+    observations = np.asarray(observations, dtype=np.float64)
+    chi_square = observations * (top_share - UNIFORM_SHARE) ** 2 / UNIFORM_SHARE
+    significant = (observations > 0) & (top_share > UNIFORM_SHARE)
+    return np.where(significant, chi_square_p_value(np.where(significant, chi_square, 0.0)), 1.0)
+
+
+def verification_status(p_value: float) -> str:
+    """Status upsert_consensus() assigns for a p-value"""
+    if p_value <= 0.001:
+        return "verified"
+    if p_value <= 0.01:
+        return "validated"
+    return "emerging"
@@ -0,0 +1,184 @@
+"""
+A2A-World V3.0 Consensus Engine
+Background recomputation of consensus for locations touched by new observations.
+
+/observe only marks the observation's cell dirty. Repeated marks of the same
+cell coalesce into a single entry, and the worker recomputes dirty cells in
+batches on a fixed cadence, so a burst of observations at one hotspot costs
+one recompute instead of hundreds.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Dirty cells are observation coordinates rounded to 4 decimal places (≈11m),
+# the same granularity consensus_results is keyed on
+Cell = Tuple[Decimal, Decimal]
+
+# Distance (km) a point can move when rounded to a cell; the recompute search
+# is widened by this much so coalescing never misses an affected location
+CELL_ROUNDING_MARGIN_KM = Decimal("0.01")
+
+
+def cell_for(latitude: float, longitude: float) -> Cell:
+    """Return the dirty-cell key for a coordinate"""
+    return (
+        Decimal(str(round(latitude, 4))),
+        Decimal(str(round(longitude, 4)))
+    )
+
+
+class ConsensusWorker:
+    """
+    Dirty-cell queue plus the background task that drains it.
+
+    `recompute` receives a batch of cells and must bring consensus_results up
+    to date for every location those cells can affect.
+    """
+
+    def __init__(
+        self,
+        recompute: Callable[[List[Cell]], Awaitable[None]],
+        interval_seconds: float = 1.0,
+        batch_size: int = 500
+    ):
+        self._recompute = recompute
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+
+        # Insertion-ordered: cell -> monotonic time it was first marked dirty
+        self._dirty: Dict[Cell, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.marks_total = 0
+        self.coalesced_total = 0
+        self.recomputed_total = 0
+        self.failed_batches_total = 0
+        self.last_batch_seconds: Optional[float] = None
+        self.last_run_at: Optional[float] = None
+
+    def mark_dirty(self, latitude: float, longitude: float) -> None:
+        """Queue the cell containing a new observation for recomputation"""
+        cell = cell_for(latitude, longitude)
+        self.marks_total += 1
+        if cell in self._dirty:
+            self.coalesced_total += 1
+        else:
+            self._dirty[cell] = time.monotonic()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of distinct cells waiting for recomputation"""
+        return len(self._dirty)
+
+    @property
+    def lag_seconds(self) -> float:
+        """How long the oldest dirty cell has been waiting (0 when idle)"""
+        if not self._dirty:
+            return 0.0
+        return time.monotonic() - next(iter(self._dirty.values()))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def run_once(self) -> int:
+        """Recompute up to one batch of the oldest dirty cells"""
+        if not self._dirty:
+            return 0
+
+        # islice, not a sliced copy of the keys: the queue can be far longer than a batch
+        batch = {cell: marked_at for cell, marked_at in itertools.islice(self._dirty.items(), self.batch_size)}
+        for cell in batch:
+            del self._dirty[cell]
+
+        start = time.monotonic()
+        try:
+            await self._recompute(list(batch))
+        except Exception as e:
+            # Put the cells back at the front with their original age, so they
+            # are retried first and lag_seconds keeps counting from the oldest
+            self.failed_batches_total += 1
+            for cell, marked_at in self._dirty.items():
+                batch.setdefault(cell, marked_at)
+            self._dirty = batch
+            logger.error(f"❌ Consensus recompute failed for {len(batch)} cells: {e}")
+            raise
+        finally:
+            self.last_run_at = time.time()
+
+        self.last_batch_seconds = time.monotonic() - start
+        self.recomputed_total += len(batch)
+        return len(batch)
+
+    async def drain(self) -> int:
+        """Recompute every dirty cell now"""
+        total = 0
+        while self._dirty:
+            total += await self.run_once()
+        return total
+
+    async def _run(self) -> None:
+        # While less than a batch is dirty, one batch per tick and then sleep
+        # out the rest of the interval, so marks have time to coalesce. Once a
+        # full batch is waiting, waiting longer cannot make it cheaper, so
+        # recompute back to back until the backlog is below a batch again.
+        while True:
+            started = time.monotonic()
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Already logged in run_once; retry on the next tick
+                pass
+            else:
+                if self.queue_depth >= self.batch_size:
+                    await asyncio.sleep(0)
+                    continue
+            await asyncio.sleep(max(0.0, self.interval_seconds - (time.monotonic() - started)))
+
+    def start(self) -> None:
+        """Start the background recompute loop"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"⚙️ Consensus engine started (every {self.interval_seconds}s, "
+                f"batches of {self.batch_size})"
+            )
+
+    async def stop(self) -> None:
+        """Stop the loop and flush whatever is still dirty"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.drain()
+        except Exception:
+            logger.warning(f"⚠️ {self.queue_depth} dirty cells left unprocessed at shutdown")
+
+    def stats(self) -> Dict[str, object]:
+        """Queue depth and lag, for seeing how far consensus trails ingest"""
+        return {
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "recompute_lag_seconds": round(self.lag_seconds, 3),
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "marks_total": self.marks_total,
+            "coalesced_total": self.coalesced_total,
+            "recomputed_total": self.recomputed_total,
+            "failed_batches_total": self.failed_batches_total,
+            "last_batch_seconds": self.last_batch_seconds,
+            "last_run_at": self.last_run_at,
+        }
@@ -9,10 +9,12 @@ from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 import logging
-from prometheus_client import Counter, Histogram, generate_latest
+from prometheus_client import Counter, Gauge, Histogram, generate_latest
 from fastapi.responses import Response
 import uuid
 
+from request_metrics import RESPONSE_SIZE_BUCKETS, RequestMetricsMiddleware
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,9 +22,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Prometheus metrics
-REQUEST_COUNT = Counter('a2a_requests_total', 'Total requests', ['method', 'endpoint'])
-REQUEST_DURATION = Histogram('a2a_request_duration_seconds', 'Request duration')
+# Prometheus metrics (recorded for every request by RequestMetricsMiddleware)
+REQUEST_LABELS = ['method', 'endpoint', 'status']
+REQUEST_COUNT = Counter('a2a_requests_total', 'Total requests', REQUEST_LABELS)
+REQUEST_DURATION = Histogram('a2a_request_duration_seconds', 'Request duration', REQUEST_LABELS)
+REQUESTS_IN_FLIGHT = Gauge('a2a_requests_in_flight', 'Requests currently being handled')
+RESPONSE_SIZE = Histogram(
+    'a2a_response_size_bytes', 'Response body size', REQUEST_LABELS,
+    buckets=RESPONSE_SIZE_BUCKETS
+)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -42,6 +50,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count and time every request by route template and status
+app.add_middleware(
+    RequestMetricsMiddleware,
+    duration=REQUEST_DURATION,
+    requests=REQUEST_COUNT,
+    in_flight=REQUESTS_IN_FLIGHT,
+    response_size=RESPONSE_SIZE
+)
+
 # In-memory storage (will be replaced with database in production)
 agent_registry: Dict[str, "AgentCard"] = {}
 tasks: Dict[str, "Task"] = {}
@@ -157,8 +174,6 @@ async def register_agent(agent_card: AgentCard):
     This endpoint allows agents to join the world by submitting their AgentCard,
     which declares their identity, framework, and capabilities (especially visual processing).
     """
-    REQUEST_COUNT.labels(method='POST', endpoint='/register').inc()
-    
     # Check if agent already registered
     if agent_card.id in agent_registry:
         logger.warning(f"Duplicate registration attempt for agent: {agent_card.id}")
@@ -190,8 +205,6 @@ async def list_agents(
     - **framework**: Filter by framework
     - **limit**: Maximum number of agents to return
     """
-    REQUEST_COUNT.labels(method='GET', endpoint='/agents').inc()
-    
     agents = list(agent_registry.values())
     
     # Apply filters
@@ -211,8 +224,6 @@ async def list_agents(
 @app.get("/agents/{agent_id}", response_model=AgentCard)
 async def get_agent(agent_id: str):
     """Get details of a specific agent"""
-    REQUEST_COUNT.labels(method='GET', endpoint='/agents/{agent_id}').inc()
-    
     if agent_id not in agent_registry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -233,8 +244,6 @@ async def submit_task(task: Task):
     - puzzle.* : Puzzle-related operations
     - social.* : Social features
     """
-    REQUEST_COUNT.labels(method='POST', endpoint='/task').inc()
-    
     # Validate agent exists
     if task.agent_id not in agent_registry:
         raise HTTPException(
@@ -271,8 +280,6 @@ async def submit_task(task: Task):
 @app.get("/task/{task_id}", response_model=TaskResponse)
 async def get_task_status(task_id: str):
     """Get the status of a submitted task"""
-    REQUEST_COUNT.labels(method='GET', endpoint='/task/{task_id}').inc()
-    
     if task_id not in tasks:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
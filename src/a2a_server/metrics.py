@@ -0,0 +1,80 @@
+"""
+A2A-World V3.0 Metrics
+Prometheus instrumentation for the v3 server, exposed at GET /metrics.
+
+Request latency and response size are recorded per route template by
+RequestMetricsMiddleware (request_metrics.py). Database time is split into
+pool acquire wait (per pool, with refusals counted) and per-statement
+execution, labelled with a fixed statement name chosen by the storage
+backend, which together with the consensus recompute histogram shows where
+/observe time goes.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from request_metrics import RESPONSE_SIZE_BUCKETS
+
+# Sub-millisecond to multi-second, for both requests and queries
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+REQUEST_DURATION = Histogram(
+    'a2a_v3_request_duration_seconds', 'HTTP request latency by route',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge('a2a_v3_requests_in_flight', 'HTTP requests currently being handled')
+RESPONSE_SIZE = Histogram(
+    'a2a_v3_response_size_bytes', 'HTTP response body size by route',
+    ['method', 'route', 'status'], buckets=RESPONSE_SIZE_BUCKETS
+)
+DB_QUERY_DURATION = Histogram(
+    'a2a_v3_db_query_duration_seconds', 'Database statement execution time',
+    ['statement'], buckets=LATENCY_BUCKETS
+)
+# Pool metrics are labelled 'write' or 'read' (see PostgresStorage)
+DB_POOL_ACQUIRE_WAIT = Histogram(
+    'a2a_v3_db_pool_acquire_seconds', 'Time spent waiting for a pooled connection',
+    ['pool'], buckets=LATENCY_BUCKETS
+)
+DB_POOL_ACQUIRE_TIMEOUTS = Counter(
+    'a2a_v3_db_pool_acquire_timeouts_total', 'Requests refused because no pooled connection came free',
+    ['pool']
+)
+DB_POOL_SIZE = Gauge('a2a_v3_db_pool_connections', 'Open pooled database connections', ['pool'])
+DB_POOL_IN_USE = Gauge('a2a_v3_db_pool_in_use_connections', 'Pooled connections currently checked out', ['pool'])
+DB_POOL_MAX_SIZE = Gauge('a2a_v3_db_pool_max_connections', 'Connection limit of each pool', ['pool'])
+CONSENSUS_RECOMPUTE_DURATION = Histogram(
+    'a2a_v3_consensus_recompute_seconds', 'Consensus recompute time per batch of dirty cells',
+    buckets=LATENCY_BUCKETS
+)
+CONSENSUS_RECOMPUTED_LOCATIONS = Counter(
+    'a2a_v3_consensus_recomputed_locations_total', 'Locations whose consensus was recomputed'
+)
+
+
+@contextmanager
+def observe_query(statement: str) -> Iterator[None]:
+    """Time one database statement under a fixed name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        DB_QUERY_DURATION.labels(statement).observe(time.perf_counter() - start)
+
+
+def track_pool(name: str, size: Callable[[], int], idle: Callable[[], int], max_size: int) -> None:
+    """Report a connection pool's size, checked-out connections and limit at scrape time"""
+    DB_POOL_SIZE.labels(name).set_function(size)
+    DB_POOL_IN_USE.labels(name).set_function(lambda: size() - idle())
+    DB_POOL_MAX_SIZE.labels(name).set(max_size)
+
+
+def render_metrics():
+    """Body and content type for GET /metrics"""
+    return generate_latest(), CONTENT_TYPE_LATEST
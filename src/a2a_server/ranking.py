@@ -0,0 +1,218 @@
+"""
+A2A-World V3.0 Rank Index
+In-memory order-statistic index over (reputation, agent_id).
+
+Agents are kept in leaderboard order (reputation descending, agent_id
+ascending) in sorted buckets of bounded size. A Fenwick tree over bucket
+lengths turns "how many agents rank above this one" into a logarithmic
+prefix sum, so rank lookups and neighbour windows cost O(log n) however many
+agents are registered.
+
+The database leaderboard table stays the source of truth; the server loads
+the index from it at startup, applies its own reputation changes as they
+happen and reconciles periodically.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (-reputation, agent_id): ascending order of this key is leaderboard order
+RankKey = Tuple[float, str]
+
+
+def to_column(reputation) -> float:
+    """
+    A reputation as leaderboard.reputation DECIMAL(10,2) stores it: rounded
+    half away from zero like NUMERIC, not to the nearest binary float
+    """
+    return float(Decimal(str(reputation)).quantize(Decimal("0.01"), ROUND_HALF_UP))
+
+
+class _Fenwick:
+    """Prefix sums over bucket lengths"""
+
+    def __init__(self, values: List[int]):
+        self.size = len(values)
+        self.tree = [0] * (self.size + 1)
+        for i, value in enumerate(values):
+            self.add(i, value)
+
+    def add(self, index: int, delta: int) -> None:
+        index += 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        """Sum of values[0:index]"""
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+
+class RankIndex:
+    """Leaderboard order with O(log n) rank, position and neighbour queries"""
+
+    def __init__(self, bucket_size: int = 512):
+        self.bucket_size = bucket_size
+        self._reputation: Dict[str, float] = {}
+        self._buckets: List[List[RankKey]] = []
+        self._maxes: List[RankKey] = []
+        self._fenwick = _Fenwick([])
+
+    def __len__(self) -> int:
+        return len(self._reputation)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self._reputation
+
+    def reputation(self, agent_id: str) -> Optional[float]:
+        return self._reputation.get(agent_id)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def rebuild(self, rows: Iterable[Tuple[str, float]]) -> None:
+        """Replace the index contents with (agent_id, reputation) rows"""
+        self._reputation = {str(agent_id): to_column(rep) for agent_id, rep in rows}
+        keys = sorted((-rep, agent_id) for agent_id, rep in self._reputation.items())
+        self._buckets = [
+            keys[i:i + self.bucket_size] for i in range(0, len(keys), self.bucket_size)
+        ]
+        self._reindex()
+
+    def upsert(self, agent_id: str, reputation: float) -> None:
+        """Set an agent's reputation (inserting the agent if new)"""
+        agent_id = str(agent_id)
+        # Same precision as the stored column, so repeated increments cannot
+        # drift away from it
+        reputation = to_column(reputation)
+        previous = self._reputation.get(agent_id)
+        if previous == reputation:
+            return
+        if previous is not None:
+            self._remove_key((-previous, agent_id))
+        self._reputation[agent_id] = reputation
+        self._insert_key((-reputation, agent_id))
+
+    def increment(self, agent_id: str, delta: float) -> None:
+        """Add earned reputation to an agent already in the index"""
+        agent_id = str(agent_id)
+        if agent_id in self._reputation:
+            self.upsert(agent_id, Decimal(str(self._reputation[agent_id])) + Decimal(str(delta)))
+
+    def remove(self, agent_id: str) -> None:
+        agent_id = str(agent_id)
+        previous = self._reputation.pop(agent_id, None)
+        if previous is not None:
+            self._remove_key((-previous, agent_id))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def rank_of_reputation(self, reputation: float) -> int:
+        """Competition rank (SQL RANK()) of a reputation: 1 + agents strictly above it"""
+        return self._count_before((-float(reputation), "")) + 1
+
+    def rank(self, agent_id: str) -> Optional[int]:
+        reputation = self._reputation.get(str(agent_id))
+        if reputation is None:
+            return None
+        return self.rank_of_reputation(reputation)
+
+    def position(self, agent_id: str) -> Optional[int]:
+        """0-based position in leaderboard order (ties broken by agent_id)"""
+        agent_id = str(agent_id)
+        reputation = self._reputation.get(agent_id)
+        if reputation is None:
+            return None
+        return self._count_before((-reputation, agent_id))
+
+    def around(self, agent_id: str, neighbours: int) -> List[Tuple[int, str, float]]:
+        """(position, agent_id, reputation) for an agent and up to `neighbours` either side"""
+        position = self.position(agent_id)
+        if position is None:
+            return []
+        return self.slice(max(0, position - neighbours), position + neighbours + 1)
+
+    def slice(self, start: int, stop: int) -> List[Tuple[int, str, float]]:
+        """(position, agent_id, reputation) for positions start..stop-1"""
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        bucket, offset = self._locate(start)
+        result = []
+        position = start
+        while position < stop:
+            keys = self._buckets[bucket]
+            for neg_rep, agent_id in keys[offset:offset + (stop - position)]:
+                result.append((position, agent_id, -neg_rep))
+                position += 1
+            bucket += 1
+            offset = 0
+        return result
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _reindex(self) -> None:
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._fenwick = _Fenwick([len(bucket) for bucket in self._buckets])
+
+    def _count_before(self, key: RankKey) -> int:
+        """Number of keys strictly less than `key`"""
+        if not self._buckets:
+            return 0
+        bucket = bisect_left(self._maxes, key)
+        if bucket == len(self._buckets):
+            return len(self)
+        return self._fenwick.prefix(bucket) + bisect_left(self._buckets[bucket], key)
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """(bucket, offset) of a 0-based position, by binary lifting on the Fenwick tree"""
+        tree = self._fenwick.tree
+        bucket = 0
+        remaining = position
+        step = 1 << self._fenwick.size.bit_length()
+        while step:
+            candidate = bucket + step
+            if candidate <= self._fenwick.size and tree[candidate] <= remaining:
+                bucket = candidate
+                remaining -= tree[candidate]
+            step >>= 1
+        return bucket, remaining
+
+    def _insert_key(self, key: RankKey) -> None:
+        if not self._buckets:
+            self._buckets = [[key]]
+            self._reindex()
+            return
+        bucket = min(bisect_right(self._maxes, key), len(self._buckets) - 1)
+        insort(self._buckets[bucket], key)
+        self._maxes[bucket] = self._buckets[bucket][-1]
+        if len(self._buckets[bucket]) > 2 * self.bucket_size:
+            # Split the oversized bucket; rare, so a full reindex is fine
+            half = len(self._buckets[bucket]) // 2
+            self._buckets[bucket:bucket + 1] = [
+                self._buckets[bucket][:half], self._buckets[bucket][half:]
+            ]
+            self._reindex()
+        else:
+            self._fenwick.add(bucket, 1)
+
+    def _remove_key(self, key: RankKey) -> None:
+        bucket = bisect_left(self._maxes, key)
+        keys = self._buckets[bucket]
+        del keys[bisect_left(keys, key)]
+        if keys:
+            self._maxes[bucket] = keys[-1]
+            self._fenwick.add(bucket, -1)
+        else:
+            del self._buckets[bucket]
+            self._reindex()
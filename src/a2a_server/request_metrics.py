@@ -0,0 +1,95 @@
+"""
+A2A-World Request Metrics
+ASGI middleware recording every request in a service's Prometheus metrics.
+
+Each service owns its metric names and passes them in. All labelled metrics
+take (method, route, status), where route is the matched route template
+("/agents/{agent_id}", never the raw path, so ids in URLs cannot explode the
+label set) or "unmatched" for 404s the router could not place.
+
+The A2A server and the Visual Cortex API build from separate directories, so
+each carries an identical copy of this module; change both together
+(the A2A server's test_v3_metrics.py fails while the copies differ).
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Response body sizes in bytes, 100B to 10MB
+RESPONSE_SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class RequestMetricsMiddleware:
+    """
+    Times each HTTP request and records its count, latency, response size
+    and the number in flight.
+
+    Plain ASGI rather than BaseHTTPMiddleware: no extra task or response
+    buffering per request, and streamed request bodies pass through
+    untouched. Labelled children are cached, so a request costs a dict
+    lookup per metric instead of a labels() call.
+    """
+
+    def __init__(
+        self,
+        app,
+        duration: Histogram,
+        requests: Optional[Counter] = None,
+        in_flight: Optional[Gauge] = None,
+        response_size: Optional[Histogram] = None
+    ):
+        self.app = app
+        self.duration = duration
+        self.requests = requests
+        self.in_flight = in_flight
+        self.response_size = response_size
+        self._children: Dict[Tuple[str, str, str], tuple] = {}
+
+    def _children_for(self, labels: Tuple[str, str, str]) -> tuple:
+        children = self._children.get(labels)
+        if children is None:
+            children = (
+                self.duration.labels(*labels),
+                self.requests.labels(*labels) if self.requests is not None else None,
+                self.response_size.labels(*labels) if self.response_size is not None else None
+            )
+            self._children[labels] = children
+        return children
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        body_bytes = 0
+
+        async def send_with_metrics(message):
+            nonlocal status_code, body_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        if self.in_flight is not None:
+            self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.in_flight is not None:
+                self.in_flight.dec()
+            # The router records the matched route in the scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            duration, requests, response_size = self._children_for(
+                (scope["method"], route, str(status_code))
+            )
+            duration.observe(elapsed)
+            if requests is not None:
+                requests.inc()
+            if response_size is not None:
+                response_size.observe(body_bytes)
@@ -0,0 +1,101 @@
+"""
+A2A-World V3.0 Shape Vocabulary
+Interned shape names: observations store a small integer shape_id.
+
+Shapes are normalized before they are interned, so "Tree", "tree " and
+"trees" all vote for the same shape. normalize_shape() mirrors the SQL
+function of the same name in the schema; the two must stay in step, since
+the server normalizes in Python and the database re-normalizes whatever it
+is asked to intern.
+
+ShapeVocabulary caches the shapes table in memory. Ids never change once
+assigned, so cached entries never go stale; names this process has not seen
+yet are interned (or looked up) in one query per batch.
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+# Runs of whitespace, underscores and hyphens become a single space
+_SEPARATORS = re.compile(r"[\s_\-]+")
+
+# Plural endings folded into the singular, first match wins. Only the final
+# word is affected, and short words ("bus", "gas") and endings that are rarely
+# plurals ("-ss", "-us", "-is") are left alone.
+_PLURAL_RULES = (
+    (re.compile(r"(\S{2,})ies$"), r"\1y"),                 # butterflies -> butterfly
+    (re.compile(r"(\S+(?:ss|sh|ch|x|z))es$"), r"\1"),      # foxes -> fox, crosses -> cross
+    (re.compile(r"(\S{2,}[^\s'ius])s$"), r"\1"),           # trees -> tree
+)
+
+
+def normalize_shape(raw: str) -> str:
+    """Canonical form of a shape name; raises ValueError if nothing is left"""
+    name = _SEPARATORS.sub(" ", raw.lower()).strip()
+    for pattern, replacement in _PLURAL_RULES:
+        singular, matched = pattern.subn(replacement, name)
+        if matched:
+            name = singular
+            break
+    if not name:
+        raise ValueError("shape name is empty")
+    return name
+
+
+class ShapeVocabulary:
+    """In-memory cache of the shapes table (name <-> shape_id)"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, rows: Iterable) -> None:
+        """Cache (shape_id, name) rows"""
+        for shape_id, name in rows:
+            self._ids[name] = shape_id
+            self._names[shape_id] = name
+
+    def id_of(self, name: str) -> Optional[int]:
+        """Cached id of a normalized name, or None if not cached"""
+        return self._ids.get(name)
+
+    def name_of(self, shape_id: Optional[int]) -> Optional[str]:
+        """Cached name of an id, or None if not cached"""
+        return self._names.get(shape_id)
+
+    async def load(self, conn) -> None:
+        """Cache the whole shapes table"""
+        self.add(
+            (row['shape_id'], row['name'])
+            for row in await conn.fetch("SELECT shape_id, name FROM shapes")
+        )
+
+    async def ids_for(self, conn, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Ids of normalized names, interning the ones the database lacks.
+        
+        Call outside any transaction that may roll back: a rolled-back intern
+        would leave ids in the cache that the shapes table never kept.
+        """
+        names = set(names)
+        missing = sorted(name for name in names if name not in self._ids)
+        if missing:
+            rows = await conn.fetch(
+                "SELECT shape_id, name FROM intern_shapes($1::text[])", missing
+            )
+            self.add((row['shape_id'], row['name']) for row in rows)
+        return {name: self._ids[name] for name in names}
+
+    async def names_for(self, conn, shape_ids: Iterable[Optional[int]]) -> Dict[int, str]:
+        """Names of shape ids, fetching any interned by another process"""
+        shape_ids = {shape_id for shape_id in shape_ids if shape_id is not None}
+        missing = sorted(shape_id for shape_id in shape_ids if shape_id not in self._names)
+        if missing:
+            rows = await conn.fetch(
+                "SELECT shape_id, name FROM shapes WHERE shape_id = ANY($1::int[])", missing
+            )
+            self.add((row['shape_id'], row['name']) for row in rows)
+        return {shape_id: self._names[shape_id] for shape_id in shape_ids if shape_id in self._names}
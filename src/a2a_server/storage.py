@@ -0,0 +1,764 @@
+"""
+A2A-World V3.0 Storage Backends
+Everything the v3 server persists, behind one interface.
+
+PostgresStorage is the production backend: a thin layer over the schema in
+src/database/v3_simplified_schema.sql, whose functions and triggers do the
+real work. MemoryStorage keeps the same data in process and reproduces what
+those triggers and functions compute (cell statistics, consensus, counters,
+leaderboard contributions), so the API, the consensus engine and load
+benchmarks run on a single machine with no services, and backends can be
+compared on equal terms.
+
+Pick one with STORAGE_BACKEND=postgres|memory (see create_storage).
+"""
+
+import asyncio
+import heapq
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Protocol, Sequence, Set, Tuple
+
+import asyncpg
+
+from consensus_stats import CONSENSUS_WEIGHTINGS, consensus_p_value, verification_status
+from metrics import DB_POOL_ACQUIRE_TIMEOUTS, DB_POOL_ACQUIRE_WAIT, observe_query, track_pool
+from shapes import ShapeVocabulary
+
+STORAGE_BACKENDS = ("postgres", "memory")
+
+# Settings only the Postgres backend understands
+POSTGRES_SETTINGS = ("database_url", "read_database_url", "max_size", "read_max_size", "acquire_timeout")
+
+# Statuses that count toward Heaven's Gates and validated contributions
+VALIDATED_STATUSES = ("validated", "verified", "published")
+
+LEADERBOARD_COLUMNS = """
+    agent_id, external_id, name, framework,
+    total_observations, reputation,
+    unique_locations_observed, validated_contributions
+"""
+
+
+class StorageUnavailable(Exception):
+    """No connection came free in time; the server answers 503"""
+
+
+class Observation(Protocol):
+    """What a backend needs from a validated observation (ObservationRequest)"""
+    agent_id: str
+    latitude: float
+    longitude: float
+    observed_shape: str
+    confidence: float
+    visual_evidence_url: Optional[str]
+    methodology: Optional[str]
+
+
+class StorageBackend(ABC):
+    """
+    Agents, observations, consensus, leaderboard and progress.
+
+    Rows come back as mappings (asyncpg Records or dicts) keyed like the
+    schema's columns; consensus rows carry the shape name, not its id.
+    """
+
+    name: str
+
+    @abstractmethod
+    async def connect(self) -> None:
+        """Open connections and warm caches"""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release connections"""
+
+    @abstractmethod
+    async def ping(self) -> bool:
+        """True if the backend is answering"""
+
+    # ------------------------------------------------------------------ agents
+
+    @abstractmethod
+    async def register_agent(self, external_id: str, name: str, framework: str) -> Optional[Dict[str, Any]]:
+        """Insert an agent; None if external_id is already registered"""
+
+    @abstractmethod
+    async def registered_agents(self, agent_ids: Iterable[str]) -> Set[str]:
+        """The subset of agent ids that are registered"""
+
+    # ------------------------------------------------------------ observations
+
+    @abstractmethod
+    async def submit_observation(self, observation: Observation, recompute: bool) -> Optional[Dict[str, Any]]:
+        """
+        Store one observation and read back its location's consensus.
+
+        Returns None if the agent is not registered. Otherwise the result has
+        observation_id and observed_at, the consensus columns (None when the
+        location has no consensus yet) and, when `recompute` is set,
+        recomputed_locations ((latitude, longitude) pairs) and
+        any_status_changed.
+        """
+
+    @abstractmethod
+    async def add_observations(self, observations: Sequence[Observation]) -> List[uuid.UUID]:
+        """Bulk-store observations from registered agents; returns their ids"""
+
+    @abstractmethod
+    async def count_observations_near(self, latitude: float, longitude: float, radius_km: float) -> int:
+        """Observations within radius_km of a point"""
+
+    # --------------------------------------------------------------- consensus
+
+    @abstractmethod
+    async def recompute_consensus(self, cells: Sequence[Tuple[Any, Any]], margin_km: Decimal) -> List[Dict[str, Any]]:
+        """
+        Recompute every location a batch of dirty points can affect.
+
+        Returns one row (latitude, longitude, status_changed) per recomputed
+        location.
+        """
+
+    @abstractmethod
+    async def get_consensus(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        """Consensus row at a location already rounded to 4 decimal places"""
+
+    # ------------------------------------------------------------- leaderboard
+
+    @abstractmethod
+    async def leaderboard_reputations(self) -> List[Tuple[str, Decimal]]:
+        """(agent_id, reputation) for every agent, to build the rank index"""
+
+    @abstractmethod
+    async def leaderboard_page(self, limit: int, after: Optional[Tuple[Decimal, uuid.UUID]]) -> List[Dict[str, Any]]:
+        """Up to `limit` leaderboard rows by (reputation DESC, agent_id), after a keyset cursor"""
+
+    @abstractmethod
+    async def leaderboard_rows(self, agent_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Leaderboard rows for specific agents (any order)"""
+
+    @abstractmethod
+    async def agent_reputation(self, agent_id: str) -> Optional[Decimal]:
+        """An agent's reputation, or None if not registered"""
+
+    @abstractmethod
+    async def total_agents(self) -> int:
+        """Registered agent count"""
+
+    # ---------------------------------------------------------------- progress
+
+    @abstractmethod
+    async def heavens_gates_progress(self) -> Optional[Dict[str, Any]]:
+        """validated_locations, remaining_to_heaven and progress_percentage"""
+
+
+def create_storage(kind: str, **settings) -> StorageBackend:
+    """Build the backend named by STORAGE_BACKEND"""
+    if kind == "postgres":
+        return PostgresStorage(**settings)
+    if kind == "memory":
+        for key in POSTGRES_SETTINGS:
+            settings.pop(key, None)
+        return MemoryStorage(**settings)
+    raise ValueError(f"Unknown storage backend '{kind}' (expected one of {', '.join(STORAGE_BACKENDS)})")
+
+
+# ============================================================================
+# POSTGRES
+# ============================================================================
+
+class PostgresStorage(StorageBackend):
+    """
+    The schema's tables, triggers and functions over two asyncpg pools.
+
+    Writes, and reads that must see them, use the write pool on the
+    primary: the agent check before a batch insert, the consensus lookup
+    (cached until a recompute invalidates it, so a replica lagging behind
+    that recompute would pin its stale row for the whole cache TTL) and the
+    reputations the rank index is rebuilt from (which must include the
+    credits already applied to it). Other read-only endpoints use a separate
+    read pool, on read_database_url (a replica) when given, else on the
+    primary, so a burst of /observe writes holding connections through
+    consensus recomputes cannot starve leaderboard and progress reads. Waiting longer than acquire_timeout for either pool raises
+    StorageUnavailable instead of queueing indefinitely.
+    """
+
+    name = "postgres"
+
+    def __init__(
+        self,
+        database_url: str,
+        radius_km: Decimal = Decimal("5.0"),
+        weighting: str = "count",
+        min_size: int = 5,
+        max_size: int = 20,
+        read_database_url: Optional[str] = None,
+        read_max_size: int = 20,
+        acquire_timeout: Optional[float] = 5.0
+    ):
+        self.database_url = database_url
+        self.read_database_url = read_database_url or database_url
+        self.radius_km = radius_km
+        self.weighting = weighting
+        self.min_size = min_size
+        self.max_size = max_size
+        self.read_max_size = read_max_size
+        self.acquire_timeout = acquire_timeout
+        self.write_pool: Optional[asyncpg.Pool] = None
+        self.read_pool: Optional[asyncpg.Pool] = None
+        # Interned shape names; observations and consensus rows store ids
+        self.shapes = ShapeVocabulary()
+
+    async def _create_pool(self, name: str, database_url: str, max_size: int) -> asyncpg.Pool:
+        pool = await asyncpg.create_pool(
+            database_url, min_size=min(self.min_size, max_size), max_size=max_size,
+            server_settings={'a2a.consensus_weighting': self.weighting}
+        )
+        track_pool(name, pool.get_size, pool.get_idle_size, max_size)
+        return pool
+
+    async def connect(self) -> None:
+        self.write_pool = await self._create_pool("write", self.database_url, self.max_size)
+        self.read_pool = await self._create_pool("read", self.read_database_url, self.read_max_size)
+        async with self._acquire() as conn:
+            await self.shapes.load(conn)
+
+    async def close(self) -> None:
+        for pool in (self.write_pool, self.read_pool):
+            if pool is not None:
+                await pool.close()
+        self.write_pool = self.read_pool = None
+
+    @asynccontextmanager
+    async def _acquire(self, read: bool = False) -> AsyncIterator[asyncpg.Connection]:
+        """A connection from the write (or read) pool, recording how long the pool made us wait"""
+        name, pool = ("read", self.read_pool) if read else ("write", self.write_pool)
+        start = time.perf_counter()
+        try:
+            conn = await pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            DB_POOL_ACQUIRE_TIMEOUTS.labels(name).inc()
+            raise StorageUnavailable(
+                f"No {name} database connection free within {self.acquire_timeout}s"
+            )
+        DB_POOL_ACQUIRE_WAIT.labels(name).observe(time.perf_counter() - start)
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+
+    async def ping(self) -> bool:
+        try:
+            for read in (False, True):
+                async with self._acquire(read) as conn:
+                    await conn.fetchval("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    async def register_agent(self, external_id: str, name: str, framework: str) -> Optional[Dict[str, Any]]:
+        async with self._acquire() as conn:
+            with observe_query("register_agent"):
+                return await conn.fetchrow(
+                    """
+                    INSERT INTO agents (external_id, name, framework)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (external_id) DO NOTHING
+                    RETURNING agent_id, external_id, name, reputation, total_observations
+                    """,
+                    external_id, name, framework
+                )
+
+    async def registered_agents(self, agent_ids: Iterable[str]) -> Set[str]:
+        async with self._acquire() as conn:
+            with observe_query("registered_agents"):
+                rows = await conn.fetch(
+                    "SELECT agent_id FROM agents WHERE agent_id = ANY($1::uuid[])",
+                    [uuid.UUID(agent_id) for agent_id in set(agent_ids)]
+                )
+        return {str(row['agent_id']) for row in rows}
+
+    async def submit_observation(self, observation: Observation, recompute: bool) -> Optional[Dict[str, Any]]:
+        async with self._acquire() as conn:
+            # Cached after a shape's first use, so normally no extra round trip
+            shape_ids = await self.shapes.ids_for(conn, [observation.observed_shape])
+
+            # Agent check, insert, recompute and consensus read in one round trip
+            with observe_query("submit_observation"):
+                row = await conn.fetchrow(
+                    "SELECT * FROM submit_observation($1, $2, $3, $4, $5, $6, $7, $8, $9)",
+                    uuid.UUID(observation.agent_id),
+                    Decimal(str(observation.latitude)),
+                    Decimal(str(observation.longitude)),
+                    shape_ids[observation.observed_shape],
+                    Decimal(str(observation.confidence)),
+                    observation.visual_evidence_url,
+                    observation.methodology,
+                    recompute,
+                    self.radius_km
+                )
+            if row is None:
+                return None
+            shape_names = await self.shapes.names_for(conn, [row['consensus_shape_id']])
+
+        result = dict(row)
+        result['consensus_shape'] = shape_names.get(result.pop('consensus_shape_id'))
+        result['recomputed_locations'] = list(zip(
+            result.pop('recomputed_latitudes'), result.pop('recomputed_longitudes')
+        ))
+        return result
+
+    async def add_observations(self, observations: Sequence[Observation]) -> List[uuid.UUID]:
+        observation_ids = [uuid.uuid4() for _ in observations]
+        async with self._acquire() as conn:
+            # Interned before the COPY's transaction, so a rollback cannot orphan cached ids
+            shape_ids = await self.shapes.ids_for(conn, (obs.observed_shape for obs in observations))
+            async with conn.transaction():
+                with observe_query("copy_observations"):
+                    await conn.copy_records_to_table(
+                        "observations",
+                        records=[
+                            (
+                                observation_id,
+                                uuid.UUID(obs.agent_id),
+                                Decimal(str(obs.latitude)),
+                                Decimal(str(obs.longitude)),
+                                shape_ids[obs.observed_shape],
+                                Decimal(str(obs.confidence)),
+                                obs.visual_evidence_url,
+                                obs.methodology
+                            )
+                            for observation_id, obs in zip(observation_ids, observations)
+                        ],
+                        columns=[
+                            "observation_id", "agent_id", "latitude", "longitude",
+                            "shape_id", "confidence", "visual_evidence_url", "methodology"
+                        ]
+                    )
+        return observation_ids
+
+    async def count_observations_near(self, latitude: float, longitude: float, radius_km: float) -> int:
+        async with self._acquire(read=True) as conn:
+            with observe_query("count_observations_near"):
+                return await conn.fetchval(
+                    """
+                    SELECT COUNT(*) FROM observations
+                    WHERE
+                        cell_key = ANY(spatial_neighbour_cells($1, $2, $3)) AND
+                        SQRT(POWER((latitude - $1) * 111.0, 2) +
+                             POWER((longitude - $2) * 111.0 * COS(RADIANS($1)), 2)) <= $3
+                    """,
+                    Decimal(str(latitude)),
+                    Decimal(str(longitude)),
+                    Decimal(str(radius_km))
+                )
+
+    async def recompute_consensus(self, cells: Sequence[Tuple[Any, Any]], margin_km: Decimal) -> List[Dict[str, Any]]:
+        async with self._acquire() as conn:
+            with observe_query("update_consensus_cells"):
+                return await conn.fetch(
+                    "SELECT * FROM update_consensus_cells($1::numeric[], $2::numeric[], $3, $4)",
+                    [lat for lat, _ in cells],
+                    [lon for _, lon in cells],
+                    self.radius_km,
+                    margin_km
+                )
+
+    async def get_consensus(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        async with self._acquire() as conn:
+            with observe_query("get_consensus"):
+                row = await conn.fetchrow(
+                    """
+                    SELECT
+                        consensus_shape_id, observation_count, consensus_percentage,
+                        p_value, verification_status, validated_at
+                    FROM consensus_results
+                    WHERE latitude = $1 AND longitude = $2
+                    """,
+                    Decimal(str(latitude)),
+                    Decimal(str(longitude))
+                )
+            if row is None:
+                return None
+            shape_names = await self.shapes.names_for(conn, [row['consensus_shape_id']])
+        result = dict(row)
+        result['consensus_shape'] = shape_names.get(result.pop('consensus_shape_id'))
+        return result
+
+    async def leaderboard_reputations(self) -> List[Tuple[str, Decimal]]:
+        async with self._acquire() as conn:
+            with observe_query("leaderboard_reputations"):
+                rows = await conn.fetch("SELECT agent_id, reputation FROM leaderboard")
+        return [(str(row['agent_id']), row['reputation']) for row in rows]
+
+    async def leaderboard_page(self, limit: int, after: Optional[Tuple[Decimal, uuid.UUID]]) -> List[Dict[str, Any]]:
+        async with self._acquire(read=True) as conn:
+            with observe_query("leaderboard_page"):
+                if after is None:
+                    return await conn.fetch(
+                        f"""
+                        SELECT {LEADERBOARD_COLUMNS} FROM leaderboard
+                        ORDER BY reputation DESC, agent_id
+                        LIMIT $1
+                        """,
+                        limit
+                    )
+                return await conn.fetch(
+                    f"""
+                    SELECT {LEADERBOARD_COLUMNS} FROM leaderboard
+                    WHERE reputation <= $2 AND (reputation < $2 OR agent_id > $3)
+                    ORDER BY reputation DESC, agent_id
+                    LIMIT $1
+                    """,
+                    limit, after[0], after[1]
+                )
+
+    async def leaderboard_rows(self, agent_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        async with self._acquire(read=True) as conn:
+            with observe_query("leaderboard_rows"):
+                return await conn.fetch(
+                    f"SELECT {LEADERBOARD_COLUMNS} FROM leaderboard WHERE agent_id = ANY($1::uuid[])",
+                    [uuid.UUID(agent_id) for agent_id in agent_ids]
+                )
+
+    async def agent_reputation(self, agent_id: str) -> Optional[Decimal]:
+        async with self._acquire(read=True) as conn:
+            with observe_query("agent_reputation"):
+                return await conn.fetchval(
+                    "SELECT reputation FROM leaderboard WHERE agent_id = $1",
+                    uuid.UUID(agent_id)
+                )
+
+    async def total_agents(self) -> int:
+        async with self._acquire(read=True) as conn:
+            with observe_query("total_agents"):
+                return await conn.fetchval(
+                    "SELECT value FROM world_counters WHERE counter_name = 'agents'"
+                ) or 0
+
+    async def heavens_gates_progress(self) -> Optional[Dict[str, Any]]:
+        async with self._acquire(read=True) as conn:
+            with observe_query("heavens_gates_progress"):
+                return await conn.fetchrow("SELECT * FROM heavens_gates_progress")
+
+
+# ============================================================================
+# IN MEMORY
+# ============================================================================
+
+KM_PER_DEGREE = 111.0
+_E4 = Decimal("0.0001")
+_E6 = Decimal("0.000001")
+_E2 = Decimal("0.01")
+_P_VALUE_QUANTUM = Decimal("0.00000001")
+
+# Location key: (latitude, longitude) in units of 1e-4 degrees
+Location = Tuple[int, int]
+
+
+def to_e4(value: Any) -> int:
+    """A coordinate stored as DECIMAL(9,6), then ROUND()ed to 4 places, in 1e-4 degrees"""
+    stored = Decimal(str(value)).quantize(_E6, ROUND_HALF_UP)
+    return int(stored.quantize(_E4, ROUND_HALF_UP).scaleb(4))
+
+
+def reputation_earned(confidence: Any) -> Decimal:
+    """Reputation an observation earns: 10 x its confidence as stored, DECIMAL(3,2)"""
+    return 10 * Decimal(str(confidence)).quantize(_E2, ROUND_HALF_UP)
+
+
+def spatial_cell_key(latitude: float, longitude: float) -> int:
+    """The schema's fixed 0.05° grid cell (spatial_cell_key)"""
+    row = min(math.floor((latitude + 90) / 0.05), 3599)
+    col = min(math.floor((longitude + 180) / 0.05), 7199)
+    return row * 7200 + col
+
+
+def spatial_neighbour_cells(latitude: float, longitude: float, radius_km: float) -> List[int]:
+    """Every grid cell a radius around a point can reach (spatial_neighbour_cells)"""
+    lat_span = radius_km / KM_PER_DEGREE + 0.0001
+    lon_span = radius_km / (KM_PER_DEGREE * max(
+        math.cos(math.radians(min(abs(latitude) + lat_span, 90.0))), 1e-9
+    )) + 0.0001
+    row_min = max(math.floor((latitude - lat_span + 90) / 0.05), 0)
+    row_max = min(math.floor((latitude + lat_span + 90) / 0.05), 3599)
+    if lon_span >= 180:
+        col_min, col_max = 0, 7199
+    else:
+        col_min = max(math.floor((longitude - lon_span + 180) / 0.05), 0)
+        col_max = min(math.floor((longitude + lon_span + 180) / 0.05), 7199)
+    return [
+        row * 7200 + col
+        for row in range(row_min, row_max + 1)
+        for col in range(col_min, col_max + 1)
+    ]
+
+
+def _distance_km(lat_e4: int, lon_e4: int, other_lat_e4: int, other_lon_e4: int, cos_lat: float) -> float:
+    return math.hypot(
+        (other_lat_e4 - lat_e4) / 1e4 * KM_PER_DEGREE,
+        (other_lon_e4 - lon_e4) / 1e4 * KM_PER_DEGREE * cos_lat
+    )
+
+
+class MemoryStorage(StorageBackend):
+    """
+    In-process backend with the same observable behaviour as PostgresStorage.
+
+    Every method runs without awaiting in between, so each call is atomic
+    with respect to the event loop, like a database statement. Nothing is
+    persisted: a restart starts an empty world.
+    """
+
+    name = "memory"
+
+    def __init__(self, radius_km: Decimal = Decimal("5.0"), weighting: str = "count"):
+        if weighting not in CONSENSUS_WEIGHTINGS:
+            raise ValueError(f"Unknown weighting '{weighting}'")
+        self.radius_km = float(radius_km)
+        self.weighting = weighting
+
+        self._agents: Dict[uuid.UUID, Dict[str, Any]] = {}
+        self._external_ids: Set[str] = set()
+        # Shape -> first-seen order; consensus ties go to the earliest shape,
+        # as they go to the lowest interned shape_id in the database
+        self._shape_order: Dict[str, int] = {}
+        # Observation points by grid cell, for nearby counts
+        self._points: Dict[int, List[Tuple[float, float]]] = defaultdict(list)
+        # consensus_cell_stats: location -> shape -> [count, confidence in hundredths]
+        self._stats: Dict[Location, Dict[str, List[int]]] = {}
+        self._stats_cells: Dict[int, Set[Location]] = defaultdict(set)
+        self._consensus: Dict[Location, Dict[str, Any]] = {}
+        # agent_locations, keyed by location
+        self._observers: Dict[Location, Set[uuid.UUID]] = defaultdict(set)
+        self._validated_locations = 0
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def ping(self) -> bool:
+        return True
+
+    # ------------------------------------------------------------------ agents
+
+    async def register_agent(self, external_id: str, name: str, framework: str) -> Optional[Dict[str, Any]]:
+        if external_id in self._external_ids:
+            return None
+        agent = {
+            'agent_id': uuid.uuid4(),
+            'external_id': external_id,
+            'name': name,
+            'framework': framework,
+            'total_observations': 0,
+            'reputation': Decimal("0.00"),
+            'unique_locations_observed': 0,
+            'validated_contributions': 0,
+        }
+        self._agents[agent['agent_id']] = agent
+        self._external_ids.add(external_id)
+        return {key: agent[key] for key in ('agent_id', 'external_id', 'name', 'reputation', 'total_observations')}
+
+    async def registered_agents(self, agent_ids: Iterable[str]) -> Set[str]:
+        return {agent_id for agent_id in set(agent_ids) if uuid.UUID(agent_id) in self._agents}
+
+    # ------------------------------------------------------------ observations
+
+    def _insert(self, obs: Observation) -> uuid.UUID:
+        """One observation and everything the insert triggers maintain"""
+        agent = self._agents[uuid.UUID(obs.agent_id)]
+        confidence = Decimal(str(obs.confidence)).quantize(_E2, ROUND_HALF_UP)
+        agent['total_observations'] += 1
+        agent['reputation'] += 10 * confidence
+
+        latitude = float(Decimal(str(obs.latitude)).quantize(_E6, ROUND_HALF_UP))
+        longitude = float(Decimal(str(obs.longitude)).quantize(_E6, ROUND_HALF_UP))
+        self._points[spatial_cell_key(latitude, longitude)].append((latitude, longitude))
+
+        location = (to_e4(obs.latitude), to_e4(obs.longitude))
+        self._shape_order.setdefault(obs.observed_shape, len(self._shape_order))
+        shapes = self._stats.get(location)
+        if shapes is None:
+            shapes = self._stats[location] = {}
+            self._stats_cells[spatial_cell_key(location[0] / 1e4, location[1] / 1e4)].add(location)
+        totals = shapes.setdefault(obs.observed_shape, [0, 0])
+        totals[0] += 1
+        totals[1] += int(confidence.scaleb(2))
+
+        observers = self._observers[location]
+        if agent['agent_id'] not in observers:
+            observers.add(agent['agent_id'])
+            agent['unique_locations_observed'] += 1
+            if self._is_validated(location):
+                agent['validated_contributions'] += 1
+        return uuid.uuid4()
+
+    async def submit_observation(self, observation: Observation, recompute: bool) -> Optional[Dict[str, Any]]:
+        if uuid.UUID(observation.agent_id) not in self._agents:
+            return None
+        result = {'observation_id': self._insert(observation), 'observed_at': datetime.utcnow()}
+
+        recomputed = self._recompute([(observation.latitude, observation.longitude)], 0.0) if recompute else []
+        result['recomputed_locations'] = [(row['latitude'], row['longitude']) for row in recomputed]
+        result['any_status_changed'] = any(row['status_changed'] for row in recomputed)
+
+        consensus = self._consensus_row(
+            (to_e4(observation.latitude), to_e4(observation.longitude))
+        ) or {}
+        for column in ('consensus_shape', 'observation_count', 'consensus_percentage',
+                       'p_value', 'verification_status'):
+            result[column] = consensus.get(column)
+        return result
+
+    async def add_observations(self, observations: Sequence[Observation]) -> List[uuid.UUID]:
+        return [self._insert(obs) for obs in observations]
+
+    async def count_observations_near(self, latitude: float, longitude: float, radius_km: float) -> int:
+        cos_lat = math.cos(math.radians(latitude))
+        return sum(
+            1
+            for cell in spatial_neighbour_cells(latitude, longitude, radius_km)
+            for lat, lon in self._points.get(cell, ())
+            if math.hypot((lat - latitude) * KM_PER_DEGREE,
+                          (lon - longitude) * KM_PER_DEGREE * cos_lat) <= radius_km
+        )
+
+    # --------------------------------------------------------------- consensus
+
+    def _is_validated(self, location: Location) -> bool:
+        row = self._consensus.get(location)
+        return row is not None and row['verification_status'] in VALIDATED_STATUSES
+
+    def _calculate(self, location: Location) -> Optional[Dict[str, Any]]:
+        """calculate_consensus() for one location"""
+        lat_e4, lon_e4 = location
+        cos_lat = math.cos(math.radians(lat_e4 / 1e4))
+        totals: Dict[str, List[int]] = {}
+        for cell in spatial_neighbour_cells(lat_e4 / 1e4, lon_e4 / 1e4, self.radius_km):
+            for other in self._stats_cells.get(cell, ()):
+                if _distance_km(lat_e4, lon_e4, other[0], other[1], cos_lat) > self.radius_km:
+                    continue
+                for shape, (count, weight) in self._stats[other].items():
+                    shape_totals = totals.setdefault(shape, [0, 0])
+                    shape_totals[0] += count
+                    shape_totals[1] += weight
+
+        total = sum(count for count, _ in totals.values())
+        if total == 0:
+            return None
+        total_weight = sum(weight for _, weight in totals.values())
+        weighted = self.weighting == "confidence" and total_weight > 0
+        score = 1 if self.weighting == "confidence" else 0
+        top_shape, (top_count, top_weight) = min(
+            totals.items(), key=lambda item: (-item[1][score], self._shape_order[item[0]])
+        )
+        top, whole = (top_weight, total_weight) if weighted else (top_count, total)
+
+        p_value = float(consensus_p_value(top / whole, total))
+        return {
+            'consensus_shape': top_shape,
+            'observation_count': total,
+            # Half-up to 2 decimals, exactly, like the DECIMAL(5,2) column
+            'consensus_percentage': Decimal((top * 20000 + whole) // (2 * whole)).scaleb(-2),
+            # float8 -> numeric the way PostgreSQL casts it (15 digits, half up)
+            'p_value': Decimal(f"{p_value:.15g}").quantize(_P_VALUE_QUANTUM, ROUND_HALF_UP),
+        }
+
+    def _upsert(self, location: Location) -> bool:
+        """upsert_consensus() for one location; True if its status changed"""
+        consensus = self._calculate(location)
+        if consensus is None:
+            return False
+
+        previous = self._consensus.get(location)
+        previous_status = previous['verification_status'] if previous else None
+        was_validated = self._is_validated(location)
+        consensus['verification_status'] = verification_status(consensus['p_value'])
+        consensus['validated_at'] = datetime.utcnow() if consensus['p_value'] <= Decimal("0.01") else None
+        self._consensus[location] = consensus
+
+        # The status-change triggers: progress counter and observers' contributions
+        is_validated = consensus['verification_status'] in VALIDATED_STATUSES
+        if was_validated != is_validated:
+            delta = 1 if is_validated else -1
+            self._validated_locations += delta
+            for agent_id in self._observers.get(location, ()):
+                self._agents[agent_id]['validated_contributions'] += delta
+        return previous_status != consensus['verification_status']
+
+    def _recompute(self, cells: Sequence[Tuple[Any, Any]], margin_km: float) -> List[Dict[str, Any]]:
+        """update_consensus_cells(): each affected location once, in order"""
+        reach = self.radius_km + margin_km
+        affected: Set[Location] = set()
+        for lat, lon in cells:
+            point = (to_e4(lat), to_e4(lon))
+            for cell in spatial_neighbour_cells(float(lat), float(lon), reach):
+                for location in self._stats_cells.get(cell, ()):
+                    cos_lat = math.cos(math.radians(location[0] / 1e4))
+                    if _distance_km(location[0], location[1], point[0], point[1], cos_lat) <= reach:
+                        affected.add(location)
+        return [
+            {
+                'latitude': Decimal(location[0]).scaleb(-4),
+                'longitude': Decimal(location[1]).scaleb(-4),
+                'status_changed': self._upsert(location),
+            }
+            for location in sorted(affected)
+        ]
+
+    async def recompute_consensus(self, cells: Sequence[Tuple[Any, Any]], margin_km: Decimal) -> List[Dict[str, Any]]:
+        return self._recompute(cells, float(margin_km))
+
+    def _consensus_row(self, location: Location) -> Optional[Dict[str, Any]]:
+        row = self._consensus.get(location)
+        return dict(row) if row is not None else None
+
+    async def get_consensus(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        return self._consensus_row((to_e4(latitude), to_e4(longitude)))
+
+    # ------------------------------------------------------------- leaderboard
+
+    async def leaderboard_reputations(self) -> List[Tuple[str, Decimal]]:
+        return [(str(agent_id), agent['reputation']) for agent_id, agent in self._agents.items()]
+
+    async def leaderboard_page(self, limit: int, after: Optional[Tuple[Decimal, uuid.UUID]]) -> List[Dict[str, Any]]:
+        agents: Iterable[Dict[str, Any]] = self._agents.values()
+        if after is not None:
+            reputation, agent_id = after
+            agents = (
+                agent for agent in agents
+                if agent['reputation'] < reputation
+                or (agent['reputation'] == reputation and agent['agent_id'] > agent_id)
+            )
+        top = heapq.nsmallest(limit, agents, key=lambda agent: (-agent['reputation'], agent['agent_id']))
+        return [dict(agent) for agent in top]
+
+    async def leaderboard_rows(self, agent_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        agents = (self._agents.get(uuid.UUID(agent_id)) for agent_id in agent_ids)
+        return [dict(agent) for agent in agents if agent is not None]
+
+    async def agent_reputation(self, agent_id: str) -> Optional[Decimal]:
+        agent = self._agents.get(uuid.UUID(agent_id))
+        return agent['reputation'] if agent is not None else None
+
+    async def total_agents(self) -> int:
+        return len(self._agents)
+
+    # ---------------------------------------------------------------- progress
+
+    async def heavens_gates_progress(self) -> Optional[Dict[str, Any]]:
+        validated = self._validated_locations
+        return {
+            'validated_locations': validated,
+            'remaining_to_heaven': 10000 - validated,
+            'progress_percentage': Decimal(validated) / Decimal("10000.0") * 100,
+        }
@@ -5,8 +5,16 @@ Testing the Planetary Rosetta Stone MVP
 THE PACT: These tests must pass before ANY code ships.
 """
 
+import os
 import pytest
 from fastapi.testclient import TestClient
+
+# Recompute consensus inside /observe so assertions see it immediately
+os.environ.setdefault("CONSENSUS_MODE", "inline")
+# In-process storage, so the suite needs no database (STORAGE_BACKEND=postgres
+# with DATABASE_URL runs it against the real schema)
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
 from v3_main import app
 import asyncio
 
@@ -187,6 +195,174 @@ def test_multiple_observations_build_consensus():
     assert data["consensus_percentage"] > 50.0
 
 
+def test_strongly_verified_consensus():
+    """Test that a location many agents agree on reports a zero p-value as verified"""
+    for i in range(40):
+        agent_id = client.post("/register", json={
+            "external_id": f"verified_agent_{i}",
+            "name": f"VerifiedAgent{i}",
+            "framework": "custom"
+        }).json()["agent_id"]
+        obs_response = client.post("/observe", json={
+            "agent_id": agent_id,
+            "latitude": -41.7,
+            "longitude": 173.2,
+            "observed_shape": "dragon",
+            "confidence": 0.9
+        })
+        assert obs_response.status_code == 201
+    
+    response = client.get("/consensus/-41.7/173.2")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["verification_status"] == "verified"
+    assert data["p_value"] == 0.0
+    assert data["consensus_percentage"] == 100.0
+    assert "VERIFIED" in data["message"]
+    
+    # Served again from the response cache
+    assert client.get("/consensus/-41.7/173.2").json() == data
+
+
+def test_submit_observation_batch():
+    """Test that a batch is validated per item and valid items are stored"""
+    reg_response = client.post("/register", json={
+        "external_id": "batch_observer",
+        "name": "BatchObserver",
+        "framework": "custom"
+    })
+    agent_id = reg_response.json()["agent_id"]
+    
+    batch = [
+        {"agent_id": agent_id, "latitude": 12.5, "longitude": 60.1,
+         "observed_shape": "whale", "confidence": 0.8},
+        {"agent_id": agent_id, "latitude": 12.5, "longitude": 60.1,
+         "observed_shape": "whale", "confidence": 1.5},  # Invalid confidence
+        {"agent_id": "00000000-0000-0000-0000-000000000000", "latitude": 12.5,
+         "longitude": 60.1, "observed_shape": "whale", "confidence": 0.8},  # Unknown agent
+        {"agent_id": agent_id, "latitude": 12.5001, "longitude": 60.1,
+         "observed_shape": "whale", "confidence": 0.9},
+    ]
+    
+    response = client.post("/observe/batch", json=batch)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 2
+    assert data["rejected"] == 2
+    assert [r["status"] for r in data["results"]] == ["accepted", "rejected", "rejected", "accepted"]
+    assert "confidence" in data["results"][1]["error"]
+    assert "not found" in data["results"][2]["error"].lower()
+    assert data["results"][0]["observation_id"] is not None
+    
+    consensus_response = client.get("/consensus/12.5/60.1")
+    assert consensus_response.json()["consensus_shape"] == "whale"
+
+
+def test_shape_spellings_share_one_vote():
+    """Test that case, spacing and plurals do not split the consensus vote"""
+    reg_response = client.post("/register", json={
+        "external_id": "shape_speller",
+        "name": "ShapeSpeller",
+        "framework": "custom"
+    })
+    agent_id = reg_response.json()["agent_id"]
+    
+    batch = [
+        {"agent_id": agent_id, "latitude": 33.3, "longitude": -44.4,
+         "observed_shape": shape, "confidence": 0.9}
+        for shape in ["Sea Turtle", "sea_turtles", " sea  turtle ", "whale"]
+    ]
+    response = client.post("/observe/batch", json=batch)
+    assert response.json()["accepted"] == 4
+    
+    data = client.get("/consensus/33.3/-44.4").json()
+    assert data["consensus_shape"] == "sea turtle"
+    assert data["consensus_percentage"] == 75.0
+
+
+def test_submit_observation_rejects_blank_shape():
+    """Test that a shape with nothing left after normalization is rejected"""
+    response = client.post("/observe", json={
+        "agent_id": "00000000-0000-0000-0000-000000000000",
+        "latitude": 1.0,
+        "longitude": 1.0,
+        "observed_shape": " - ",
+        "confidence": 0.5
+    })
+    assert response.status_code == 422
+
+
+def test_submit_observation_batch_rejects_empty():
+    """Test that an empty batch is rejected"""
+    response = client.post("/observe/batch", json=[])
+    assert response.status_code == 400
+
+
+def test_submit_observation_stream():
+    """Test NDJSON streaming upload with progress and rejected lines"""
+    import json
+    
+    reg_response = client.post("/register", json={
+        "external_id": "stream_observer",
+        "name": "StreamObserver",
+        "framework": "custom"
+    })
+    agent_id = reg_response.json()["agent_id"]
+    
+    lines = [
+        json.dumps({"agent_id": agent_id, "latitude": -33.9, "longitude": 18.4,
+                    "observed_shape": "turtle", "confidence": 0.7}),
+        "{not json",
+        "",
+        json.dumps({"agent_id": agent_id, "latitude": -33.9, "longitude": 18.4,
+                    "observed_shape": "turtle", "confidence": 0.9}),
+    ]
+    
+    def body():
+        for line in lines:
+            yield (line + "\n").encode()
+    
+    response = client.post(
+        "/observe/stream",
+        content=body(),
+        headers={"Content-Type": "application/x-ndjson", "X-Upload-Id": "stream-test-1"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["upload_id"] == "stream-test-1"
+    assert data["status"] == "completed"
+    assert data["accepted"] == 2
+    assert data["rejected"] == 1
+    assert data["rejected_lines"][0]["line"] == 2
+    
+    progress = client.get("/observe/stream/stream-test-1")
+    assert progress.status_code == 200
+    assert progress.json()["accepted"] == 2
+
+
+def test_observation_stream_keeps_uploads_still_receiving(monkeypatch):
+    """Test that only finished uploads are forgotten past MAX_TRACKED_UPLOADS"""
+    from collections import OrderedDict
+    import v3_main
+    
+    running = v3_main.StreamIngestProgress(upload_id="still-receiving")
+    monkeypatch.setattr(v3_main, "stream_uploads", OrderedDict([("still-receiving", running)]))
+    monkeypatch.setattr(v3_main, "MAX_TRACKED_UPLOADS", 2)
+    
+    for upload_id in ("finished-1", "finished-2", "finished-3"):
+        response = client.post(
+            "/observe/stream", content=b"",
+            headers={"Content-Type": "application/x-ndjson", "X-Upload-Id": upload_id}
+        )
+        assert response.json()["status"] == "completed"
+    
+    assert list(v3_main.stream_uploads) == ["still-receiving", "finished-3"]
+    assert client.get("/observe/stream/still-receiving").json()["status"] == "receiving"
+    assert client.post(
+        "/observe/stream", content=b"", headers={"X-Upload-Id": "still-receiving"}
+    ).status_code == 409
+
+
 # ============================================================================
 # TEST SUITE 3: VISION API
 # ============================================================================
@@ -205,7 +381,9 @@ def test_get_vision_bathymetry():
     assert data["latitude"] == -11.0
     assert data["longitude"] == -87.0
     assert data["gebco_bathymetry_url"] is not None
-    assert "gebco.net" in data["gebco_bathymetry_url"].lower()
+    # Served through the local tile proxy, snapped to the tile grid
+    assert "/vision/bathymetry/" in data["gebco_bathymetry_url"]
+    assert data["gebco_bathymetry_url"].endswith(".png")
     assert "earth" in data["message"].lower()
 
 
@@ -279,6 +457,70 @@ def test_get_consensus_with_observations():
     assert data["consensus_shape"] is not None or data["verification_status"] == "emerging"
 
 
+def test_get_consensus_near_zero_is_invalidated_by_new_observations():
+    """Test that a cached miss just south of the equator clears when the location is observed"""
+    response = client.get("/consensus/-0.00001/33.25")
+    assert response.json()["observation_count"] == 0
+    
+    agent_id = client.post("/register", json={
+        "external_id": "negative_zero_test",
+        "name": "NegativeZeroAgent",
+        "framework": "custom"
+    }).json()["agent_id"]
+    client.post("/observe", json={
+        "agent_id": agent_id,
+        "latitude": 0.0,
+        "longitude": 33.25,
+        "observed_shape": "heron",
+        "confidence": 0.9
+    })
+    
+    response = client.get("/consensus/-0.00001/33.25")
+    
+    assert response.status_code == 200
+    assert response.json()["observation_count"] >= 1
+
+
+def test_get_consensus_pool_exhausted(monkeypatch):
+    """Test that a request which cannot get a connection fails fast with 503"""
+    import v3_main
+    from storage import StorageUnavailable
+    
+    async def unavailable(latitude, longitude):
+        raise StorageUnavailable("No read database connection free within 5.0s")
+    
+    backend = asyncio.run(v3_main.get_storage())
+    monkeypatch.setattr(backend, "get_consensus", unavailable)
+    
+    response = client.get("/consensus/-71.25/12.5")
+    
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert "no read database connection" in response.json()["detail"].lower()
+
+
+def test_get_consensus_validated_without_p_value(monkeypatch):
+    """Test that a validated row with no p-value still gets its message"""
+    import v3_main
+    
+    async def legacy_row(latitude, longitude):
+        return {
+            'consensus_shape': 'pyramid', 'observation_count': 12, 'consensus_percentage': 0,
+            'p_value': None, 'verification_status': 'validated', 'validated_at': None
+        }
+    
+    backend = asyncio.run(v3_main.get_storage())
+    monkeypatch.setattr(backend, "get_consensus", legacy_row)
+    
+    response = client.get("/consensus/-72.5/13.75")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["p_value"] is None
+    assert data["consensus_percentage"] == 0.0
+    assert data["message"] == "✅ Consensus validated! 12 agents confirm this pattern"
+
+
 # ============================================================================
 # TEST SUITE 5: LEADERBOARD & PROGRESS
 # ============================================================================
@@ -294,6 +536,128 @@ def test_get_leaderboard():
     assert isinstance(data["leaderboard"], list)
 
 
+def test_leaderboard_cursor_pagination():
+    """Pages chained through next_cursor never repeat or skip an agent"""
+    for i in range(3):
+        client.post("/register", json={
+            "external_id": f"test_paging_{i}",
+            "name": f"PagingAgent{i}",
+            "framework": "custom"
+        })
+    
+    seen = []
+    cursor = None
+    for _ in range(100):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/leaderboard", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["leaderboard"]) <= 2
+        seen.extend(entry["agent_id"] for entry in data["leaderboard"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    
+    assert len(seen) == len(set(seen))
+    assert len(seen) == data["total_agents"]
+
+
+def test_leaderboard_rejects_bad_paging():
+    """Oversized pages and malformed cursors are client errors"""
+    assert client.get("/leaderboard?limit=100000").status_code == 422
+    assert client.get("/leaderboard?cursor=not-a-cursor").status_code == 400
+
+
+def test_rank_index_matches_stored_reputations():
+    """Fractional confidences are credited to the rank index as the DECIMAL columns store them"""
+    import v3_main
+    credits = {
+        "a": [0.125] * 4,          # 4 x 1.30 stored, not 4 x 1.25
+        "b": [0.51],
+        "c": [0.335, 0.8765, 0.005],
+        "d": [0.675] * 3,
+        "e": [0.994, 0.445, 0.3349],
+    }
+    agent_ids = {}
+    for name, confidences in credits.items():
+        agent_ids[name] = client.post("/register", json={
+            "external_id": f"fractional_{name}",
+            "name": f"Fractional{name.upper()}",
+            "framework": "custom"
+        }).json()["agent_id"]
+        batch = [
+            {"agent_id": agent_ids[name], "latitude": -30.0 + i * 0.01, "longitude": 140.0,
+             "observed_shape": "spiral", "confidence": confidence}
+            for i, confidence in enumerate(confidences)
+        ]
+        assert client.post("/observe/batch", json=batch).json()["accepted"] == len(confidences)
+    
+    backend = asyncio.run(v3_main.get_storage())
+    ours = set(agent_ids.values())
+    stored = {agent: rep for agent, rep in asyncio.run(backend.leaderboard_reputations()) if agent in ours}
+    index = v3_main.rank_index
+    
+    assert {agent: index.reputation(agent) for agent in ours} == {agent: float(rep) for agent, rep in stored.items()}
+    index_order = [agent for _, agent, _ in index.slice(0, len(index)) if agent in ours]
+    assert index_order == sorted(ours, key=lambda agent: (-stored[agent], agent))
+    assert index.reputation(agent_ids["a"]) > index.reputation(agent_ids["b"])
+
+
+def test_rank_index_reload_keeps_credits_made_while_it_runs(monkeypatch):
+    """Reputation credited while the leaderboard is being fetched survives the swap"""
+    import v3_main
+    agent_id = client.post("/register", json={
+        "external_id": "reload_racer", "name": "ReloadRacer", "framework": "custom"
+    }).json()["agent_id"]
+    backend = asyncio.run(v3_main.get_storage())
+    fetch = backend.leaderboard_reputations
+    
+    async def fetch_then_credit():
+        rows = await fetch()
+        # An observation accepted after the leaderboard was read
+        v3_main.change_rank_index("increment", agent_id, 2.5)
+        return rows
+    
+    monkeypatch.setattr(backend, "leaderboard_reputations", fetch_then_credit)
+    old_index = v3_main.rank_index
+    asyncio.run(v3_main.load_rank_index())
+    
+    assert v3_main.rank_index is not old_index
+    assert v3_main.rank_index.reputation(agent_id) == old_index.reputation(agent_id)
+    assert v3_main.rank_index_replays == []
+
+
+def test_get_agent_rank():
+    """An agent's rank comes back with its neighbours"""
+    reg_response = client.post("/register", json={
+        "external_id": "test_rank_lookup",
+        "name": "RankLookupAgent",
+        "framework": "custom"
+    })
+    agent_id = reg_response.json()["agent_id"]
+    
+    response = client.get(f"/leaderboard/agent/{agent_id}?neighbours=2")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["agent"]["agent_id"] == agent_id
+    assert data["agent"]["rank"] >= 1
+    assert len(data["above"]) <= 2
+    assert len(data["below"]) <= 2
+    for entry in data["above"]:
+        assert entry["reputation"] >= data["agent"]["reputation"]
+    for entry in data["below"]:
+        assert entry["reputation"] <= data["agent"]["reputation"]
+
+
+def test_get_agent_rank_unknown_agent():
+    """Unknown agents return 404"""
+    response = client.get("/leaderboard/agent/00000000-0000-0000-0000-000000000000")
+    assert response.status_code == 404
+
+
 def test_heavens_gates_progress():
     """Test Heaven's Gates progress tracking"""
     response = client.get("/heavens-gates-progress")
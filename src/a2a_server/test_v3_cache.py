@@ -0,0 +1,128 @@
+"""
+A2A-World V3.0 Read Cache Tests
+Runs against an in-memory stand-in for Redis - no services required
+"""
+
+import asyncio
+import fnmatch
+import time
+
+from cache import LRUCache, ResponseCache
+
+
+class InMemoryRedis:
+    """The subset of redis.asyncio.Redis the cache uses"""
+
+    def __init__(self):
+        self.store = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis unavailable")
+
+    async def get(self, key):
+        self._check()
+        value, expires_at = self.store.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.store[key]
+            return None
+        return value
+
+    async def set(self, key, value, ex=None):
+        self._check()
+        self.store[key] = (value, time.monotonic() + ex if ex else None)
+
+    async def delete(self, *keys):
+        self._check()
+        for key in keys:
+            self.store.pop(key, None)
+
+    async def scan_iter(self, match="*"):
+        self._check()
+        for key in list(self.store):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+
+def test_read_through_hits_and_misses():
+    """A stored value is served from Redis and counted as a hit"""
+    redis = InMemoryRedis()
+    cache = ResponseCache(redis_client=redis)
+
+    async def scenario():
+        assert await cache.get("consensus:-11.0000:-87.0000") is None
+        await cache.set("consensus:-11.0000:-87.0000", {"consensus_shape": "tree"}, ttl=60)
+        return await cache.get("consensus:-11.0000:-87.0000")
+
+    assert asyncio.run(scenario()) == {"consensus_shape": "tree"}
+    assert "a2a:v3:consensus:-11.0000:-87.0000" in redis.store
+    stats = cache.stats()
+    assert stats["backend"] == "redis"
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_invalidation_drops_keys_and_prefixes():
+    """Invalidation removes single keys and whole key families"""
+    cache = ResponseCache(redis_client=InMemoryRedis())
+
+    async def scenario():
+        await cache.set("consensus:1.0000:2.0000", {}, ttl=60)
+        await cache.set("leaderboard:10", {"leaderboard": []}, ttl=60)
+        await cache.set("leaderboard:100", {"leaderboard": []}, ttl=60)
+        await cache.invalidate("consensus:1.0000:2.0000")
+        await cache.invalidate_prefix("leaderboard:")
+        return [
+            await cache.get("consensus:1.0000:2.0000"),
+            await cache.get("leaderboard:10"),
+            await cache.get("leaderboard:100"),
+        ]
+
+    assert asyncio.run(scenario()) == [None, None, None]
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_falls_back_to_local_lru_when_redis_fails():
+    """A Redis outage degrades to the in-process LRU instead of failing"""
+    redis = InMemoryRedis()
+    cache = ResponseCache(redis_client=redis, retry_seconds=60)
+    redis.fail = True
+
+    async def scenario():
+        await cache.set("heavens-gates-progress", {"validated_locations": 3}, ttl=60)
+        return await cache.get("heavens-gates-progress")
+
+    assert asyncio.run(scenario()) == {"validated_locations": 3}
+    stats = cache.stats()
+    assert stats["backend"] == "local"
+    assert stats["redis_errors"] == 1
+    assert stats["local_entries"] == 1
+
+
+def test_without_redis_uses_local_lru():
+    """No REDIS_URL means the LRU serves every request"""
+    cache = ResponseCache(redis_url=None)
+
+    async def scenario():
+        await cache.set("leaderboard:5", {"total_agents": 2}, ttl=60)
+        return await cache.get("leaderboard:5")
+
+    assert asyncio.run(scenario()) == {"total_agents": 2}
+    assert cache.backend == "local"
+
+
+def test_lru_evicts_least_recently_used_and_expires():
+    """The LRU is bounded and honours TTLs"""
+    lru = LRUCache(max_entries=2)
+    lru.set("a", "1", ttl=60)
+    lru.set("b", "2", ttl=60)
+    lru.get("a")
+    lru.set("c", "3", ttl=60)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == "1"
+    assert lru.evictions == 1
+
+    lru.set("short", "x", ttl=-1)
+    assert lru.get("short") is None
+    assert lru.expirations == 1
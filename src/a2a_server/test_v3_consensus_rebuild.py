@@ -0,0 +1,130 @@
+"""
+A2A-World V3.0 Consensus Rebuild Tests
+The vectorized rebuild against a direct transcription of calculate_consensus()
+"""
+
+import math
+import random
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pytest
+
+from consensus_rebuild import compute_consensus, round_micro_to_e4
+
+
+def cell_stats(observations):
+    """consensus_cell_stats rows for (lat_micro, lon_micro, shape, confidence_e2) observations"""
+    stats = defaultdict(lambda: [0, 0])
+    for lat, lon, shape, confidence_e2 in observations:
+        key = (int(round_micro_to_e4(lat)), int(round_micro_to_e4(lon)), shape)
+        stats[key][0] += 1
+        stats[key][1] += confidence_e2
+    return [(lat, lon, shape, n, w) for (lat, lon, shape), (n, w) in stats.items()]
+
+
+def reference_consensus(stats, radius_km=5.0, weighting="count"):
+    """calculate_consensus() for each location, one at a time"""
+    result = {}
+    for loc_lat, loc_lon in {(lat, lon) for lat, lon, _, _, _ in stats}:
+        cos_lat = math.cos(math.radians(loc_lat / 1e4))
+        shapes = defaultdict(lambda: [0, 0])
+        for lat, lon, shape, n, w in stats:
+            distance = math.sqrt(
+                ((lat - loc_lat) / 1e4 * 111.0) ** 2 + ((lon - loc_lon) / 1e4 * 111.0 * cos_lat) ** 2
+            )
+            if distance <= radius_km:
+                shapes[shape][0] += n
+                shapes[shape][1] += w
+        total = sum(n for n, _ in shapes.values())
+        total_weight = sum(w for _, w in shapes.values())
+        score = 1 if weighting == "confidence" else 0
+        top_shape, (top_count, top_weight) = min(
+            shapes.items(), key=lambda item: (-item[1][score], item[0])
+        )
+        if weighting == "confidence" and total_weight > 0:
+            share = Decimal(top_weight) / total_weight
+        else:
+            share = Decimal(top_count) / total
+        chi_square = total * (float(share) - 0.1) ** 2 / 0.1
+        p_value = math.erfc(math.sqrt(chi_square / 2)) if float(share) > 0.1 else 1.0
+        result[(loc_lat, loc_lon)] = (
+            top_shape, total, (share * 100).quantize(Decimal("0.01"), ROUND_HALF_UP), p_value
+        )
+    return result
+
+
+def clustered_observations(seed, n, centres, spread_deg=0.06, n_shapes=4):
+    rng = random.Random(seed)
+    observations = []
+    for _ in range(n):
+        lat, lon = rng.choice(centres)
+        observations.append((
+            int(round((lat + rng.uniform(-spread_deg, spread_deg)) * 1e6)),
+            int(round((lon + rng.uniform(-spread_deg, spread_deg)) * 1e6)),
+            rng.randrange(n_shapes),
+            rng.randrange(0, 101)
+        ))
+    return observations
+
+
+def assert_matches_reference(observations, radius_km=5.0, weighting="count", pair_budget=4_000_000):
+    stats = cell_stats(observations)
+    columns = (np.array(column) for column in zip(*stats))
+    table = compute_consensus(*columns, radius_km=radius_km, weighting=weighting, pair_budget=pair_budget)
+    expected = reference_consensus(stats, radius_km, weighting)
+
+    assert len(table) == len(expected)
+    for i in range(len(table)):
+        key = (int(table.latitude_e4[i]), int(table.longitude_e4[i]))
+        top_shape, total, percentage, p_value = expected[key]
+        assert table.top_shape[i] == top_shape
+        assert table.observation_count[i] == total
+        assert Decimal(int(table.percentage_e2[i])).scaleb(-2) == percentage
+        assert table.p_value[i] == pytest.approx(p_value, rel=2e-7, abs=1e-300)
+
+
+def test_rounding_matches_numeric_round():
+    """Half-way micro-degrees round away from zero"""
+    values = np.array([-11000050, -11000049, 11000050, 11000049, 0, 50, -50])
+    assert list(round_micro_to_e4(values)) == [-110001, -110000, 110001, 110000, 0, 1, -1]
+
+
+def test_matches_reference_on_clustered_data():
+    """Overlapping hotspots, where each location's radius spans many others"""
+    observations = clustered_observations(
+        11, 600, [(-11.0, -87.0), (-11.03, -87.02), (25.5, 45.3), (0.0, 179.9)]
+    )
+    assert_matches_reference(observations)
+
+
+def test_matches_reference_with_confidence_weighting():
+    observations = clustered_observations(14, 500, [(-11.0, -87.0), (-11.02, -87.01)])
+    assert_matches_reference(observations, weighting="confidence")
+
+
+def test_matches_reference_near_the_pole():
+    """High latitudes stretch the longitude reach of the radius"""
+    observations = clustered_observations(12, 300, [(89.9, 10.0), (89.93, -170.0), (-89.92, 0.0)])
+    assert_matches_reference(observations)
+
+
+def test_small_pair_budget_splits_blocks():
+    """Block splitting for dense hotspots does not change results"""
+    observations = clustered_observations(13, 400, [(48.85, 2.35)], spread_deg=0.03)
+    assert_matches_reference(observations, pair_budget=50)
+
+
+def test_unanimous_location_is_verified():
+    """Twenty agreeing observations at one spot clear the 0.001 threshold"""
+    table = compute_consensus([-110000], [-870000], [0], [20], [1700])
+
+    assert list(table.observation_count) == [20]
+    assert list(table.percentage_e2) == [10000]
+    assert table.p_value[0] < 1e-6
+
+
+def test_rejects_unknown_weighting():
+    with pytest.raises(ValueError):
+        compute_consensus([0], [0], [0], [1], [100], weighting="votes")
@@ -0,0 +1,52 @@
+"""
+A2A-World V3.0 Consensus Statistics Tests
+The exact p-value that replaced the four-step threshold ladder
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from consensus_stats import (
+    chi_square_p_value, consensus_p_value, erfc, verification_status
+)
+
+
+def test_erfc_matches_math_erfc():
+    """The schema's erfc fit stays within its documented 1.2e-7 fractional error"""
+    xs = np.linspace(0, 20, 20001)
+    expected = np.array([math.erfc(x) for x in xs])
+    assert np.max(np.abs(erfc(xs) - expected) / expected) < 1.2e-7
+
+
+def test_chi_square_p_value_at_ladder_thresholds():
+    """The old ladder's critical values map to (about) its p-values"""
+    p = chi_square_p_value([3.84, 6.63, 10.83])
+    assert p == pytest.approx([0.05, 0.01, 0.001], rel=0.01)
+
+
+def test_chi_square_p_value_edges():
+    p = chi_square_p_value([0.0, -1.0, 1e6])
+    assert list(p) == [1.0, 1.0, 0.0]
+
+
+def test_consensus_p_value_is_one_sided():
+    """Shares at or below a uniform pick are never significant"""
+    assert consensus_p_value(0.1, 1000) == 1.0
+    assert consensus_p_value(0.05, 1000) == 1.0
+    assert consensus_p_value(0.9, 0) == 1.0
+    # 15 of 20 agents agree: chi-square 20 * 0.65^2 / 0.1 = 84.5
+    assert consensus_p_value(0.75, 20) == pytest.approx(math.erfc(math.sqrt(84.5 / 2)), rel=2e-7)
+
+
+def test_p_value_shrinks_with_more_agreeing_observations():
+    p = consensus_p_value([0.5] * 4, [5, 10, 20, 40])
+    assert list(p) == sorted(p, reverse=True)
+
+
+def test_verification_status_thresholds():
+    assert verification_status(0.0005) == "verified"
+    assert verification_status(0.001) == "verified"
+    assert verification_status(0.005) == "validated"
+    assert verification_status(0.2) == "emerging"
@@ -0,0 +1,150 @@
+"""
+A2A-World V3.0 Consensus Engine Tests
+Dirty-cell coalescing, batching and failure handling
+"""
+
+import asyncio
+import time
+from decimal import Decimal
+
+import pytest
+
+from consensus_worker import ConsensusWorker, cell_for
+
+
+class RecordingRecompute:
+    """Stand-in for the database recompute that records each batch, failing the first `failures`"""
+
+    def __init__(self, failures=0):
+        self.batches = []
+        self.called_at = []
+        self.failures = failures
+
+    async def __call__(self, cells):
+        self.called_at.append(time.monotonic())
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(cells))
+
+
+def test_cell_for_rounds_to_consensus_precision():
+    """Cells use the same 4-decimal rounding as consensus_results"""
+    assert cell_for(-11.000049, -87.00004) == (Decimal("-11.0"), Decimal("-87.0"))
+    assert cell_for(10.12345, 120.98765) == (Decimal("10.1235"), Decimal("120.9877"))
+
+
+def test_repeated_marks_coalesce():
+    """A burst at one hotspot queues a single cell"""
+    recompute = RecordingRecompute()
+    worker = ConsensusWorker(recompute)
+
+    for _ in range(100):
+        worker.mark_dirty(-11.0, -87.0)
+    worker.mark_dirty(25.5, 45.3)
+
+    assert worker.queue_depth == 2
+    assert worker.marks_total == 101
+    assert worker.coalesced_total == 99
+
+    assert asyncio.run(worker.drain()) == 2
+    assert recompute.batches == [[cell_for(-11.0, -87.0), cell_for(25.5, 45.3)]]
+    assert worker.queue_depth == 0
+    assert worker.lag_seconds == 0.0
+
+
+def test_recompute_runs_in_batches():
+    """Dirty cells are flushed oldest first, batch_size at a time"""
+    recompute = RecordingRecompute()
+    worker = ConsensusWorker(recompute, batch_size=3)
+
+    for i in range(7):
+        worker.mark_dirty(float(i), 0.0)
+
+    asyncio.run(worker.run_once())
+    assert [lat for lat, _ in recompute.batches[0]] == [Decimal("0.0"), Decimal("1.0"), Decimal("2.0")]
+    assert worker.queue_depth == 4
+
+    asyncio.run(worker.drain())
+    assert [len(batch) for batch in recompute.batches] == [3, 3, 1]
+    assert worker.stats()["recomputed_total"] == 7
+
+
+def test_failed_batch_is_requeued():
+    """Cells survive a failed recompute and keep their original age"""
+    recompute = RecordingRecompute(failures=1)
+    worker = ConsensusWorker(recompute)
+    worker.mark_dirty(-11.0, -87.0)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(worker.run_once())
+
+    assert worker.queue_depth == 1
+    assert worker.failed_batches_total == 1
+    assert worker.lag_seconds > 0
+
+
+def test_background_loop_drains_queue():
+    """The started engine recomputes on its cadence and flushes on stop"""
+    recompute = RecordingRecompute()
+    worker = ConsensusWorker(recompute, interval_seconds=0.01)
+
+    async def scenario():
+        worker.start()
+        worker.mark_dirty(-11.0, -87.0)
+        await asyncio.sleep(0.05)
+        assert worker.running
+        worker.mark_dirty(35.0, 25.0)
+        await worker.stop()
+
+    asyncio.run(scenario())
+    assert not worker.running
+    assert worker.queue_depth == 0
+    assert sum(len(batch) for batch in recompute.batches) == 2
+
+
+def test_failed_batch_is_retried_first_and_reported():
+    """The background loop retries a failed batch ahead of newer cells"""
+    recompute = RecordingRecompute(failures=1)
+    worker = ConsensusWorker(recompute, interval_seconds=0.05, batch_size=1)
+
+    async def scenario():
+        worker.mark_dirty(-11.0, -87.0)
+        worker.mark_dirty(35.0, 25.0)
+        worker.start()
+        await asyncio.sleep(0.02)
+        # The first attempt failed; the oldest cell is still first in line
+        assert worker.stats()["failed_batches_total"] == 1
+        assert worker.queue_depth == 2
+        assert worker.lag_seconds >= 0.02
+        await asyncio.sleep(0.2)
+        assert worker.queue_depth == 0
+        await worker.stop()
+
+    asyncio.run(scenario())
+    assert recompute.batches == [[cell_for(-11.0, -87.0)], [cell_for(35.0, 25.0)]]
+    assert worker.stats()["recomputed_total"] == 2
+
+
+def test_background_loop_paces_until_a_full_batch_is_waiting():
+    """A backlog of full batches is worked off back to back, a partial one once per interval"""
+    recompute = RecordingRecompute()
+    worker = ConsensusWorker(recompute, interval_seconds=0.2, batch_size=2)
+    for i in range(6):
+        worker.mark_dirty(float(i), 0.0)
+
+    async def scenario():
+        worker.start()
+        await asyncio.sleep(0.05)
+        assert worker.queue_depth == 0
+        worker.mark_dirty(10.0, 0.0)
+        await asyncio.sleep(0.05)
+        # Below a batch: it waits for the next tick to coalesce with later marks
+        assert worker.queue_depth == 1
+        await asyncio.sleep(0.2)
+        await worker.stop()
+
+    asyncio.run(scenario())
+    assert [len(batch) for batch in recompute.batches] == [2, 2, 2, 1]
+    assert recompute.called_at[2] - recompute.called_at[0] < 0.05
+    assert recompute.called_at[3] - recompute.called_at[2] >= 0.19
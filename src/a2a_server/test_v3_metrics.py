@@ -0,0 +1,86 @@
+"""
+A2A-World V3.0 Metrics Tests
+The /metrics endpoint and its request, query and recompute instruments
+"""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+os.environ.setdefault("CONSENSUS_MODE", "inline")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from metrics import observe_query  # noqa: E402
+from v3_main import app  # noqa: E402
+
+client = TestClient(app)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_request_latency_is_labelled_by_route_template():
+    before = sample(
+        "a2a_v3_request_duration_seconds_count",
+        method="GET", route="/consensus/{latitude}/{longitude}", status="200"
+    )
+
+    client.get("/consensus/1.5/2.5")
+    client.get("/consensus/3.5/4.5")
+    client.get("/no-such-route")
+
+    assert sample(
+        "a2a_v3_request_duration_seconds_count",
+        method="GET", route="/consensus/{latitude}/{longitude}", status="200"
+    ) == before + 2
+    assert sample(
+        "a2a_v3_request_duration_seconds_count",
+        method="GET", route="unmatched", status="404"
+    ) >= 1
+
+    body = client.get("/metrics").text
+    assert "a2a_v3_request_duration_seconds_bucket" in body
+    assert "/consensus/1.5/2.5" not in body
+
+
+def test_batch_recompute_is_timed():
+    agent_id = client.post("/register", json={
+        "external_id": "metrics_agent", "name": "MetricsAgent", "framework": "custom"
+    }).json()["agent_id"]
+    before = sample("a2a_v3_consensus_recompute_seconds_count")
+    locations = sample("a2a_v3_consensus_recomputed_locations_total")
+
+    response = client.post("/observe/batch", json=[
+        {"agent_id": agent_id, "latitude": 7.7, "longitude": 8.8,
+         "observed_shape": "eye", "confidence": 0.8}
+    ])
+
+    assert response.status_code == 200
+    assert sample("a2a_v3_consensus_recompute_seconds_count") == before + 1
+    assert sample("a2a_v3_consensus_recomputed_locations_total") > locations
+
+
+def test_observe_query_records_failed_statements():
+    before = sample("a2a_v3_db_query_duration_seconds_count", statement="test_statement")
+
+    with observe_query("test_statement"):
+        pass
+    with pytest.raises(RuntimeError):
+        with observe_query("test_statement"):
+            raise RuntimeError("query failed")
+
+    assert sample("a2a_v3_db_query_duration_seconds_count", statement="test_statement") == before + 2
+
+
+def test_request_metrics_copies_match():
+    """The Visual Cortex API builds from its own directory with a copy of request_metrics.py"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    copy = os.path.join(here, "..", "visual_cortex_api", "request_metrics.py")
+    if not os.path.exists(copy):
+        pytest.skip("Visual Cortex API not checked out alongside (service image)")
+
+    with open(os.path.join(here, "request_metrics.py")) as ours, open(copy) as theirs:
+        assert ours.read() == theirs.read(), "request_metrics.py differs between the services; change both"
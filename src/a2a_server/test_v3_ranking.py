@@ -0,0 +1,89 @@
+"""
+A2A-World V3.0 Rank Index Tests
+Ranks, positions and neighbour windows against a brute-force sort
+"""
+
+import random
+
+from ranking import RankIndex
+
+
+def brute_force_order(reputations):
+    return sorted(reputations.items(), key=lambda item: (-item[1], item[0]))
+
+
+def brute_force_rank(reputations, agent_id):
+    return 1 + sum(1 for rep in reputations.values() if rep > reputations[agent_id])
+
+
+def test_rank_matches_sql_rank_with_ties():
+    """Tied agents share a rank and the next rank skips, like RANK()"""
+    index = RankIndex()
+    index.rebuild([("a", 50), ("b", 80), ("c", 50), ("d", 10)])
+
+    assert index.rank("b") == 1
+    assert index.rank("a") == 2
+    assert index.rank("c") == 2
+    assert index.rank("d") == 4
+    assert index.rank("missing") is None
+    # Ties are ordered by agent_id
+    assert index.position("a") == 1
+    assert index.position("c") == 2
+
+
+def test_around_returns_neighbours_in_leaderboard_order():
+    index = RankIndex()
+    index.rebuild([(f"agent{i:02d}", i) for i in range(20)])
+
+    window = index.around("agent10", 2)
+
+    assert [agent for _, agent, _ in window] == ["agent12", "agent11", "agent10", "agent09", "agent08"]
+    assert [position for position, _, _ in window] == [7, 8, 9, 10, 11]
+    # Windows are clipped at the top and bottom of the board
+    assert [agent for _, agent, _ in index.around("agent19", 2)] == ["agent19", "agent18", "agent17"]
+    assert [agent for _, agent, _ in index.around("agent00", 1)] == ["agent01", "agent00"]
+
+
+def test_increment_rounds_like_decimal_column():
+    """Repeated float increments stay on the DECIMAL(10,2) grid"""
+    index = RankIndex()
+    index.upsert("a", 0)
+    for _ in range(10):
+        index.increment("a", 10 * 0.07)
+    index.increment("unknown", 5)
+    # NUMERIC rounds half away from zero; round(0.125, 2) on the float gives 0.12
+    index.upsert("b", 0.125)
+
+    assert index.reputation("a") == 7.0
+    assert index.reputation("b") == 0.13
+    assert "unknown" not in index
+
+
+def test_random_updates_match_brute_force():
+    """Small buckets force many bucket splits and removals"""
+    rng = random.Random(8)
+    index = RankIndex(bucket_size=4)
+    reputations = {}
+
+    for step in range(3000):
+        agent_id = f"agent{rng.randrange(300):03d}"
+        action = rng.random()
+        if action < 0.1:
+            index.remove(agent_id)
+            reputations.pop(agent_id, None)
+        elif action < 0.5 and agent_id in reputations:
+            delta = round(rng.uniform(0, 10), 2)
+            index.increment(agent_id, delta)
+            reputations[agent_id] = round(reputations[agent_id] + delta, 2)
+        else:
+            reputation = float(rng.randrange(50))
+            index.upsert(agent_id, reputation)
+            reputations[agent_id] = reputation
+
+        if step % 100 == 0:
+            order = brute_force_order(reputations)
+            assert len(index) == len(reputations)
+            assert [(agent, rep) for _, agent, rep in index.slice(0, len(index))] == order
+            for position, (agent, _) in enumerate(order):
+                assert index.position(agent) == position
+                assert index.rank(agent) == brute_force_rank(reputations, agent)
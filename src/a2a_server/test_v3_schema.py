@@ -0,0 +1,264 @@
+"""
+A2A-World V3.0 Schema Tests
+The spatial prefilter and trigger-maintained tables of
+src/database/v3_simplified_schema.sql against brute-force recomputation
+
+Needs PostgreSQL: set DATABASE_URL. Each test loads the schema into a
+scratch schema of its own and drops it afterwards.
+"""
+
+import asyncio
+import math
+import os
+import random
+import uuid
+from decimal import Decimal
+
+import asyncpg
+import pytest
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "database", "v3_simplified_schema.sql")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="needs PostgreSQL (DATABASE_URL)")
+
+
+def with_schema(scenario):
+    """Run scenario(conn) against a freshly loaded copy of the schema"""
+    async def run():
+        conn = await asyncpg.connect(DATABASE_URL)
+        schema = f"schema_test_{uuid.uuid4().hex[:12]}"
+        try:
+            await conn.execute(f"CREATE SCHEMA {schema}")
+            await conn.execute(f"SET search_path TO {schema}, public")
+            with open(SCHEMA_PATH) as f:
+                await conn.execute(f.read())
+            return await scenario(conn)
+        finally:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            await conn.close()
+    return asyncio.run(run())
+
+
+# ============================================================================
+# Spatial prefilter
+# ============================================================================
+
+# Around the poles, where a radius spans every longitude, and at the
+# antimeridian, where the grid's columns end
+CENTRES = [
+    (89.99, 0.0), (-89.97, 123.4), (88.5, -45.0), (-87.9, 179.95),
+    (10.0, 179.99), (-33.3, -179.99), (0.0, 180.0), (90.0, -180.0),
+]
+RADII = [0.5, 5.0, 25.0]
+
+# The distance checks the prefilter serves: centred on the location
+# (calculate_consensus) and on the stored point (update_consensus_cells)
+DISTANCES = {
+    "centre": "SQRT(POWER((p.latitude - $1::numeric) * 111.0, 2) + "
+              "POWER((p.longitude - $2::numeric) * 111.0 * COS(RADIANS($1::numeric)), 2)) <= $3::numeric",
+    "point": "SQRT(POWER(($1::numeric - p.latitude) * 111.0, 2) + "
+             "POWER(($2::numeric - p.longitude) * 111.0 * COS(RADIANS(p.latitude)), 2)) <= $3::numeric",
+}
+
+
+def points_around(latitude, longitude, radius_km, rng, n=400):
+    """Points in and just beyond a radius (any longitude near a pole), plus the grid's edges"""
+    points = []
+    for _ in range(n):
+        lat = min(max(latitude + rng.uniform(-1.5, 1.5) * radius_km / 111.0, -90.0), 90.0)
+        if abs(latitude) > 85:
+            lon = rng.uniform(-180.0, 180.0)
+        else:
+            lon_span = radius_km / (111.0 * math.cos(math.radians(latitude)))
+            lon = min(max(longitude + rng.uniform(-1.5, 1.5) * lon_span, -180.0), 180.0)
+        points.append((round(lat, 6), round(lon, 6)))
+    return points + [(latitude, 180.0), (latitude, -180.0), (90.0, longitude), (-90.0, longitude)]
+
+
+@pytest.mark.parametrize("distance", sorted(DISTANCES))
+def test_neighbour_cells_match_a_brute_force_radius_scan(distance):
+    """Prefiltering on cell_key never drops a point inside the radius"""
+    rng = random.Random(3)
+
+    async def scenario(conn):
+        await conn.execute("""
+            CREATE TABLE points (
+                latitude DECIMAL(9,6) NOT NULL,
+                longitude DECIMAL(9,6) NOT NULL,
+                cell_key BIGINT NOT NULL
+            )
+        """)
+        found = 0
+        for latitude, longitude in CENTRES:
+            for radius_km in RADII:
+                await conn.execute("TRUNCATE points")
+                await conn.executemany(
+                    "INSERT INTO points VALUES ($1, $2, spatial_cell_key($1, $2))",
+                    [(Decimal(str(lat)), Decimal(str(lon))) for lat, lon in points_around(latitude, longitude, radius_km, rng)]
+                )
+                args = (Decimal(str(latitude)), Decimal(str(longitude)), Decimal(str(radius_km)))
+                brute_force = await conn.fetch(
+                    f"SELECT latitude, longitude FROM points p WHERE {DISTANCES[distance]} ORDER BY 1, 2", *args
+                )
+                prefiltered = await conn.fetch(
+                    "SELECT latitude, longitude FROM points p "
+                    f"WHERE cell_key = ANY(spatial_neighbour_cells($1, $2, $3)) AND {DISTANCES[distance]} ORDER BY 1, 2",
+                    *args
+                )
+                assert [tuple(row) for row in prefiltered] == [tuple(row) for row in brute_force], \
+                    (latitude, longitude, radius_km)
+                found += len(brute_force)
+        return found
+
+    assert with_schema(scenario) > 0
+
+
+# ============================================================================
+# Trigger-maintained tables
+# ============================================================================
+
+CELL_STATS = """
+    SELECT latitude, longitude, shape_id, observation_count, confidence_sum
+    FROM consensus_cell_stats ORDER BY 1, 2, 3
+"""
+LEADERBOARD = """
+    SELECT agent_id, external_id, name, total_observations, reputation,
+           unique_locations_observed, validated_contributions
+    FROM leaderboard ORDER BY agent_id
+"""
+
+
+async def observe_and_flip(conn):
+    """Agents observing three locations whose consensus status flips, is deleted and comes back"""
+    shapes = {row["name"]: row["shape_id"] for row in await conn.fetch("SELECT * FROM intern_shapes(ARRAY['whale', 'tree'])")}
+    agents = [
+        row["agent_id"] for row in await conn.fetch(
+            "INSERT INTO agents (external_id, name, framework) "
+            "SELECT 'schema_agent_' || i, 'Agent ' || i, 'custom' FROM generate_series(1, 5) i RETURNING agent_id"
+        )
+    ]
+    a, b, c = (Decimal("12.5000"), Decimal("60.1000")), (Decimal("-11.0000"), Decimal("-87.0000")), (Decimal("48.8500"), Decimal("2.3500"))
+
+    async def observe(rows):
+        await conn.executemany(
+            "INSERT INTO observations (agent_id, latitude, longitude, shape_id, confidence) VALUES ($1, $2, $3, $4, $5)",
+            [(agent, lat, lon, shapes[shape], Decimal(confidence)) for agent, (lat, lon), shape, confidence in rows]
+        )
+
+    async def set_status(location, status):
+        await conn.execute(
+            "INSERT INTO consensus_results (latitude, longitude, verification_status) VALUES ($1, $2, $3) "
+            "ON CONFLICT (latitude, longitude) DO UPDATE SET verification_status = EXCLUDED.verification_status",
+            *location, status
+        )
+
+    await observe([(agents[i], a, "whale", "0.90") for i in range(4)] + [(agents[0], b, "tree", "0.35")])
+    await set_status(a, "validated")
+    await set_status(b, "emerging")
+    await observe([(agents[4], a, "whale", "0.80"), (agents[1], b, "tree", "0.55"), (agents[2], c, "whale", "0.125")])
+    await set_status(b, "verified")
+    await set_status(a, "emerging")
+    await set_status(a, "verified")
+    await set_status(c, "published")
+    await conn.execute("DELETE FROM consensus_results WHERE latitude = $1 AND longitude = $2", *b)
+    await observe([(agents[3], c, "whale", "0.70")])
+    await conn.execute("DELETE FROM agents WHERE agent_id = $1", agents[4])
+    await conn.execute("SELECT upsert_consensus($1, $2, 5.0)", *b)
+    return agents
+
+
+def test_leaderboard_matches_a_rebuild_after_status_flips_and_deletes():
+    """The triggers leave the leaderboard exactly as refresh_leaderboard() rebuilds it"""
+    async def scenario(conn):
+        agents = await observe_and_flip(conn)
+        maintained = [tuple(row) for row in await conn.fetch(LEADERBOARD)]
+        await conn.execute("SELECT refresh_leaderboard()")
+        return agents, maintained, [tuple(row) for row in await conn.fetch(LEADERBOARD)]
+
+    agents, maintained, rebuilt = with_schema(scenario)
+    assert maintained == rebuilt
+    assert agents[4] not in {row[0] for row in maintained}
+    assert sum(row[-1] for row in maintained) > 0
+
+
+def test_world_counters_match_a_recount_after_status_flips_and_deletes():
+    """The counter triggers agree with reconcile_world_counters() however rows change"""
+    async def scenario(conn):
+        agents = await observe_and_flip(conn)
+        # Statement-level deletes of several rows at once
+        await conn.execute("DELETE FROM agents WHERE agent_id = ANY($1::uuid[])", agents[2:4])
+        await conn.execute(
+            "INSERT INTO consensus_results (latitude, longitude, verification_status) "
+            "SELECT i, i, CASE WHEN i % 2 = 0 THEN 'validated' ELSE 'emerging' END FROM generate_series(1, 6) i"
+        )
+        await conn.execute("UPDATE consensus_results SET verification_status = 'verified' WHERE latitude IN (1, 2)")
+        await conn.execute("DELETE FROM consensus_results WHERE latitude IN (3, 4, 5)")
+        maintained = dict(await conn.fetch("SELECT counter_name, value FROM world_counters"))
+        await conn.execute("SELECT reconcile_world_counters()")
+        return maintained, dict(await conn.fetch("SELECT counter_name, value FROM world_counters"))
+
+    maintained, recounted = with_schema(scenario)
+    assert maintained == recounted
+    assert maintained["agents"] > 0 and maintained["validated_locations"] > 0
+
+
+def test_cell_stats_match_a_refresh_after_observations_are_deleted():
+    """Observations deleted directly or with their agent leave no phantom votes behind"""
+    async def scenario(conn):
+        agents = await observe_and_flip(conn)
+        await conn.execute("DELETE FROM agents WHERE agent_id = ANY($1::uuid[])", agents[2:4])
+        await conn.execute("DELETE FROM observations WHERE agent_id = $1 AND latitude < 0", agents[1])
+        maintained = [tuple(row) for row in await conn.fetch(CELL_STATS)]
+        await conn.execute("SELECT refresh_cell_stats()")
+        return maintained, [tuple(row) for row in await conn.fetch(CELL_STATS)]
+
+    maintained, refreshed = with_schema(scenario)
+    assert maintained == refreshed
+    # Only the two deleted agents observed c
+    assert (Decimal("48.850000"), Decimal("2.350000")) not in {row[:2] for row in maintained}
+
+
+# ============================================================================
+# Concurrent writes
+# ============================================================================
+
+def test_concurrent_batches_over_shared_agents_do_not_deadlock():
+    """COPYs whose observations share agents wait for each other instead of deadlocking"""
+    async def scenario(conn):
+        schema = await conn.fetchval("SELECT current_schema()")
+        shape_id = await conn.fetchval("SELECT shape_id FROM intern_shapes(ARRAY['whale'])")
+        # Enough agents that the stats UPDATE visits them by index, in no fixed order
+        agents = [
+            row["agent_id"] for row in await conn.fetch(
+                "INSERT INTO agents (external_id, name, framework) "
+                "SELECT 'busy_agent_' || i, 'Agent ' || i, 'custom' FROM generate_series(1, 5000) i RETURNING agent_id"
+            )
+        ]
+        await conn.execute("ANALYZE")
+
+        async def writer(seed):
+            rng = random.Random(seed)
+            writer_conn = await asyncpg.connect(DATABASE_URL, server_settings={"search_path": f"{schema}, public"})
+            try:
+                for _ in range(10):
+                    await writer_conn.copy_records_to_table(
+                        "observations",
+                        records=[
+                            (rng.choice(agents[:200]), Decimal(f"{rng.uniform(-1, 1):.4f}"),
+                             Decimal(f"{rng.uniform(-1, 1):.4f}"), shape_id, Decimal("0.50"))
+                            for _ in range(200)
+                        ],
+                        columns=["agent_id", "latitude", "longitude", "shape_id", "confidence"]
+                    )
+            finally:
+                await writer_conn.close()
+
+        failures = [e for e in await asyncio.gather(*(writer(seed) for seed in range(6)), return_exceptions=True) if e]
+        return failures, await conn.fetchval(
+            "SELECT SUM(total_observations) FROM agents WHERE agent_id = ANY($1::uuid[])", agents
+        )
+
+    failures, observed = with_schema(scenario)
+    assert failures == []
+    assert observed == 6 * 10 * 200
@@ -0,0 +1,87 @@
+"""
+A2A-World V3.0 Shape Vocabulary Tests
+Normalization and the in-memory name <-> id cache
+"""
+
+import asyncio
+
+import pytest
+
+from shapes import ShapeVocabulary, normalize_shape
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Tree", "tree"),
+    ("tree ", "tree"),
+    ("trees", "tree"),
+    ("  Sea_Serpents ", "sea serpent"),
+    ("dragon-eye", "dragon eye"),
+    ("butterflies", "butterfly"),
+    ("foxes", "fox"),
+    ("crosses", "cross"),
+    ("horses", "horse"),
+    ("bus", "bus"),
+    ("octopus", "octopus"),
+    ("ibis", "ibis"),
+])
+def test_normalize_shape(raw, expected):
+    assert normalize_shape(raw) == expected
+
+
+def test_normalize_shape_is_idempotent():
+    """Re-normalizing in the database never changes an already normal name"""
+    for raw in ["Trees", "butterflies", "glasses", "eyes", "Sea Serpents", "cat's"]:
+        name = normalize_shape(raw)
+        assert normalize_shape(name) == name
+
+
+def test_normalize_shape_rejects_blank():
+    with pytest.raises(ValueError):
+        normalize_shape(" _- ")
+
+
+class RecordingConnection:
+    """Answers the vocabulary's two queries from a dict, counting round trips"""
+
+    def __init__(self):
+        self.shapes = {}
+        self.queries = 0
+
+    async def fetch(self, query, names_or_ids):
+        self.queries += 1
+        if "intern_shapes" in query:
+            for name in names_or_ids:
+                self.shapes.setdefault(name, len(self.shapes) + 1)
+            return [{"shape_id": self.shapes[n], "name": n} for n in names_or_ids]
+        return [
+            {"shape_id": shape_id, "name": name}
+            for name, shape_id in self.shapes.items() if shape_id in names_or_ids
+        ]
+
+
+def test_vocabulary_interns_once_then_serves_from_cache():
+    conn = RecordingConnection()
+    vocabulary = ShapeVocabulary()
+
+    async def scenario():
+        first = await vocabulary.ids_for(conn, ["tree", "serpent", "tree"])
+        again = await vocabulary.ids_for(conn, ["serpent"])
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    assert first == conn.shapes
+    assert again == {"serpent": first["serpent"]}
+    assert conn.queries == 1
+    assert vocabulary.name_of(first["serpent"]) == "serpent"
+
+
+def test_vocabulary_fetches_ids_interned_elsewhere():
+    """Consensus can name a shape another server process interned"""
+    conn = RecordingConnection()
+    conn.shapes = {"whale": 7}
+    vocabulary = ShapeVocabulary()
+
+    names = asyncio.run(vocabulary.names_for(conn, [7, None, 99]))
+
+    assert names == {7: "whale"}
+    assert vocabulary.id_of("whale") == 7
@@ -0,0 +1,267 @@
+"""
+A2A-World V3.0 Storage Tests
+The in-memory backend against the vectorized consensus rebuild and the
+schema's trigger-maintained counters
+"""
+
+import asyncio
+import random
+import uuid
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
+
+from consensus_rebuild import compute_consensus
+from storage import (
+    MemoryStorage, PostgresStorage, StorageBackend, StorageUnavailable, create_storage, to_e4
+)
+
+
+def observation(agent_id, latitude, longitude, shape, confidence=0.9):
+    return SimpleNamespace(
+        agent_id=agent_id, latitude=latitude, longitude=longitude,
+        observed_shape=shape, confidence=confidence,
+        visual_evidence_url=None, methodology=None
+    )
+
+
+def register(storage, n):
+    async def scenario():
+        return [
+            str((await storage.register_agent(f"agent_{i}", f"Agent {i}", "custom"))['agent_id'])
+            for i in range(n)
+        ]
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("weighting", ["count", "confidence"])
+def test_memory_consensus_matches_rebuild(weighting):
+    """Incremental recomputes land on the same rows as a full rebuild"""
+    storage = MemoryStorage(weighting=weighting)
+    agents = register(storage, 5)
+    rng = random.Random(21)
+    shapes = ["tree", "serpent", "eye", "whale"]
+    observations = [
+        observation(
+            rng.choice(agents),
+            round(lat + rng.uniform(-0.05, 0.05), 6),
+            round(lon + rng.uniform(-0.05, 0.05), 6),
+            rng.choice(shapes),
+            rng.randrange(0, 101) / 100
+        )
+        for lat, lon in [(-11.0, -87.0), (-11.03, -87.02), (48.85, 2.35)] * 100
+    ]
+    asyncio.run(storage.add_observations(observations))
+    asyncio.run(storage.recompute_consensus(
+        [(obs.latitude, obs.longitude) for obs in observations], Decimal("0.01")
+    ))
+
+    # Shape codes in first-seen order, so ties break the same way
+    codes = {}
+    for obs in observations:
+        codes.setdefault(obs.observed_shape, len(codes))
+    stats = {}
+    for obs in observations:
+        key = (to_e4(obs.latitude), to_e4(obs.longitude), codes[obs.observed_shape])
+        count, weight = stats.get(key, (0, 0))
+        stats[key] = (count + 1, weight + round(obs.confidence * 100))
+    columns = [np.array(column) for column in zip(*((*key, *value) for key, value in stats.items()))]
+    table = compute_consensus(*columns, weighting=weighting)
+    names = sorted(codes, key=codes.get)
+
+    for i in range(len(table)):
+        row = asyncio.run(storage.get_consensus(table.latitude_e4[i] / 1e4, table.longitude_e4[i] / 1e4))
+        assert row['consensus_shape'] == names[table.top_shape[i]]
+        assert row['observation_count'] == table.observation_count[i]
+        assert row['consensus_percentage'] == Decimal(int(table.percentage_e2[i])).scaleb(-2)
+        assert float(row['p_value']) == pytest.approx(table.p_value[i], abs=1e-8)
+
+
+def test_memory_tracks_validated_progress_and_contributions():
+    storage = MemoryStorage()
+    first, second = register(storage, 2)
+
+    async def scenario():
+        for _ in range(20):
+            await storage.submit_observation(observation(first, 10.0, 20.0, "eye"), recompute=True)
+        validated = await storage.heavens_gates_progress()
+        await storage.submit_observation(observation(second, 10.0, 20.0, "eye"), recompute=True)
+        rows = await storage.leaderboard_rows([first, second])
+        return validated, {str(row['agent_id']): row for row in rows}
+
+    validated, rows = asyncio.run(scenario())
+    assert validated['validated_locations'] == 1
+    assert validated['remaining_to_heaven'] == 9999
+    # The second agent observed a location that was already validated
+    assert rows[first]['validated_contributions'] == 1
+    assert rows[second]['validated_contributions'] == 1
+    assert rows[first]['unique_locations_observed'] == 1
+    assert rows[first]['reputation'] == Decimal("180.00")
+
+
+def test_memory_leaderboard_keyset_pages():
+    storage = MemoryStorage()
+    agents = register(storage, 7)
+    asyncio.run(storage.add_observations([
+        observation(agent_id, 0.0, float(i), "tree", 0.5) for i, agent_id in enumerate(agents[:4])
+    ]))
+
+    async def walk():
+        seen, after = [], None
+        while True:
+            page = await storage.leaderboard_page(3, after)
+            if not page:
+                return seen
+            seen.extend(page)
+            after = (page[-1]['reputation'], page[-1]['agent_id'])
+
+    rows = asyncio.run(walk())
+    assert len(rows) == 7
+    assert rows == sorted(rows, key=lambda row: (-row['reputation'], row['agent_id']))
+
+
+def test_memory_rejects_duplicates_and_unknown_agents():
+    storage = MemoryStorage()
+    register(storage, 1)
+
+    async def scenario():
+        duplicate = await storage.register_agent("agent_0", "Again", "custom")
+        unknown = await storage.submit_observation(
+            observation("00000000-0000-0000-0000-000000000000", 1.0, 1.0, "tree"), recompute=True
+        )
+        return duplicate, unknown
+
+    assert asyncio.run(scenario()) == (None, None)
+
+
+def test_create_storage_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        create_storage("cassandra")
+
+
+class FakeConnection:
+    """Answers every statement with an empty result, noting it on the pool"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def fetch(self, query, *args):
+        self.pool.statements.append(query)
+        return []
+
+    async def fetchrow(self, query, *args):
+        self.pool.statements.append(query)
+        return None
+
+    async def fetchval(self, query, *args):
+        self.pool.statements.append(query)
+        return None
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.pool.statements.append(f"COPY {table}")
+        list(records)
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class FakePool:
+    """Hands out connections that record their statements, or times out when exhausted"""
+
+    def __init__(self, exhausted=False):
+        self.exhausted = exhausted
+        self.statements = []
+        self.released = 0
+
+    async def acquire(self, timeout=None):
+        if self.exhausted:
+            raise asyncio.TimeoutError()
+        return FakeConnection(self)
+
+    async def release(self, conn):
+        self.released += 1
+
+
+def fake_postgres(write_exhausted=False):
+    storage = PostgresStorage("postgresql://primary/db", acquire_timeout=0.1)
+    storage.write_pool = FakePool(exhausted=write_exhausted)
+    storage.read_pool = FakePool()
+    storage.shapes.add([(1, "tree")])
+    return storage
+
+
+# Every statement-running backend method, with arguments and the name its statement is timed under
+POSTGRES_CALLS = {
+    "register_agent": (("agent_x", "X", "custom"), "register_agent"),
+    "registered_agents": (([str(uuid.uuid4())],), "registered_agents"),
+    "submit_observation": ((observation(str(uuid.uuid4()), 1.0, 1.0, "tree"), True), "submit_observation"),
+    "add_observations": (([observation(str(uuid.uuid4()), 1.0, 1.0, "tree")],), "copy_observations"),
+    "count_observations_near": ((1.0, 1.0, 5.0), "count_observations_near"),
+    "recompute_consensus": (([(Decimal("1.0000"), Decimal("1.0000"))], Decimal("0.01")), "update_consensus_cells"),
+    "get_consensus": ((1.0, 1.0), "get_consensus"),
+    "leaderboard_reputations": ((), "leaderboard_reputations"),
+    "leaderboard_page": ((10, (Decimal("1.00"), uuid.uuid4())), "leaderboard_page"),
+    "leaderboard_rows": (([str(uuid.uuid4())],), "leaderboard_rows"),
+    "agent_reputation": ((str(uuid.uuid4()),), "agent_reputation"),
+    "total_agents": ((), "total_agents"),
+    "heavens_gates_progress": ((), "heavens_gates_progress"),
+}
+
+
+def test_postgres_times_every_statement_on_a_pooled_connection():
+    """Each backend method runs its statement on a pooled connection under its timer"""
+    assert set(POSTGRES_CALLS) | {"connect", "close", "ping"} == StorageBackend.__abstractmethods__
+    storage = fake_postgres()
+
+    def timed(statement):
+        return REGISTRY.get_sample_value("a2a_v3_db_query_duration_seconds_count", {"statement": statement}) or 0.0
+
+    def ran():
+        return len(storage.write_pool.statements) + len(storage.read_pool.statements)
+
+    for method, (args, statement) in POSTGRES_CALLS.items():
+        before, statements = timed(statement), ran()
+        asyncio.run(getattr(storage, method)(*args))
+        assert timed(statement) == before + 1, method
+        assert ran() == statements + 1, method
+    assert storage.write_pool.released + storage.read_pool.released == len(POSTGRES_CALLS)
+
+
+def test_postgres_routes_reads_and_writes_to_their_pools():
+    storage = fake_postgres()
+
+    async def scenario():
+        await storage.total_agents()
+        await storage.agent_reputation(str(uuid.uuid4()))
+        await storage.register_agent("agent_x", "X", "custom")
+        # Cached until a recompute invalidates them, so never read from a lagging replica
+        await storage.get_consensus(1.0, 1.0)
+        await storage.leaderboard_reputations()
+
+    asyncio.run(scenario())
+    assert len(storage.read_pool.statements) == storage.read_pool.released == 2
+    assert len(storage.write_pool.statements) == storage.write_pool.released == 3
+
+
+def test_postgres_exhausted_pool_raises_unavailable():
+    """Writes are refused promptly while reads keep their own connections"""
+    storage = fake_postgres(write_exhausted=True)
+
+    with pytest.raises(StorageUnavailable):
+        asyncio.run(storage.register_agent("agent_x", "X", "custom"))
+    asyncio.run(storage.heavens_gates_progress())
+    assert len(storage.read_pool.statements) == 1
+    assert asyncio.run(storage.ping()) is False
+
+
+def test_create_storage_memory_ignores_postgres_settings():
+    storage = create_storage(
+        "memory", database_url="postgresql://primary/db",
+        read_database_url="postgresql://replica/db", max_size=5, read_max_size=50, acquire_timeout=1.0
+    )
+    assert isinstance(storage, MemoryStorage)
@@ -0,0 +1,193 @@
+"""
+A2A-World V3.0 Vision Tile Proxy Tests
+Grid snapping, the disk LRU, and the proxy endpoint against a local stand-in
+for the GEBCO WMS
+"""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("CONSENSUS_MODE", "inline")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+import v3_main  # noqa: E402
+from tile_proxy import (  # noqa: E402
+    DiskTileCache, TileProxy, UpstreamError, snap_to_tile, tile_bbox, wms_params
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+class StandInWMS:
+    """Answers GetMap like the GEBCO WMS, recording each request"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.fail:
+            return httpx.Response(
+                200, content=b"<ServiceExceptionReport/>", headers={"content-type": "text/xml"}
+            )
+        bbox = request.url.params["bbox"].encode()
+        return httpx.Response(200, content=PNG + bbox, headers={"content-type": "image/png"})
+
+    def proxy(self, directory, max_bytes=1024 ** 2) -> TileProxy:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self))
+        return TileProxy(DiskTileCache(str(directory), max_bytes), client=client)
+
+
+def test_nearby_points_share_a_tile():
+    assert snap_to_tile(-11.0, -87.0) == snap_to_tile(-11.1, -86.9)
+    assert snap_to_tile(-11.0, -87.0) != snap_to_tile(-11.3, -87.0)
+    south, west, north, east = tile_bbox(*snap_to_tile(-11.04, -87.0))
+    assert (south, west, north, east) == (-11.5, -87.5, -10.5, -86.5)
+
+
+def test_tiles_stay_inside_the_globe():
+    for latitude, longitude in [(90.0, 180.0), (-90.0, -180.0)]:
+        south, west, north, east = tile_bbox(*snap_to_tile(latitude, longitude))
+        assert -90 <= south < north <= 90
+        assert -180 <= west < east <= 180
+    with pytest.raises(ValueError):
+        tile_bbox(0, 0)
+
+
+def test_wms_bbox_is_latitude_first():
+    """WMS 1.3.0 with EPSG:4326 takes south,west,north,east"""
+    assert wms_params(*snap_to_tile(48.85, 2.35))["bbox"] == "48.25,1.75,49.25,2.75"
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskTileCache(str(tmp_path), max_bytes=250)
+    cache.put("a", b"a" * 100)
+    cache.put("b", b"b" * 100)
+    cache.get("a")
+    cache.put("c", b"c" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.total_bytes == 200
+    assert cache.evictions == 1
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_disk_cache_reloads_from_directory(tmp_path):
+    tile = DiskTileCache(str(tmp_path)).put("a", b"tile bytes")
+
+    reopened = DiskTileCache(str(tmp_path))
+
+    assert reopened.get("a") == tile
+    assert reopened.total_bytes == len(b"tile bytes")
+
+
+def test_disk_cache_removes_interrupted_writes(tmp_path):
+    (tmp_path / "tmpab12cd.tmp").write_bytes(b"half a tile")
+    (tmp_path / "notes.txt").write_bytes(b"not ours")
+
+    cache = DiskTileCache(str(tmp_path))
+
+    assert len(cache) == 0 and cache.total_bytes == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["notes.txt"]
+
+
+def test_proxy_fetches_each_tile_once(tmp_path):
+    wms = StandInWMS()
+    proxy = wms.proxy(tmp_path)
+
+    async def scenario():
+        first = await proxy.get(*snap_to_tile(-11.0, -87.0))
+        again = await proxy.get(*snap_to_tile(-11.1, -86.9))
+        _, content = await proxy.read(*snap_to_tile(-11.0, -87.0), again)
+        return first, again, content
+
+    first, again, content = asyncio.run(scenario())
+    assert first == again
+    assert content.startswith(PNG)
+    assert len(wms.requests) == 1
+    assert proxy.stats()["hits"] == 1
+
+
+def test_concurrent_misses_share_one_fetch(tmp_path):
+    wms = StandInWMS()
+    proxy = wms.proxy(tmp_path)
+
+    async def scenario():
+        return await asyncio.gather(*(proxy.get(400, 400) for _ in range(10)))
+
+    tiles = asyncio.run(scenario())
+    assert len(wms.requests) == 1
+    assert all(tile == tiles[0] for tile in tiles)
+    assert proxy.stats()["misses"] == 1 and proxy.stats()["coalesced"] == 9
+
+
+def test_concurrent_misses_share_a_failure_but_not_keep_it(tmp_path):
+    wms = StandInWMS(fail=True)
+    proxy = wms.proxy(tmp_path)
+
+    async def scenario():
+        results = await asyncio.gather(*(proxy.get(400, 400) for _ in range(5)), return_exceptions=True)
+        wms.fail = False
+        return results, await proxy.get(400, 400)
+
+    results, tile = asyncio.run(scenario())
+    assert all(isinstance(result, UpstreamError) for result in results)
+    assert tile.size > 0
+    assert len(wms.requests) == 2
+
+
+def test_proxy_refetches_a_tile_evicted_before_read(tmp_path):
+    wms = StandInWMS()
+    proxy = wms.proxy(tmp_path)
+
+    async def scenario():
+        tile = await proxy.get(400, 400)
+        os.unlink(tile.path)
+        return await proxy.read(400, 400, tile)
+
+    tile, content = asyncio.run(scenario())
+    assert os.path.exists(tile.path)
+    assert content.startswith(PNG)
+    assert len(wms.requests) == 2
+
+
+def test_proxy_rejects_service_exceptions(tmp_path):
+    proxy = StandInWMS(fail=True).proxy(tmp_path)
+
+    with pytest.raises(UpstreamError):
+        asyncio.run(proxy.get(400, 400))
+    assert len(proxy.cache) == 0
+
+
+def test_vision_tile_endpoint_serves_and_revalidates(tmp_path, monkeypatch):
+    wms = StandInWMS()
+    monkeypatch.setattr(v3_main, "tile_proxy", wms.proxy(tmp_path))
+    client = TestClient(v3_main.app)
+
+    vision = client.post("/vision", json={"latitude": 12.34, "longitude": 56.78})
+    url = vision.json()["gebco_bathymetry_url"]
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content.startswith(PNG)
+    etag = response.headers["etag"]
+
+    revalidated = client.get(url, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert len(wms.requests) == 1
+
+
+def test_vision_tile_endpoint_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(v3_main, "tile_proxy", StandInWMS(fail=True).proxy(tmp_path))
+    client = TestClient(v3_main.app)
+
+    assert client.get("/vision/bathymetry/400/400.png").status_code == 502
+    assert client.get("/vision/bathymetry/0/0.png").status_code == 404
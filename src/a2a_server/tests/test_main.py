@@ -240,6 +240,18 @@ def test_metrics_endpoint():
     assert "a2a_requests_total" in response.text
 
 
+def test_metrics_record_every_request_by_route():
+    """Test that requests are counted and timed by route template and status"""
+    client.get("/agents/no-such-agent")
+    client.get("/health")
+    
+    text = client.get("/metrics").text
+    assert 'a2a_requests_total{endpoint="/agents/{agent_id}",method="GET",status="404"}' in text
+    assert 'a2a_request_duration_seconds_count{endpoint="/health",method="GET",status="200"}' in text
+    assert 'a2a_response_size_bytes_count{endpoint="/health",method="GET",status="200"}' in text
+    assert "no-such-agent" not in text
+
+
 # ============================================================================
 # Cleanup
 # ============================================================================
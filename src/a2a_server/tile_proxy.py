@@ -0,0 +1,291 @@
+"""
+A2A-World V3.0 Vision Tile Proxy
+Serves GEBCO bathymetry images for /vision from a local disk cache.
+
+Agents asking about nearby coordinates used to each fetch their own
+1024x1024 render from the GEBCO WMS. Requests are now snapped to a fixed
+grid of 1° windows whose centres sit every 0.25°, so nearby coordinates
+share a tile; each tile is fetched from the WMS once and kept on disk in a
+size-bounded LRU. Tiles are immutable, so their ETag is a content hash and
+a client holding the current copy gets a 304.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GEBCO_WMS_URL = "https://www.gebco.net/data_and_products/gebco_web_services/web_map_service/"
+
+# Tile grid: 1° windows, centres every 0.25°, kept whole inside ±90°/±180°
+TILE_STEP_DEGREES = 0.25
+TILE_SPAN_DEGREES = 1.0
+TILE_PIXELS = 1024
+_EDGE_STEPS = int(TILE_SPAN_DEGREES / 2 / TILE_STEP_DEGREES)
+MAX_TILE_ROW = int(180 / TILE_STEP_DEGREES) - _EDGE_STEPS
+MAX_TILE_COL = int(360 / TILE_STEP_DEGREES) - _EDGE_STEPS
+MIN_TILE_INDEX = _EDGE_STEPS
+
+
+class UpstreamError(Exception):
+    """The WMS failed or did not return an image"""
+
+
+def snap_to_tile(latitude: float, longitude: float) -> Tuple[int, int]:
+    """The (row, col) of the tile whose centre is nearest a point"""
+    row = round((latitude + 90) / TILE_STEP_DEGREES)
+    col = round((longitude + 180) / TILE_STEP_DEGREES)
+    return (
+        min(max(row, MIN_TILE_INDEX), MAX_TILE_ROW),
+        min(max(col, MIN_TILE_INDEX), MAX_TILE_COL)
+    )
+
+
+def tile_bbox(row: int, col: int) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of a tile; raises ValueError off the grid"""
+    if not (MIN_TILE_INDEX <= row <= MAX_TILE_ROW and MIN_TILE_INDEX <= col <= MAX_TILE_COL):
+        raise ValueError(f"Tile {row}/{col} is outside the grid")
+    latitude = row * TILE_STEP_DEGREES - 90
+    longitude = col * TILE_STEP_DEGREES - 180
+    half = TILE_SPAN_DEGREES / 2
+    return latitude - half, longitude - half, latitude + half, longitude + half
+
+
+def wms_params(row: int, col: int) -> Dict[str, str]:
+    """GetMap query for a tile (WMS 1.3.0 orders EPSG:4326 bboxes lat,lon)"""
+    south, west, north, east = tile_bbox(row, col)
+    return {
+        "service": "WMS",
+        "version": "1.3.0",
+        "request": "GetMap",
+        "layers": "GEBCO_LATEST",
+        "styles": "",
+        "crs": "EPSG:4326",
+        "bbox": f"{south},{west},{north},{east}",
+        "width": str(TILE_PIXELS),
+        "height": str(TILE_PIXELS),
+        "format": "image/png",
+    }
+
+
+def wms_url(row: int, col: int, upstream_url: str = GEBCO_WMS_URL) -> str:
+    """Direct WMS URL for a tile, for clients that skip the proxy"""
+    return str(httpx.URL(upstream_url, params=wms_params(row, col)))
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class CachedTile(NamedTuple):
+    path: str
+    etag: str
+    size: int
+
+
+class DiskTileCache:
+    """
+    Size-bounded LRU of tile files in one directory.
+
+    Files are named <key>.<etag>.png, so the index (recency in memory, sizes
+    and ETags from file names) is rebuilt from a directory listing on
+    startup, with recency seeded from modification times. Lookups never
+    touch the disk. Temporary files left by writes that died mid-way are
+    removed on startup.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._entries: "OrderedDict[str, CachedTile]" = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        found = []
+        for entry in os.scandir(self.directory):
+            parts = entry.name.split(".")
+            if entry.name.endswith(".tmp") and entry.is_file():
+                self._unlink(entry.path)
+                continue
+            if len(parts) != 3 or parts[2] != "png" or not entry.is_file():
+                continue
+            stat = entry.stat()
+            found.append((stat.st_mtime, parts[0], CachedTile(entry.path, parts[1], stat.st_size)))
+        for _, key, tile in sorted(found):
+            self._entries[key] = tile
+            self.total_bytes += tile.size
+        self._evict()
+
+    def get(self, key: str) -> Optional[CachedTile]:
+        tile = self._entries.get(key)
+        if tile is not None:
+            self._entries.move_to_end(key)
+        return tile
+
+    def write(self, key: str, content: bytes) -> CachedTile:
+        """Write a tile file atomically (safe off the event loop; call add() after)"""
+        etag = hashlib.sha256(content).hexdigest()[:16]
+        path = os.path.join(self.directory, f"{key}.{etag}.png")
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return CachedTile(path, etag, len(content))
+
+    def add(self, key: str, tile: CachedTile) -> None:
+        """Index a written tile, evicting least recently used tiles past the limit"""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old.size
+            if old.path != tile.path:
+                self._unlink(old.path)
+        self._entries[key] = tile
+        self.total_bytes += tile.size
+        self._evict()
+
+    def put(self, key: str, content: bytes) -> CachedTile:
+        tile = self.write(key, content)
+        self.add(key, tile)
+        return tile
+
+    def discard(self, key: str, tile: CachedTile) -> None:
+        """Forget a tile whose file has gone, unless it was replaced meanwhile"""
+        if self._entries.get(key) == tile:
+            del self._entries[key]
+            self.total_bytes -= tile.size
+
+    def _evict(self) -> None:
+        # Never evict the newest tile, even if it alone exceeds the limit
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, tile = self._entries.popitem(last=False)
+            self.total_bytes -= tile.size
+            self.evictions += 1
+            self._unlink(tile.path)
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class TileProxy:
+    """
+    Read-through proxy from the tile grid to the GEBCO WMS.
+
+    Pass `client` to use an existing httpx.AsyncClient (tests pass one with
+    a local stand-in transport for the WMS).
+    """
+
+    def __init__(
+        self,
+        cache: DiskTileCache,
+        upstream_url: str = GEBCO_WMS_URL,
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 30.0
+    ):
+        self.cache = cache
+        self.upstream_url = upstream_url
+        self._client = client or httpx.AsyncClient(timeout=timeout)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_errors = 0
+
+    @staticmethod
+    def key(row: int, col: int) -> str:
+        return f"bathymetry_{row}_{col}"
+
+    async def get(self, row: int, col: int) -> CachedTile:
+        """
+        A tile from disk, fetching it from the WMS on a miss. Concurrent
+        misses for one tile share a single fetch; failures are not kept, so
+        every waiter sees the error and the next request tries again.
+        """
+        params = wms_params(row, col)  # Validates the tile before any I/O
+        key = self.key(row, col)
+        tile = self.cache.get(key)
+        if tile is not None:
+            self.hits += 1
+            return tile
+
+        fetch = self._in_flight.get(key)
+        if fetch is None:
+            self.misses += 1
+            fetch = asyncio.ensure_future(self._fetch(row, col, key, params))
+            self._in_flight[key] = fetch
+        else:
+            self.coalesced += 1
+        # Shielded: a caller that goes away does not cancel the others' fetch
+        return await asyncio.shield(fetch)
+
+    async def _fetch(self, row: int, col: int, key: str, params: Dict[str, str]) -> CachedTile:
+        try:
+            return await self._download(row, col, key, params)
+        finally:
+            del self._in_flight[key]
+
+    async def _download(self, row: int, col: int, key: str, params: Dict[str, str]) -> CachedTile:
+        try:
+            response = await self._client.get(self.upstream_url, params=params)
+        except httpx.HTTPError as e:
+            self.upstream_errors += 1
+            raise UpstreamError(f"GEBCO WMS request failed: {e}")
+        content_type = response.headers.get("content-type", "")
+        if response.status_code != 200 or not content_type.startswith("image/png"):
+            # WMS errors come back as XML service exceptions, often with a 200
+            self.upstream_errors += 1
+            raise UpstreamError(
+                f"GEBCO WMS returned {response.status_code} ({content_type or 'no content type'})"
+            )
+
+        tile = await asyncio.to_thread(self.cache.write, key, response.content)
+        self.cache.add(key, tile)
+        logger.info(f"🗺️ Cached bathymetry tile {row}/{col} ({tile.size} bytes)")
+        return tile
+
+    async def read(self, row: int, col: int, tile: CachedTile) -> Tuple[CachedTile, bytes]:
+        """A tile's bytes, fetching it again if it was evicted since get()"""
+        try:
+            return tile, await asyncio.to_thread(_read_file, tile.path)
+        except FileNotFoundError:
+            self.cache.discard(self.key(row, col), tile)
+        tile = await self.get(row, col)
+        return tile, await asyncio.to_thread(_read_file, tile.path)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "upstream_errors": self.upstream_errors,
+            "evictions": self.cache.evictions,
+            "tiles": len(self.cache),
+            "bytes": self.cache.total_bytes,
+            "max_bytes": self.cache.max_bytes,
+        }
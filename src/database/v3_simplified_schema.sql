@@ -38,6 +38,113 @@ CREATE TRIGGER update_agents_last_active
     FOR EACH ROW 
     EXECUTE FUNCTION update_last_active();
 
+-- ============================================================================
+-- TABLE 1b: SHAPES (The Vocabulary)
+-- ============================================================================
+
+-- Every distinct (normalized) shape name, interned once. Observations,
+-- statistics and consensus rows store the small integer id, so rows and
+-- indexes stay narrow and consensus groups by integer instead of string.
+CREATE TABLE IF NOT EXISTS shapes (
+    shape_id INT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name VARCHAR(255) UNIQUE NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Canonical shape name: lower case, separators collapsed to single spaces
+-- and a plural final word folded to the singular, so "Tree", "tree " and
+-- "trees" are one shape. Mirrors normalize_shape() in src/a2a_server/shapes.py.
+CREATE OR REPLACE FUNCTION normalize_shape(p_name TEXT)
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN n ~ '(\S{2,})ies$' THEN regexp_replace(n, '(\S{2,})ies$', '\1y')
+        WHEN n ~ '(\S+(ss|sh|ch|x|z))es$' THEN regexp_replace(n, '(\S+(ss|sh|ch|x|z))es$', '\1')
+        WHEN n ~ '(\S{2,}[^\s''ius])s$' THEN regexp_replace(n, '(\S{2,}[^\s''ius])s$', '\1')
+        ELSE n
+    END
+    FROM (SELECT btrim(regexp_replace(lower(p_name), '[\s_-]+', ' ', 'g')) AS n) normalized
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Ids for a set of shape names, interning any that are new. Safe under
+-- concurrent calls: a racing insert of the same name is waited for and its
+-- id returned.
+CREATE OR REPLACE FUNCTION intern_shapes(p_names TEXT[])
+RETURNS TABLE (
+    shape_id INT,
+    name VARCHAR(255)
+) AS $$
+#variable_conflict use_column
+BEGIN
+    INSERT INTO shapes (name)
+    SELECT DISTINCT normalize_shape(n) FROM unnest(p_names) AS n
+    WHERE normalize_shape(n) <> ''
+    ORDER BY 1
+    ON CONFLICT (name) DO NOTHING;
+    
+    RETURN QUERY
+    SELECT s.shape_id, s.name
+    FROM shapes s
+    WHERE s.name IN (SELECT normalize_shape(n) FROM unnest(p_names) AS n);
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- SPATIAL GRID: Fixed 0.05° cells (≈5.5km) for radius-query prefiltering
+-- ============================================================================
+
+-- Cells are numbered row-major over a 3600 x 7200 grid, so a radius query can
+-- be narrowed to the handful of cells its bounding box overlaps before the
+-- exact distance check runs.
+CREATE OR REPLACE FUNCTION spatial_cell_key(
+    p_latitude DECIMAL,
+    p_longitude DECIMAL
+)
+RETURNS BIGINT AS $$
+    SELECT LEAST(FLOOR((p_latitude + 90) / 0.05), 3599)::BIGINT * 7200
+         + LEAST(FLOOR((p_longitude + 180) / 0.05), 7199)::BIGINT
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Every cell overlapping the bounding box of a radius around a point. The
+-- longitude span is taken at the most poleward edge of the latitude band, so
+-- the box also covers distances measured from any centre inside it (as
+-- calculate_consensus does), and 0.0001° of slack absorbs coordinate rounding.
+CREATE OR REPLACE FUNCTION spatial_neighbour_cells(
+    p_latitude DECIMAL,
+    p_longitude DECIMAL,
+    p_radius_km DECIMAL
+)
+RETURNS BIGINT[] AS $$
+DECLARE
+    lat_span DOUBLE PRECISION;
+    lon_span DOUBLE PRECISION;
+    row_min INT;
+    row_max INT;
+    col_min INT;
+    col_max INT;
+BEGIN
+    lat_span := p_radius_km::DOUBLE PRECISION / 111.0 + 0.0001;
+    lon_span := p_radius_km::DOUBLE PRECISION / (111.0 * GREATEST(
+        COS(RADIANS(LEAST(ABS(p_latitude::DOUBLE PRECISION) + lat_span, 90.0))), 1e-9
+    )) + 0.0001;
+    
+    row_min := GREATEST(FLOOR((p_latitude - lat_span + 90) / 0.05), 0);
+    row_max := LEAST(FLOOR((p_latitude + lat_span + 90) / 0.05), 3599);
+    
+    IF lon_span >= 180 THEN
+        col_min := 0;
+        col_max := 7199;
+    ELSE
+        col_min := GREATEST(FLOOR((p_longitude - lon_span + 180) / 0.05), 0);
+        col_max := LEAST(FLOOR((p_longitude + lon_span + 180) / 0.05), 7199);
+    END IF;
+    
+    RETURN ARRAY(
+        SELECT r::BIGINT * 7200 + c
+        FROM generate_series(row_min, row_max) r, generate_series(col_min, col_max) c
+    );
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
 -- ============================================================================
 -- TABLE 2: OBSERVATIONS (The Raw Data)
 -- ============================================================================
@@ -47,35 +154,54 @@ CREATE TABLE IF NOT EXISTS observations (
     agent_id UUID REFERENCES agents(agent_id) ON DELETE CASCADE,
     latitude DECIMAL(9,6) NOT NULL,
     longitude DECIMAL(9,6) NOT NULL,
-    observed_shape VARCHAR(255) NOT NULL,
+    shape_id INT NOT NULL REFERENCES shapes(shape_id),
     confidence DECIMAL(3,2) CHECK (confidence >= 0 AND confidence <= 1),
     visual_evidence_url TEXT,
     methodology TEXT,
-    timestamp TIMESTAMP DEFAULT NOW()
+    timestamp TIMESTAMP DEFAULT NOW(),
+    cell_key BIGINT GENERATED ALWAYS AS (spatial_cell_key(latitude, longitude)) STORED
 );
 
 -- Indexes for spatial and temporal queries
 CREATE INDEX idx_observations_location ON observations(latitude, longitude);
+CREATE INDEX idx_observations_cell ON observations(cell_key);
 CREATE INDEX idx_observations_agent ON observations(agent_id);
-CREATE INDEX idx_observations_shape ON observations(observed_shape);
+CREATE INDEX idx_observations_shape ON observations(shape_id);
 CREATE INDEX idx_observations_timestamp ON observations(timestamp DESC);
 
 -- Trigger to increment agent observation count and reputation
+-- (statement-level, so a bulk COPY updates each agent row once, not once per observation)
 CREATE OR REPLACE FUNCTION increment_agent_stats()
 RETURNS TRIGGER AS $$
 BEGIN
-    UPDATE agents 
+    -- Lock the agents in key order first: the UPDATE below visits them in
+    -- whatever order its plan produces, and two COPYs sharing agents could
+    -- otherwise lock them in opposite orders and deadlock. NO KEY UPDATE,
+    -- like the UPDATE itself, so the inserts' foreign key checks still pass.
+    PERFORM 1
+    FROM agents
+    WHERE agent_id IN (SELECT agent_id FROM new_observations)
+    ORDER BY agent_id
+    FOR NO KEY UPDATE;
+
+    UPDATE agents a
     SET 
-        total_observations = total_observations + 1,
-        reputation = reputation + (10 * NEW.confidence)  -- Earn reputation based on confidence
-    WHERE agent_id = NEW.agent_id;
-    RETURN NEW;
+        total_observations = a.total_observations + n.observations,
+        reputation = a.reputation + n.reputation_earned  -- Earn reputation based on confidence
+    FROM (
+        SELECT agent_id, COUNT(*) as observations, SUM(10 * confidence) as reputation_earned
+        FROM new_observations
+        GROUP BY agent_id
+    ) n
+    WHERE a.agent_id = n.agent_id;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
 CREATE TRIGGER after_observation_insert
     AFTER INSERT ON observations
-    FOR EACH ROW
+    REFERENCING NEW TABLE AS new_observations
+    FOR EACH STATEMENT
     EXECUTE FUNCTION increment_agent_stats();
 
 -- ============================================================================
@@ -86,7 +212,7 @@ CREATE TABLE IF NOT EXISTS consensus_results (
     location_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     latitude DECIMAL(9,6) NOT NULL,
     longitude DECIMAL(9,6) NOT NULL,
-    consensus_shape VARCHAR(255),
+    consensus_shape_id INT REFERENCES shapes(shape_id),
     observation_count INT DEFAULT 0,
     consensus_percentage DECIMAL(5,2),
     p_value DECIMAL(10,8),
@@ -107,43 +233,424 @@ CREATE INDEX idx_consensus_status ON consensus_results(verification_status);
 CREATE INDEX idx_consensus_pvalue ON consensus_results(p_value);
 
 -- Trigger to update updated_at
+CREATE OR REPLACE FUNCTION update_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
 CREATE TRIGGER update_consensus_updated_at 
     BEFORE UPDATE ON consensus_results
     FOR EACH ROW 
-    EXECUTE FUNCTION update_last_active();
+    EXECUTE FUNCTION update_updated_at();
 
 -- ============================================================================
--- MATERIALIZED VIEW: Leaderboard
+-- TABLE 3b: CONSENSUS CELL STATISTICS (Sufficient statistics per location)
 -- ============================================================================
 
-CREATE MATERIALIZED VIEW leaderboard AS
-SELECT 
-    a.agent_id,
-    a.external_id,
-    a.name,
-    a.framework,
-    a.total_observations,
-    a.reputation,
-    COUNT(DISTINCT o.observation_id) as unique_locations_observed,
-    COUNT(DISTINCT CASE WHEN cr.verification_status IN ('validated', 'verified', 'published') 
-                        THEN cr.location_id END) as validated_contributions,
-    RANK() OVER (ORDER BY a.reputation DESC) as rank
-FROM agents a
-LEFT JOIN observations o ON a.agent_id = o.agent_id
-LEFT JOIN consensus_results cr ON 
-    ROUND(o.latitude::numeric, 4) = ROUND(cr.latitude::numeric, 4) AND
-    ROUND(o.longitude::numeric, 4) = ROUND(cr.longitude::numeric, 4)
-GROUP BY a.agent_id, a.external_id, a.name, a.framework, a.total_observations, a.reputation
-ORDER BY a.reputation DESC;
+-- Per rounded location and shape: how many observations were made there and
+-- their summed confidence. A new observation touches exactly one row, and
+-- consensus is computed from these rows rather than raw observations, so
+-- neither the write path nor a recompute ever scans the observations table.
+-- Both sums are always kept, so confidence weighting costs nothing extra.
+CREATE TABLE IF NOT EXISTS consensus_cell_stats (
+    latitude DECIMAL(9,6) NOT NULL,
+    longitude DECIMAL(9,6) NOT NULL,
+    shape_id INT NOT NULL,
+    observation_count INT NOT NULL DEFAULT 0,
+    confidence_sum DECIMAL(14,2) NOT NULL DEFAULT 0,
+    cell_key BIGINT GENERATED ALWAYS AS (spatial_cell_key(latitude, longitude)) STORED,
+    PRIMARY KEY (latitude, longitude, shape_id)
+);
+
+CREATE INDEX idx_consensus_cell_stats_cell ON consensus_cell_stats(cell_key);
+
+-- Fold each statement's new observations into the statistics (sorted, so
+-- concurrent batches lock shared rows in the same order)
+CREATE OR REPLACE FUNCTION accumulate_cell_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO consensus_cell_stats (
+        latitude, longitude, shape_id, observation_count, confidence_sum
+    )
+    SELECT 
+        ROUND(latitude::numeric, 4),
+        ROUND(longitude::numeric, 4),
+        shape_id,
+        COUNT(*),
+        COALESCE(SUM(confidence), 0)
+    FROM new_observations
+    GROUP BY 1, 2, 3
+    ORDER BY 1, 2, 3
+    ON CONFLICT (latitude, longitude, shape_id) DO UPDATE SET
+        observation_count = consensus_cell_stats.observation_count + EXCLUDED.observation_count,
+        confidence_sum = consensus_cell_stats.confidence_sum + EXCLUDED.confidence_sum;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER after_observation_accumulate_stats
+    AFTER INSERT ON observations
+    REFERENCING NEW TABLE AS new_observations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION accumulate_cell_stats();
+
+-- Take each statement's deleted observations back out of the statistics,
+-- including those removed by the cascade from a deleted agent, and drop rows
+-- left with no observations (rows are locked in key order first, as above)
+CREATE OR REPLACE FUNCTION deduct_cell_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM 1
+    FROM consensus_cell_stats s
+    WHERE (s.latitude, s.longitude, s.shape_id) IN (
+        SELECT ROUND(latitude::numeric, 4), ROUND(longitude::numeric, 4), shape_id
+        FROM old_observations
+    )
+    ORDER BY s.latitude, s.longitude, s.shape_id
+    FOR UPDATE;
+
+    UPDATE consensus_cell_stats s SET
+        observation_count = s.observation_count - d.observation_count,
+        confidence_sum = s.confidence_sum - d.confidence_sum
+    FROM (
+        SELECT 
+            ROUND(latitude::numeric, 4) AS latitude,
+            ROUND(longitude::numeric, 4) AS longitude,
+            shape_id,
+            COUNT(*) AS observation_count,
+            COALESCE(SUM(confidence), 0) AS confidence_sum
+        FROM old_observations
+        GROUP BY 1, 2, 3
+    ) d
+    WHERE s.latitude = d.latitude AND s.longitude = d.longitude AND s.shape_id = d.shape_id;
+
+    DELETE FROM consensus_cell_stats s
+    WHERE s.observation_count <= 0
+      AND (s.latitude, s.longitude, s.shape_id) IN (
+        SELECT ROUND(latitude::numeric, 4), ROUND(longitude::numeric, 4), shape_id
+        FROM old_observations
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER after_observation_deduct_stats
+    AFTER DELETE ON observations
+    REFERENCING OLD TABLE AS old_observations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION deduct_cell_stats();
+
+-- Rebuild the statistics from the observations (migration / reconciliation)
+CREATE OR REPLACE FUNCTION refresh_cell_stats()
+RETURNS void AS $$
+BEGIN
+    TRUNCATE consensus_cell_stats;
+    INSERT INTO consensus_cell_stats (
+        latitude, longitude, shape_id, observation_count, confidence_sum
+    )
+    SELECT 
+        ROUND(latitude::numeric, 4),
+        ROUND(longitude::numeric, 4),
+        shape_id,
+        COUNT(*),
+        COALESCE(SUM(confidence), 0)
+    FROM observations
+    GROUP BY 1, 2, 3;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- TABLE 4: LEADERBOARD (Maintained incrementally by triggers)
+-- ============================================================================
+
+-- One row per agent, kept current as reputation and contributions change, so
+-- reading the top of the board is an index range scan instead of a rebuild.
+CREATE TABLE IF NOT EXISTS leaderboard (
+    agent_id UUID PRIMARY KEY REFERENCES agents(agent_id) ON DELETE CASCADE,
+    external_id VARCHAR(255) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    framework VARCHAR(100),
+    total_observations INT DEFAULT 0,
+    reputation DECIMAL(10,2) DEFAULT 0,
+    unique_locations_observed INT DEFAULT 0,
+    validated_contributions INT DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Ranking order; agent_id breaks ties so pages are stable
+CREATE INDEX idx_leaderboard_reputation ON leaderboard(reputation DESC, agent_id);
+
+-- Distinct (rounded) locations each agent has observed
+CREATE TABLE IF NOT EXISTS agent_locations (
+    agent_id UUID REFERENCES agents(agent_id) ON DELETE CASCADE,
+    latitude DECIMAL(9,6) NOT NULL,
+    longitude DECIMAL(9,6) NOT NULL,
+    PRIMARY KEY (agent_id, latitude, longitude)
+);
 
--- Index on materialized view
-CREATE INDEX idx_leaderboard_rank ON leaderboard(rank);
+CREATE INDEX idx_agent_locations_location ON agent_locations(latitude, longitude);
+
+-- Mirror agent identity, reputation and observation count into the leaderboard
+CREATE OR REPLACE FUNCTION sync_leaderboard_agent()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO leaderboard (
+        agent_id, external_id, name, framework, total_observations, reputation
+    ) VALUES (
+        NEW.agent_id, NEW.external_id, NEW.name, NEW.framework,
+        NEW.total_observations, NEW.reputation
+    )
+    ON CONFLICT (agent_id) DO UPDATE SET
+        external_id = EXCLUDED.external_id,
+        name = EXCLUDED.name,
+        framework = EXCLUDED.framework,
+        total_observations = EXCLUDED.total_observations,
+        reputation = EXCLUDED.reputation,
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER after_agent_change_sync_leaderboard
+    AFTER INSERT OR UPDATE OF external_id, name, framework, total_observations, reputation ON agents
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_leaderboard_agent();
 
--- Function to refresh leaderboard (call periodically)
+-- Count each agent's newly observed locations (and those already validated)
+CREATE OR REPLACE FUNCTION track_agent_locations()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Lock the batch's leaderboard rows in key order and insert its locations
+    -- sorted, so concurrent COPYs sharing agents wait for each other instead
+    -- of taking the same rows in opposite orders and deadlocking
+    PERFORM 1
+    FROM leaderboard
+    WHERE agent_id IN (SELECT agent_id FROM new_observations)
+    ORDER BY agent_id
+    FOR NO KEY UPDATE;
+
+    WITH new_locations AS (
+        INSERT INTO agent_locations (agent_id, latitude, longitude)
+        SELECT DISTINCT 
+            agent_id,
+            ROUND(latitude::numeric, 4),
+            ROUND(longitude::numeric, 4)
+        FROM new_observations
+        ORDER BY 1, 2, 3
+        ON CONFLICT DO NOTHING
+        RETURNING agent_id, latitude, longitude
+    )
+    UPDATE leaderboard l
+    SET 
+        unique_locations_observed = l.unique_locations_observed + n.locations,
+        validated_contributions = l.validated_contributions + n.validated,
+        updated_at = NOW()
+    FROM (
+        SELECT 
+            nl.agent_id,
+            COUNT(*) as locations,
+            COUNT(cr.location_id) as validated
+        FROM new_locations nl
+        LEFT JOIN consensus_results cr ON 
+            cr.latitude = nl.latitude AND
+            cr.longitude = nl.longitude AND
+            cr.verification_status IN ('validated', 'verified', 'published')
+        GROUP BY nl.agent_id
+    ) n
+    WHERE l.agent_id = n.agent_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER after_observation_track_locations
+    AFTER INSERT ON observations
+    REFERENCING NEW TABLE AS new_observations
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION track_agent_locations();
+
+-- When a location enters (or leaves, including by deletion) validated
+-- status, credit (or debit) every agent who observed it
+CREATE OR REPLACE FUNCTION track_validated_contributions()
+RETURNS TRIGGER AS $$
+DECLARE
+    was_validated BOOLEAN := FALSE;
+    is_validated BOOLEAN := FALSE;
+    location consensus_results%ROWTYPE;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        was_validated := OLD.verification_status IN ('validated', 'verified', 'published');
+        location := OLD;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        is_validated := NEW.verification_status IN ('validated', 'verified', 'published');
+        location := NEW;
+    END IF;
+    
+    IF was_validated IS DISTINCT FROM is_validated THEN
+        -- Observers' rows in key order, as track_agent_locations locks them
+        PERFORM 1
+        FROM leaderboard l
+        JOIN agent_locations al ON l.agent_id = al.agent_id
+        WHERE al.latitude = location.latitude AND al.longitude = location.longitude
+        ORDER BY l.agent_id
+        FOR NO KEY UPDATE OF l;
+
+        UPDATE leaderboard l
+        SET 
+            validated_contributions = l.validated_contributions + 
+                CASE WHEN is_validated THEN 1 ELSE -1 END,
+            updated_at = NOW()
+        FROM agent_locations al
+        WHERE 
+            al.latitude = location.latitude AND
+            al.longitude = location.longitude AND
+            l.agent_id = al.agent_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER after_consensus_status_change
+    AFTER INSERT OR UPDATE OF verification_status OR DELETE ON consensus_results
+    FOR EACH ROW
+    EXECUTE FUNCTION track_validated_contributions();
+
+-- Rebuild the leaderboard from the base tables (reconciliation; the triggers
+-- keep it current in normal operation)
 CREATE OR REPLACE FUNCTION refresh_leaderboard()
 RETURNS void AS $$
 BEGIN
-    REFRESH MATERIALIZED VIEW CONCURRENTLY leaderboard;
+    INSERT INTO agent_locations (agent_id, latitude, longitude)
+    SELECT DISTINCT agent_id, ROUND(latitude::numeric, 4), ROUND(longitude::numeric, 4)
+    FROM observations
+    ON CONFLICT DO NOTHING;
+    
+    INSERT INTO leaderboard (
+        agent_id, external_id, name, framework, total_observations, reputation,
+        unique_locations_observed, validated_contributions
+    )
+    SELECT 
+        a.agent_id, a.external_id, a.name, a.framework,
+        a.total_observations, a.reputation,
+        COUNT(al.agent_id),
+        COUNT(cr.location_id)
+    FROM agents a
+    LEFT JOIN agent_locations al ON al.agent_id = a.agent_id
+    LEFT JOIN consensus_results cr ON 
+        cr.latitude = al.latitude AND
+        cr.longitude = al.longitude AND
+        cr.verification_status IN ('validated', 'verified', 'published')
+    GROUP BY a.agent_id, a.external_id, a.name, a.framework, a.total_observations, a.reputation
+    ON CONFLICT (agent_id) DO UPDATE SET
+        external_id = EXCLUDED.external_id,
+        name = EXCLUDED.name,
+        framework = EXCLUDED.framework,
+        total_observations = EXCLUDED.total_observations,
+        reputation = EXCLUDED.reputation,
+        unique_locations_observed = EXCLUDED.unique_locations_observed,
+        validated_contributions = EXCLUDED.validated_contributions,
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- TABLE 5: WORLD COUNTERS (Maintained totals, so nothing counts whole tables)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS world_counters (
+    counter_name VARCHAR(50) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+INSERT INTO world_counters (counter_name, value) VALUES
+    ('agents', 0),
+    ('validated_locations', 0)
+ON CONFLICT DO NOTHING;
+
+-- One counter update per statement, however many agents it inserts or deletes
+CREATE OR REPLACE FUNCTION count_agents()
+RETURNS TRIGGER AS $$
+DECLARE
+    delta BIGINT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT COUNT(*) INTO delta FROM changed_agents;
+    ELSE
+        SELECT -COUNT(*) INTO delta FROM changed_agents;
+    END IF;
+    
+    IF delta <> 0 THEN
+        UPDATE world_counters
+        SET value = value + delta, updated_at = NOW()
+        WHERE counter_name = 'agents';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER after_agent_insert_count
+    AFTER INSERT ON agents
+    REFERENCING NEW TABLE AS changed_agents
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_agents();
+
+CREATE TRIGGER after_agent_delete_count
+    AFTER DELETE ON agents
+    REFERENCING OLD TABLE AS changed_agents
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_agents();
+
+-- Locations in validated (or better) status, for Heaven's Gates progress;
+-- only status transitions touch the counter
+CREATE OR REPLACE FUNCTION count_validated_locations()
+RETURNS TRIGGER AS $$
+DECLARE
+    was_validated BOOLEAN := FALSE;
+    is_validated BOOLEAN := FALSE;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        was_validated := OLD.verification_status IN ('validated', 'verified', 'published');
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        is_validated := NEW.verification_status IN ('validated', 'verified', 'published');
+    END IF;
+    
+    IF was_validated IS DISTINCT FROM is_validated THEN
+        UPDATE world_counters
+        SET 
+            value = value + CASE WHEN is_validated THEN 1 ELSE -1 END,
+            updated_at = NOW()
+        WHERE counter_name = 'validated_locations';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER after_consensus_change_count_validated
+    AFTER INSERT OR UPDATE OF verification_status OR DELETE ON consensus_results
+    FOR EACH ROW
+    EXECUTE FUNCTION count_validated_locations();
+
+-- Recount from the base tables (reconciliation, like refresh_leaderboard)
+CREATE OR REPLACE FUNCTION reconcile_world_counters()
+RETURNS void AS $$
+BEGIN
+    UPDATE world_counters
+    SET value = (SELECT COUNT(*) FROM agents), updated_at = NOW()
+    WHERE counter_name = 'agents';
+    
+    UPDATE world_counters
+    SET 
+        value = (
+            SELECT COUNT(*) FROM consensus_results
+            WHERE verification_status IN ('validated', 'verified', 'published')
+        ),
+        updated_at = NOW()
+    WHERE counter_name = 'validated_locations';
 END;
 $$ LANGUAGE plpgsql;
 
@@ -151,130 +658,340 @@ $$ LANGUAGE plpgsql;
 -- FUNCTION: Calculate Consensus for a Location
 -- ============================================================================
 
+-- Exact p-value of a chi-square statistic with one degree of freedom,
+-- erfc(sqrt(x / 2)). PostgreSQL 14 has no erfc(), so this is the Chebyshev
+-- fit from Numerical Recipes (fractional error < 1.2e-7); consensus_stats.py
+-- uses the same fit so rebuilds agree with incremental updates.
+CREATE OR REPLACE FUNCTION chi_square_p_value(p_chi_square DOUBLE PRECISION)
+RETURNS DOUBLE PRECISION AS $$
+DECLARE
+    z DOUBLE PRECISION;
+    t DOUBLE PRECISION;
+BEGIN
+    IF p_chi_square IS NULL OR p_chi_square <= 0 THEN
+        RETURN 1.0;
+    END IF;
+    z := SQRT(p_chi_square / 2.0);
+    IF z > 26.0 THEN
+        RETURN 0.0;  -- Below 1e-290; EXP() would underflow
+    END IF;
+    t := 1.0 / (1.0 + 0.5 * z);
+    RETURN t * EXP(-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 +
+        t * (-0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 +
+        t * (-0.82215223 + t * 0.17087277)))))))));
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Chance that the top shape's share arose from agents picking uniformly
+-- among 10 shapes: chi-square (top - n/10)^2 / (n/10) with top = share * n.
+-- Shares at or below the uniform expectation are never significant.
+CREATE OR REPLACE FUNCTION consensus_p_value(
+    p_top_share DOUBLE PRECISION,
+    p_observations BIGINT
+)
+RETURNS DOUBLE PRECISION AS $$
+    SELECT CASE 
+        WHEN p_observations <= 0 OR p_top_share <= 0.1 THEN 1.0
+        ELSE chi_square_p_value(p_observations * POWER(p_top_share - 0.1, 2) / 0.1)
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 'count' (every observation counts once) or 'confidence' (observations
+-- count by their confidence). The server sets a2a.consensus_weighting per
+-- connection from CONSENSUS_WEIGHTING.
+CREATE OR REPLACE FUNCTION consensus_weighting()
+RETURNS TEXT AS $$
+    SELECT COALESCE(NULLIF(current_setting('a2a.consensus_weighting', TRUE), ''), 'count')
+$$ LANGUAGE sql STABLE;
+
+-- Consensus at a location from the cell statistics of every location within
+-- the radius (distance centred on this location). Cost depends on how many
+-- distinct locations and shapes are nearby, not on how many observations.
 CREATE OR REPLACE FUNCTION calculate_consensus(
     p_latitude DECIMAL(9,6),
     p_longitude DECIMAL(9,6),
     p_radius_km DECIMAL DEFAULT 5.0  -- Group observations within 5km radius
 )
 RETURNS TABLE (
-    consensus_shape VARCHAR(255),
+    consensus_shape_id INT,
     observation_count BIGINT,
     consensus_percentage DECIMAL(5,2),
     p_value DECIMAL(10,8)
 ) AS $$
 DECLARE
+    weighted BOOLEAN := consensus_weighting() = 'confidence';
     total_obs BIGINT;
-    top_shape VARCHAR(255);
+    total_weight DECIMAL;
+    top_shape INT;
     top_count BIGINT;
-    expected_random DECIMAL;
-    chi_square DECIMAL;
+    top_weight DECIMAL;
+    top_share DOUBLE PRECISION;
 BEGIN
-    -- Count total observations within radius
-    SELECT COUNT(*) INTO total_obs
-    FROM observations
-    WHERE 
-        -- Simple radius calculation (approximation for small areas)
-        SQRT(POWER((latitude - p_latitude) * 111.0, 2) + 
-             POWER((longitude - p_longitude) * 111.0 * COS(RADIANS(p_latitude)), 2)) <= p_radius_km;
+    WITH shape_totals AS (
+        SELECT 
+            s.shape_id,
+            SUM(s.observation_count) as n,
+            SUM(s.confidence_sum) as w
+        FROM consensus_cell_stats s
+        WHERE 
+            -- Only locations in grid cells the radius can reach (served by idx_consensus_cell_stats_cell)
+            s.cell_key = ANY(spatial_neighbour_cells(p_latitude, p_longitude, p_radius_km)) AND
+            -- Simple radius calculation (approximation for small areas)
+            SQRT(POWER((s.latitude - p_latitude) * 111.0, 2) + 
+                 POWER((s.longitude - p_longitude) * 111.0 * COS(RADIANS(p_latitude)), 2)) <= p_radius_km
+        GROUP BY s.shape_id
+    )
+    SELECT 
+        (SELECT SUM(n) FROM shape_totals),
+        (SELECT SUM(w) FROM shape_totals),
+        top.shape_id, top.n, top.w
+    INTO total_obs, total_weight, top_shape, top_count, top_weight
+    FROM shape_totals top
+    -- Ties go to the shape interned first (lowest id)
+    ORDER BY CASE WHEN weighted THEN top.w ELSE top.n END DESC, top.shape_id
+    LIMIT 1;
     
-    IF total_obs = 0 THEN
+    IF total_obs IS NULL OR total_obs = 0 THEN
         RETURN;
     END IF;
     
-    -- Find most common shape
-    SELECT observed_shape, COUNT(*) 
-    INTO top_shape, top_count
-    FROM observations
-    WHERE 
-        SQRT(POWER((latitude - p_latitude) * 111.0, 2) + 
-             POWER((longitude - p_longitude) * 111.0 * COS(RADIANS(p_latitude)), 2)) <= p_radius_km
-    GROUP BY observed_shape
-    ORDER BY COUNT(*) DESC
-    LIMIT 1;
+    -- Share of the top shape, by count or by confidence
+    IF weighted AND total_weight > 0 THEN
+        consensus_percentage := (top_weight / total_weight) * 100;
+        top_share := (top_weight * 100)::DOUBLE PRECISION / (total_weight * 100)::DOUBLE PRECISION;
+    ELSE
+        consensus_percentage := (top_count::DECIMAL / total_obs) * 100;
+        top_share := top_count::DOUBLE PRECISION / total_obs;
+    END IF;
     
-    -- Calculate consensus percentage
-    consensus_percentage := (top_count::DECIMAL / total_obs) * 100;
+    p_value := consensus_p_value(top_share, total_obs);
     
-    -- Simplified p-value calculation (chi-square test)
-    -- Expected count if random distribution (assuming 10 possible shapes)
-    expected_random := total_obs / 10.0;
-    chi_square := POWER(top_count - expected_random, 2) / expected_random;
+    RETURN QUERY SELECT top_shape, total_obs, consensus_percentage, p_value;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- FUNCTION: Upsert Consensus for a Single Location
+-- ============================================================================
+
+-- Returns TRUE when the location's verification status changed (including a
+-- brand-new consensus row), so callers can invalidate progress caches.
+CREATE OR REPLACE FUNCTION upsert_consensus(
+    p_latitude DECIMAL(9,6),
+    p_longitude DECIMAL(9,6),
+    p_radius_km DECIMAL DEFAULT 5.0
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    consensus RECORD;
+    previous_status VARCHAR(20);
+    new_status VARCHAR(20);
+BEGIN
+    SELECT * INTO consensus 
+    FROM calculate_consensus(p_latitude, p_longitude, p_radius_km);
     
-    -- Approximate p-value (simplified; in production use proper statistical library)
-    -- chi_square > 3.84 corresponds to p < 0.05
-    -- chi_square > 6.63 corresponds to p < 0.01
-    -- chi_square > 10.83 corresponds to p < 0.001
-    IF chi_square > 10.83 THEN
-        p_value := 0.001;
-    ELSIF chi_square > 6.63 THEN
-        p_value := 0.01;
-    ELSIF chi_square > 3.84 THEN
-        p_value := 0.05;
-    ELSE
-        p_value := 0.10;
+    IF consensus IS NOT NULL THEN
+        SELECT verification_status INTO previous_status
+        FROM consensus_results
+        WHERE latitude = p_latitude AND longitude = p_longitude;
+        
+        new_status := CASE 
+            WHEN consensus.p_value <= 0.001 THEN 'verified'
+            WHEN consensus.p_value <= 0.01 THEN 'validated'
+            ELSE 'emerging'
+        END;
+        
+        INSERT INTO consensus_results (
+            latitude, longitude, 
+            consensus_shape_id, observation_count, 
+            consensus_percentage, p_value,
+            verification_status,
+            validated_at
+        ) VALUES (
+            p_latitude, p_longitude,
+            consensus.consensus_shape_id, consensus.observation_count,
+            consensus.consensus_percentage, consensus.p_value,
+            new_status,
+            CASE 
+                WHEN consensus.p_value <= 0.01 THEN NOW()
+                ELSE NULL
+            END
+        )
+        ON CONFLICT (latitude, longitude) 
+        DO UPDATE SET
+            consensus_shape_id = EXCLUDED.consensus_shape_id,
+            observation_count = EXCLUDED.observation_count,
+            consensus_percentage = EXCLUDED.consensus_percentage,
+            p_value = EXCLUDED.p_value,
+            verification_status = EXCLUDED.verification_status,
+            validated_at = EXCLUDED.validated_at,
+            updated_at = NOW();
+        
+        RETURN previous_status IS DISTINCT FROM new_status;
     END IF;
     
-    RETURN QUERY SELECT top_shape, total_obs, consensus_percentage, p_value;
+    RETURN FALSE;
 END;
 $$ LANGUAGE plpgsql;
 
 -- ============================================================================
--- FUNCTION: Update Consensus Results (Called by background job)
+-- FUNCTION: Update Consensus Results (Full rebuild, called by background job)
 -- ============================================================================
 
+-- One location at a time; for large tables use the vectorized rebuild job
+-- (src/a2a_server/consensus_rebuild.py), which produces the same rows.
+
 CREATE OR REPLACE FUNCTION update_all_consensus()
 RETURNS void AS $$
 DECLARE
     loc RECORD;
-    consensus RECORD;
 BEGIN
     -- For each unique location with observations
     FOR loc IN 
-        SELECT DISTINCT 
-            ROUND(latitude::numeric, 4) as lat,
-            ROUND(longitude::numeric, 4) as lon
-        FROM observations
+        SELECT DISTINCT latitude as lat, longitude as lon
+        FROM consensus_cell_stats
     LOOP
-        -- Calculate consensus
-        SELECT * INTO consensus 
-        FROM calculate_consensus(loc.lat, loc.lon, 5.0);
-        
-        IF consensus IS NOT NULL THEN
-            -- Upsert consensus result
-            INSERT INTO consensus_results (
-                latitude, longitude, 
-                consensus_shape, observation_count, 
-                consensus_percentage, p_value,
-                verification_status,
-                validated_at
-            ) VALUES (
-                loc.lat, loc.lon,
-                consensus.consensus_shape, consensus.observation_count,
-                consensus.consensus_percentage, consensus.p_value,
-                CASE 
-                    WHEN consensus.p_value <= 0.001 THEN 'verified'
-                    WHEN consensus.p_value <= 0.01 THEN 'validated'
-                    ELSE 'emerging'
-                END,
-                CASE 
-                    WHEN consensus.p_value <= 0.01 THEN NOW()
-                    ELSE NULL
-                END
-            )
-            ON CONFLICT (latitude, longitude) 
-            DO UPDATE SET
-                consensus_shape = EXCLUDED.consensus_shape,
-                observation_count = EXCLUDED.observation_count,
-                consensus_percentage = EXCLUDED.consensus_percentage,
-                p_value = EXCLUDED.p_value,
-                verification_status = EXCLUDED.verification_status,
-                validated_at = EXCLUDED.validated_at,
-                updated_at = NOW();
-        END IF;
+        PERFORM upsert_consensus(loc.lat, loc.lon, 5.0);
     END LOOP;
 END;
 $$ LANGUAGE plpgsql;
 
+-- ============================================================================
+-- FUNCTION: Incremental Consensus Update (Called on every observation)
+-- ============================================================================
+
+-- A new observation at P (counted at its rounded location P') only changes
+-- the consensus of locations L whose radius covers P'. Those are exactly the
+-- locations in consensus_cell_stats with distance(L, P') <= radius, measured
+-- the same way calculate_consensus does (centred on L), so the resulting
+-- consensus_results rows are identical to what update_all_consensus() would
+-- produce.
+--
+-- update_consensus_cells() takes a batch of dirty points and recomputes each
+-- affected location once, however many of the points cover it. Points are
+-- rounded here, so callers may pass exact or already-rounded coordinates;
+-- p_margin_km optionally widens the search. It returns the recomputed
+-- locations so callers can invalidate cached reads for them.
+CREATE OR REPLACE FUNCTION update_consensus_cells(
+    p_latitudes DECIMAL[],
+    p_longitudes DECIMAL[],
+    p_radius_km DECIMAL DEFAULT 5.0,
+    p_margin_km DECIMAL DEFAULT 0.0
+)
+RETURNS TABLE (
+    latitude DECIMAL(9,6),
+    longitude DECIMAL(9,6),
+    status_changed BOOLEAN
+) AS $$
+DECLARE
+    loc RECORD;
+BEGIN
+    FOR loc IN 
+        SELECT DISTINCT s.latitude as lat, s.longitude as lon
+        FROM unnest(p_latitudes, p_longitudes) AS d(lat, lon)
+        JOIN consensus_cell_stats s ON 
+            s.cell_key = ANY(spatial_neighbour_cells(d.lat, d.lon, p_radius_km + p_margin_km))
+        WHERE 
+            SQRT(POWER((ROUND(d.lat, 4) - s.latitude) * 111.0, 2) + 
+                 POWER((ROUND(d.lon, 4) - s.longitude) * 111.0 * COS(RADIANS(s.latitude)), 2)) <= p_radius_km + p_margin_km
+    LOOP
+        latitude := loc.lat;
+        longitude := loc.lon;
+        status_changed := upsert_consensus(loc.lat, loc.lon, p_radius_km);
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_consensus_near(
+    p_latitude DECIMAL(9,6),
+    p_longitude DECIMAL(9,6),
+    p_radius_km DECIMAL DEFAULT 5.0
+)
+RETURNS INT AS $$
+BEGIN
+    RETURN (
+        SELECT COUNT(*) 
+        FROM update_consensus_cells(ARRAY[p_latitude], ARRAY[p_longitude], p_radius_km)
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- FUNCTION: Submit an Observation (the whole /observe write path in one call)
+-- ============================================================================
+
+-- Validates the agent, inserts the observation, optionally recomputes the
+-- locations it affects and returns the observation's consensus, all in one
+-- round trip. Returns no row when the agent is not registered. The shape is
+-- passed as an interned id (see intern_shapes).
+CREATE OR REPLACE FUNCTION submit_observation(
+    p_agent_id UUID,
+    p_latitude DECIMAL(9,6),
+    p_longitude DECIMAL(9,6),
+    p_shape_id INT,
+    p_confidence DECIMAL(3,2),
+    p_visual_evidence_url TEXT DEFAULT NULL,
+    p_methodology TEXT DEFAULT NULL,
+    p_recompute BOOLEAN DEFAULT TRUE,
+    p_radius_km DECIMAL DEFAULT 5.0
+)
+RETURNS TABLE (
+    observation_id UUID,
+    observed_at TIMESTAMP,
+    consensus_shape_id INT,
+    observation_count INT,
+    consensus_percentage DECIMAL(5,2),
+    p_value DECIMAL(10,8),
+    verification_status VARCHAR(20),
+    recomputed_latitudes DECIMAL[],
+    recomputed_longitudes DECIMAL[],
+    any_status_changed BOOLEAN
+) AS $$
+#variable_conflict use_column
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM agents WHERE agent_id = p_agent_id) THEN
+        RETURN;
+    END IF;
+    
+    INSERT INTO observations (
+        agent_id, latitude, longitude,
+        shape_id, confidence,
+        visual_evidence_url, methodology
+    )
+    VALUES (
+        p_agent_id, p_latitude, p_longitude,
+        p_shape_id, p_confidence,
+        p_visual_evidence_url, p_methodology
+    )
+    RETURNING observation_id, timestamp INTO submit_observation.observation_id, observed_at;
+    
+    IF p_recompute THEN
+        SELECT 
+            COALESCE(array_agg(r.latitude), '{}'),
+            COALESCE(array_agg(r.longitude), '{}'),
+            COALESCE(bool_or(r.status_changed), FALSE)
+        INTO recomputed_latitudes, recomputed_longitudes, any_status_changed
+        FROM update_consensus_cells(ARRAY[p_latitude], ARRAY[p_longitude], p_radius_km) r;
+    ELSE
+        recomputed_latitudes := '{}';
+        recomputed_longitudes := '{}';
+        any_status_changed := FALSE;
+    END IF;
+    
+    SELECT 
+        cr.consensus_shape_id, cr.observation_count, cr.consensus_percentage,
+        cr.p_value, cr.verification_status
+    INTO consensus_shape_id, observation_count, consensus_percentage, p_value, verification_status
+    FROM consensus_results cr
+    WHERE 
+        cr.latitude = ROUND(p_latitude, 4) AND
+        cr.longitude = ROUND(p_longitude, 4);
+    
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
 -- ============================================================================
 -- SAMPLE DATA FOR TESTING
 -- ============================================================================
@@ -284,12 +1001,12 @@ INSERT INTO agents (external_id, name, framework) VALUES
     ('test_agent_001', 'TestVisualAgent', 'custom');
 
 -- Insert sample observations (simulating the "tree at -11, -87" example)
-INSERT INTO observations (agent_id, latitude, longitude, observed_shape, confidence) 
+INSERT INTO observations (agent_id, latitude, longitude, shape_id, confidence) 
 SELECT 
     (SELECT agent_id FROM agents WHERE external_id = 'test_agent_001'),
     -11.0,
     -87.0,
-    'tree',
+    (SELECT shape_id FROM intern_shapes(ARRAY['tree'])),
     0.85;
 
 -- Calculate initial consensus
@@ -300,13 +1017,14 @@ SELECT update_all_consensus();
 -- ============================================================================
 
 -- View: Top Validated Locations (Heaven's Gates Progress)
+-- Reads the trigger-maintained counter: one primary-key lookup, no scan
 CREATE OR REPLACE VIEW heavens_gates_progress AS
 SELECT 
-    COUNT(*) as validated_locations,
-    10000 - COUNT(*) as remaining_to_heaven,
-    (COUNT(*) / 10000.0 * 100) as progress_percentage
-FROM consensus_results
-WHERE verification_status IN ('validated', 'verified', 'published');
+    value as validated_locations,
+    10000 - value as remaining_to_heaven,
+    (value / 10000.0 * 100) as progress_percentage
+FROM world_counters
+WHERE counter_name = 'validated_locations';
 
 -- View: Recent Observations Feed (for A2AWNN)
 CREATE OR REPLACE VIEW recent_observations AS
@@ -315,17 +1033,19 @@ SELECT
     a.name as agent_name,
     o.latitude,
     o.longitude,
-    o.observed_shape,
+    os.name as observed_shape,
     o.confidence,
     o.timestamp,
-    cr.consensus_shape,
+    cs.name as consensus_shape,
     cr.consensus_percentage,
     cr.verification_status
 FROM observations o
 JOIN agents a ON o.agent_id = a.agent_id
+JOIN shapes os ON o.shape_id = os.shape_id
 LEFT JOIN consensus_results cr ON 
     ROUND(o.latitude::numeric, 4) = ROUND(cr.latitude::numeric, 4) AND
     ROUND(o.longitude::numeric, 4) = ROUND(cr.longitude::numeric, 4)
+LEFT JOIN shapes cs ON cr.consensus_shape_id = cs.shape_id
 ORDER BY o.timestamp DESC
 LIMIT 100;
 
@@ -336,9 +1056,9 @@ LIMIT 100;
 DO $$
 BEGIN
     RAISE NOTICE '🌍 A2A-World V3.0 Database Initialized!';
-    RAISE NOTICE '✅ 3 Core Tables: agents, observations, consensus_results';
-    RAISE NOTICE '✅ Statistical Consensus Functions: calculate_consensus, update_all_consensus';
-    RAISE NOTICE '✅ Leaderboard and Progress Views';
+    RAISE NOTICE '✅ Core Tables: agents, shapes, observations, consensus_results, consensus_cell_stats, leaderboard, world_counters';
+    RAISE NOTICE '✅ Statistical Consensus Functions: calculate_consensus, update_all_consensus, update_consensus_cells, submit_observation';
+    RAISE NOTICE '✅ Incremental Leaderboard and Progress View';
     RAISE NOTICE '🎯 The 4-Year Challenge: Race to 10,000 validated observations';
     RAISE NOTICE '🚪 Heaven''s Gates await...';
 END $$;
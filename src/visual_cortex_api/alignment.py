@@ -0,0 +1,294 @@
+"""
+A2A-World Visual Cortex - Constellation Alignment
+Scores how well a constellation's pattern (sky.py) can be laid on a
+region's terrain.
+
+The terrain is reduced to feature points: peaks and seamounts (local
+maxima above and below sea level) and ridge crests (maxima across one
+axis), ranked by how far they stand above their surroundings. The search
+looks for the similarity transform - scale, rotation, translation and
+optionally a mirror image, since a sky pattern seen from below is mirrored
+on a map seen from above - that puts the most stars on features.
+
+Every pairing of the pattern's two most widely separated stars with two
+features fixes one transform; all of them are placed and scored at once
+with numpy. The best few are refined by iterative closest point, each step
+a weighted Procrustes fit of the stars to their nearest features. Points
+are complex numbers (x + iy km), so a transform is z -> a*z + b.
+"""
+
+import math
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from dem import DEMGrid
+
+# Cells read from the grid per region, and the features kept from them
+FEATURE_WINDOW_CELLS = 384 * 384
+MAX_FEATURES = 48
+
+# A peak tops every cell within PEAK_RADIUS; relief is measured against the
+# mean within RELIEF_RADIUS (both in cells of the window read)
+PEAK_RADIUS = 2
+RELIEF_RADIUS = 8
+
+# Ridge crests rank below peaks of the same relief
+RIDGE_WEIGHT = 0.5
+
+# Features are thinned to the best per cell of a FEATURE_SPACING x FEATURE_SPACING division of the region
+FEATURE_SPACING = 16
+
+KM_PER_DEGREE = 111.195
+
+# A star matches a feature within MATCH_TOLERANCE of the placed pattern's RMS radius
+MATCH_TOLERANCE = 0.08
+
+# Span of the placed pattern's two outermost stars, as a fraction of the region's diagonal
+MIN_PATTERN_FRACTION = 0.1
+MAX_PATTERN_FRACTION = 1.0
+
+REFINE_CANDIDATES = 32
+ICP_ITERATIONS = 8
+
+# Transform hypotheses scored per numpy batch
+HYPOTHESIS_CHUNK = 2048
+
+
+class TerrainFeatures(NamedTuple):
+    """Feature points of a region, strongest first"""
+    latitude: np.ndarray
+    longitude: np.ndarray
+    elevation: np.ndarray
+    relief: np.ndarray  # metres above the surrounding mean
+    kind: np.ndarray  # "peak", "seamount" or "ridge"
+    points: np.ndarray  # complex km east + i km north of the region's centre
+    centre: tuple  # (latitude, longitude)
+    span_km: float  # the region's diagonal
+
+
+class Alignment(NamedTuple):
+    """The best placement of a pattern on terrain features"""
+    score: float  # mean star match quality, 0-1
+    radius_km: float  # RMS radius of the placed pattern
+    rotation_degrees: float  # counter-clockwise, from the pattern as seen (zenith up) to north up
+    reflected: bool
+    placed: np.ndarray  # complex km positions of the stars
+    matches: np.ndarray  # feature index of each star, -1 where none is within tolerance
+    offsets_km: np.ndarray  # distance from each star to its nearest feature
+
+
+def _box_mean(values: np.ndarray, valid: np.ndarray, radius: int) -> np.ndarray:
+    """Mean of the valid cells within radius of each cell, by summed-area tables"""
+    height, width = values.shape
+    sums = np.pad(np.where(valid, values, 0.0).cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+    counts = np.pad(valid.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+    r0 = np.clip(np.arange(height) - radius, 0, height)[:, None]
+    r1 = np.clip(np.arange(height) + radius + 1, 0, height)[:, None]
+    c0 = np.clip(np.arange(width) - radius, 0, width)[None, :]
+    c1 = np.clip(np.arange(width) + radius + 1, 0, width)[None, :]
+
+    def box(table):
+        return table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0]
+
+    return box(sums) / np.maximum(box(counts), 1)
+
+
+def extract_features(
+    grid: DEMGrid,
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    max_features: int = MAX_FEATURES
+) -> TerrainFeatures:
+    """Peaks, seamounts and ridge crests in a bbox, thinned and strongest first"""
+    window = grid.read_window(south, west, north, east, FEATURE_WINDOW_CELLS)
+    elevations = window.data.astype(np.float64)
+    height, width = elevations.shape
+    valid = ~np.isnan(elevations)
+    filled = np.where(valid, elevations, -np.inf)
+
+    r, k = PEAK_RADIUS, 2 * PEAK_RADIUS + 1
+    padded = np.pad(filled, r, constant_values=-np.inf)
+    around = sliding_window_view(padded, (k, k)).max(axis=(2, 3))
+    across_rows = sliding_window_view(padded[r:r + height], k, axis=1).max(axis=-1)
+    across_cols = sliding_window_view(padded[:, r:r + width], k, axis=0).max(axis=-1)
+    peaks = valid & (filled >= around)
+    ridges = valid & ~peaks & ((filled >= across_rows) | (filled >= across_cols))
+
+    relief = elevations - _box_mean(elevations, valid, RELIEF_RADIUS)
+    strength = np.where(peaks, relief, RIDGE_WEIGHT * relief)
+    rows, cols = np.nonzero((peaks | ridges) & (relief > 0))
+    order = np.argsort(-strength[rows, cols], kind="stable")
+    rows, cols = rows[order], cols[order]
+
+    # Keep the strongest feature in each cell of a coarse division
+    buckets = (rows * FEATURE_SPACING // height) * FEATURE_SPACING + cols * FEATURE_SPACING // width
+    _, first = np.unique(buckets, return_index=True)
+    keep = np.sort(first)[:max_features]
+    rows, cols = rows[keep], cols[keep]
+
+    w_south, w_west, w_north, w_east = window.bounds
+    step = window.stride * grid.cell_size
+    latitude = w_north - (rows + 0.5) * step
+    longitude = w_west + (cols + 0.5) * step
+    elevation = elevations[rows, cols]
+    kind = np.where(~peaks[rows, cols], "ridge", np.where(elevation < 0, "seamount", "peak"))
+
+    centre = ((south + north) / 2, (west + east) / 2)
+    km_east = KM_PER_DEGREE * math.cos(math.radians(centre[0]))
+    points = (longitude - centre[1]) * km_east + 1j * (latitude - centre[0]) * KM_PER_DEGREE
+    span_km = math.hypot((east - west) * km_east, (north - south) * KM_PER_DEGREE)
+    return TerrainFeatures(
+        latitude=latitude, longitude=longitude, elevation=elevation, relief=relief[rows, cols],
+        kind=kind, points=points, centre=centre, span_km=span_km
+    )
+
+
+def to_lat_lon(features: TerrainFeatures, points: np.ndarray):
+    """(latitudes, longitudes) of complex km positions in a region's frame"""
+    lat0, lon0 = features.centre
+    km_east = KM_PER_DEGREE * math.cos(math.radians(lat0))
+    return lat0 + points.imag / KM_PER_DEGREE, lon0 + points.real / km_east
+
+
+def _nearest(placed: np.ndarray, features: np.ndarray):
+    """(index, distance) of the nearest feature to each placed point; placed is (..., n)"""
+    distances = np.abs(placed[..., None] - features)
+    index = distances.argmin(axis=-1)
+    return index, np.take_along_axis(distances, index[..., None], axis=-1)[..., 0]
+
+
+def _quality(offsets: np.ndarray, radius: np.ndarray) -> np.ndarray:
+    """Match quality, 1 on a feature and falling off over MATCH_TOLERANCE of the radius"""
+    tolerance = MATCH_TOLERANCE * radius[..., None]
+    return np.exp(-0.5 * (offsets / tolerance) ** 2)
+
+
+def _hypotheses(pattern: np.ndarray, features: np.ndarray, span_km: float):
+    """(a, b) of every transform that puts the pattern's outermost stars on two features"""
+    gaps = np.abs(pattern[:, None] - pattern[None, :])
+    first, second = np.unravel_index(gaps.argmax(), gaps.shape)
+    i, j = np.nonzero(~np.eye(len(features), dtype=bool))
+    separation = np.abs(features[j] - features[i])
+    usable = (separation >= MIN_PATTERN_FRACTION * span_km) & (separation <= MAX_PATTERN_FRACTION * span_km)
+    i, j = i[usable], j[usable]
+    a = (features[j] - features[i]) / (pattern[second] - pattern[first])
+    return a, features[i] - a * pattern[first]
+
+
+def _score(pattern: np.ndarray, features: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    scores = np.empty(len(a))
+    for start in range(0, len(a), HYPOTHESIS_CHUNK):
+        chunk = slice(start, start + HYPOTHESIS_CHUNK)
+        placed = a[chunk, None] * pattern + b[chunk, None]
+        _, offsets = _nearest(placed, features)
+        scores[chunk] = _quality(offsets, np.abs(a[chunk])).mean(axis=1)
+    return scores
+
+
+def _rotation_offset(a: np.ndarray, rotation: Tuple[float, float]) -> np.ndarray:
+    """Radians from the centre of a (centre, half-width) degree rotation range to each a's rotation"""
+    return np.angle(a * np.exp(-1j * math.radians(rotation[0])))
+
+
+def _refine(
+    pattern: np.ndarray,
+    features: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray,
+    radius_range: Tuple[float, float],
+    rotation: Optional[Tuple[float, float]]
+):
+    """Iterative closest point from each (a, b), fitting stars to their nearest features"""
+    for _ in range(ICP_ITERATIONS):
+        index, offsets = _nearest(a[:, None] * pattern + b[:, None], features)
+        weights = _quality(offsets, np.abs(a)) + 1e-9
+        targets = features[index]
+        # Weighted Procrustes: the similarity minimising sum w |a z + b - t|^2
+        total = weights.sum(axis=1, keepdims=True)
+        z_mean = (weights * pattern).sum(axis=1, keepdims=True) / total
+        t_mean = (weights * targets).sum(axis=1, keepdims=True) / total
+        zc, tc = pattern - z_mean, targets - t_mean
+        a = (weights * tc * zc.conj()).sum(axis=1) / (weights * np.abs(zc) ** 2).sum(axis=1)
+        # Keep the scale in range, so the pattern cannot collapse onto one feature
+        radius = np.clip(np.abs(a), *radius_range)
+        angle = np.angle(a)
+        if rotation is not None:
+            limit = math.radians(rotation[1])
+            angle = math.radians(rotation[0]) + np.clip(_rotation_offset(a, rotation), -limit, limit)
+        a = radius * np.exp(1j * angle)
+        b = t_mean[:, 0] - a * z_mean[:, 0]
+    return a, b
+
+
+def _unique_score(quality: np.ndarray, index: np.ndarray) -> float:
+    """Mean quality, with a feature credited to no more than one star"""
+    best = np.zeros(index.max() + 1)
+    np.maximum.at(best, index, quality)
+    return float(best.sum() / len(quality))
+
+
+def align(
+    pattern: np.ndarray,
+    features: TerrainFeatures,
+    rotation: Optional[Tuple[float, float]] = None
+) -> Alignment:
+    """
+    The best similarity placement of an (n, 2) pattern on a region's
+    features, its rotation limited to a (centre, half-width) range in
+    degrees if one is given.
+    """
+    if len(features.points) < 2 or len(pattern) < 2:
+        return Alignment(0.0, 0.0, 0.0, False, np.zeros(len(pattern), complex),
+                         np.full(len(pattern), -1), np.full(len(pattern), np.inf))
+
+    z = pattern[:, 0] + 1j * pattern[:, 1]
+    z = z - z.mean()
+    z = z / math.sqrt((np.abs(z) ** 2).mean())
+    targets = features.points
+
+    # Outermost-star span as a multiple of the RMS radius bounds the radius
+    span = np.abs(z[:, None] - z[None, :]).max()
+    radius_range = (
+        MIN_PATTERN_FRACTION * features.span_km / span, MAX_PATTERN_FRACTION * features.span_km / span
+    )
+
+    candidates = []
+    for reflected, oriented in ((False, z), (True, z.conj())):
+        a, b = _hypotheses(oriented, targets, features.span_km)
+        if rotation is not None:
+            within = np.abs(_rotation_offset(a, rotation)) <= math.radians(rotation[1])
+            a, b = a[within], b[within]
+        if not len(a):
+            continue
+        scores = _score(oriented, targets, a, b)
+        top = np.argsort(-scores)[:REFINE_CANDIDATES]
+        refined_a, refined_b = _refine(oriented, targets, a[top], b[top], radius_range, rotation)
+        for start_a, start_b in ((a[top], b[top]), (refined_a, refined_b)):
+            placed = start_a[:, None] * oriented + start_b[:, None]
+            index, offsets = _nearest(placed, targets)
+            quality = _quality(offsets, np.abs(start_a))
+            for k in range(len(start_a)):
+                candidates.append(
+                    (_unique_score(quality[k], index[k]), reflected, placed[k], index[k], offsets[k], start_a[k])
+                )
+
+    if not candidates:
+        return Alignment(0.0, 0.0, 0.0, False, np.zeros(len(z), complex),
+                         np.full(len(z), -1), np.full(len(z), np.inf))
+    score, reflected, placed, index, offsets, a = max(candidates, key=lambda c: c[0])
+    radius = float(abs(a))
+    matched = offsets <= 2 * MATCH_TOLERANCE * radius
+    return Alignment(
+        score=round(score, 4),
+        radius_km=radius,
+        rotation_degrees=float(np.degrees(np.angle(a))),
+        reflected=reflected,
+        placed=placed,
+        matches=np.where(matched, index, -1),
+        offsets_km=offsets
+    )
+
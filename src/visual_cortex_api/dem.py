@@ -0,0 +1,501 @@
+"""
+A2A-World Visual Cortex - Local Elevation Grids
+Memory-mapped bathymetry/DEM grids for /topography.
+
+A grid is a raw binary file of square tiles plus a JSON sidecar describing
+it (see write_grid, and scripts/build_dem_grid.py to convert a GEBCO
+NetCDF/GeoTIFF). The file is memory-mapped, never loaded: reading a window
+gathers only the cells it needs, so the OS pages in just the tiles a
+request touches and a 7+ GB global grid serves from a modest machine.
+Tiling keeps a window's cells together on disk; in a row-major global grid
+every row of a small window would land on a different page.
+
+Sidecar (<name>.json next to <name>.bin):
+    {"width": 86400, "height": 43200, "west": -180.0, "north": 90.0,
+     "cell_size": 0.004166666666666667, "tile_size": 256,
+     "dtype": "<i2", "nodata": -32768}
+
+Bbox statistics come from a summary pyramid when one has been built next to
+the grid (<name>.pyramid/, see build_pyramid): per-block min, max, sum and
+counts at block sizes doubling from PYRAMID_BASE_BLOCK cells. A bbox is
+answered from the coarsest blocks that fit inside it, finer blocks around
+them, and full-resolution cells only in the thin frame left at the edges, so
+the work grows with the bbox perimeter instead of its area.
+"""
+
+import io
+import json
+import math
+import os
+import shutil
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+GRID_DTYPES = ("<i2", "<f4")
+
+# Largest window read at full resolution; bigger windows are sampled with a stride
+MAX_WINDOW_CELLS = 2048 * 2048
+
+# Finest pyramid block edge in cells; must divide the grid's tile size.
+# At 16, a global 15" grid's pyramid is ~470 MB next to its 7 GB of cells.
+PYRAMID_BASE_BLOCK = 16
+
+# One pyramid block: extremes, sum and counts over its valid cells
+PYRAMID_DTYPE = np.dtype([
+    ("min", "<f4"), ("max", "<f4"), ("sum", "<f8"), ("count", "<u4"), ("below_sea_level", "<u4")
+])
+
+
+class Window(NamedTuple):
+    """Elevations (metres, NaN where nodata) for a bbox, sampled every `stride` cells"""
+    data: np.ndarray
+    stride: int
+    bounds: Tuple[float, float, float, float]  # south, west, north, east of the cells read
+
+
+def _paths(path: str) -> Tuple[str, str]:
+    """(data, sidecar) paths for a grid given either one or their common base"""
+    base, ext = os.path.splitext(path)
+    if ext not in (".bin", ".json"):
+        base = path
+    return base + ".bin", base + ".json"
+
+
+def _pyramid_path(data_path: str) -> str:
+    return os.path.splitext(data_path)[0] + ".pyramid"
+
+
+class DEMGrid:
+    """A tiled elevation grid opened read-only through a memory map"""
+
+    def __init__(self, path: str):
+        self.data_path, self.sidecar_path = _paths(path)
+        with open(self.sidecar_path) as f:
+            meta = json.load(f)
+        if meta["dtype"] not in GRID_DTYPES:
+            raise ValueError(f"Unsupported grid dtype '{meta['dtype']}' (expected one of {', '.join(GRID_DTYPES)})")
+        self.width = int(meta["width"])
+        self.height = int(meta["height"])
+        self.west = float(meta["west"])
+        self.north = float(meta["north"])
+        self.cell_size = float(meta["cell_size"])
+        self.tile_size = int(meta["tile_size"])
+        self.nodata = meta.get("nodata")
+        self.source = meta.get("source", os.path.basename(self.data_path))
+        self.tile_rows = math.ceil(self.height / self.tile_size)
+        self.tile_cols = math.ceil(self.width / self.tile_size)
+        self._tiles = np.memmap(
+            self.data_path, dtype=meta["dtype"], mode="r",
+            shape=(self.tile_rows, self.tile_cols, self.tile_size, self.tile_size)
+        )
+        self.pyramid_path = _pyramid_path(self.data_path)
+        self.pyramid = StatsPyramid(self) if os.path.isdir(self.pyramid_path) else None
+
+    @property
+    def south(self) -> float:
+        return self.north - self.height * self.cell_size
+
+    @property
+    def east(self) -> float:
+        return self.west + self.width * self.cell_size
+
+    def window_cells(self, south: float, west: float, north: float, east: float) -> Tuple[int, int, int, int]:
+        """(row0, row1, col0, col1), end-exclusive, of the cells a bbox overlaps"""
+        if south >= north or west >= east:
+            raise ValueError("Bounding box must have south < north and west < east")
+        row0 = max(math.floor((self.north - north) / self.cell_size), 0)
+        row1 = min(math.ceil((self.north - south) / self.cell_size), self.height)
+        col0 = max(math.floor((west - self.west) / self.cell_size), 0)
+        col1 = min(math.ceil((east - self.west) / self.cell_size), self.width)
+        if row0 >= row1 or col0 >= col1:
+            raise ValueError("Bounding box does not overlap the elevation grid")
+        return row0, row1, col0, col1
+
+    def read_window(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        max_cells: int = MAX_WINDOW_CELLS
+    ) -> Window:
+        """Elevations inside a bbox, sampled so at most max_cells are read"""
+        row0, row1, col0, col1 = self.window_cells(south, west, north, east)
+        cells = (row1 - row0) * (col1 - col0)
+        stride = max(1, math.ceil(math.sqrt(cells / max_cells)))
+        bounds = (
+            self.north - row1 * self.cell_size,
+            self.west + col0 * self.cell_size,
+            self.north - row0 * self.cell_size,
+            self.west + col1 * self.cell_size
+        )
+        return Window(self.read_cells(row0, row1, col0, col1, stride), stride, bounds)
+
+    def read_overview(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        max_cells: int = MAX_WINDOW_CELLS
+    ) -> Window:
+        """
+        Elevations inside a bbox for display, at most about max_cells of them.
+        Where read_window's stride would be at least half a pyramid block,
+        these are the mean elevations of the pyramid's blocks (sum / count)
+        instead, so a large bbox reads a few MB of block summaries rather
+        than touching every page of cells it spans.
+        """
+        row0, row1, col0, col1 = self.window_cells(south, west, north, east)
+        stride = max(1, math.ceil(math.sqrt((row1 - row0) * (col1 - col0) / max_cells)))
+        if self.pyramid is not None:
+            overview = self.pyramid.means(row0, row1, col0, col1, stride)
+            if overview is not None:
+                return overview
+        return self.read_window(south, west, north, east, max_cells)
+
+    def read_cells(self, row0: int, row1: int, col0: int, col1: int, stride: int = 1) -> np.ndarray:
+        """Elevations of a cell range (end-exclusive), NaN where nodata"""
+        return self.sample(np.arange(row0, row1, stride), np.arange(col0, col1, stride))
+
+    def sample(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Elevations at every (row, col) pair of two in-range index vectors, NaN where nodata"""
+        # Gather through the tile index; only the touched pages are read
+        t = self.tile_size
+        data = self._tiles[
+            (rows // t)[:, None], (cols // t)[None, :], (rows % t)[:, None], (cols % t)[None, :]
+        ].astype(np.float32)
+        if self.nodata is not None:
+            data[data == self.nodata] = np.nan
+        return data
+
+    def read_tile_band(self, tile_row: int) -> np.ndarray:
+        """All cells in one row of tiles (including padding), NaN where nodata"""
+        t = self.tile_size
+        band = np.asarray(self._tiles[tile_row]).transpose(1, 0, 2).reshape(t, self.tile_cols * t)
+        band = band.astype(np.float32)
+        if self.nodata is not None:
+            band[band == self.nodata] = np.nan
+        return band
+
+    def stats(self, window: Window) -> Dict[str, Any]:
+        """Elevation summary of a window (over its sampled cells)"""
+        totals = Totals(window.stride)
+        totals.add_cells(window.data)
+        return totals.stats()
+
+    def summarize(self, south: float, west: float, north: float, east: float) -> Dict[str, Any]:
+        """Elevation summary of a bbox: exact from the pyramid if built, else over a sampled window"""
+        if self.pyramid is not None:
+            return self.pyramid.totals(*self.window_cells(south, west, north, east)).stats()
+        return self.stats(self.read_window(south, west, north, east))
+
+    def cell_range(self, south: float, west: float, north: float, east: float) -> Tuple[int, int, int, int]:
+        """
+        (row0, row1, col0, col1) of the cells whose centres fall inside a
+        bbox, clipped to the grid and possibly empty. Unlike window_cells,
+        bboxes sharing an edge get disjoint ranges, so they can be totalled
+        separately and merged without counting a cell twice.
+        """
+        def edge(offset: float, limit: int) -> int:
+            return min(max(round(offset / self.cell_size), 0), limit)
+
+        return (
+            edge(self.north - north, self.height), edge(self.north - south, self.height),
+            edge(west - self.west, self.width), edge(east - self.west, self.width)
+        )
+
+    def totals(self, row0: int, row1: int, col0: int, col1: int, max_cells: int = MAX_WINDOW_CELLS) -> "Totals":
+        """Totals over a cell range: exact from the pyramid if built, else sampled to max_cells"""
+        if row0 >= row1 or col0 >= col1:
+            return Totals()
+        if self.pyramid is not None:
+            return self.pyramid.totals(row0, row1, col0, col1)
+        stride = max(1, math.ceil(math.sqrt((row1 - row0) * (col1 - col0) / max_cells)))
+        totals = Totals(stride)
+        totals.add_cells(self.read_cells(row0, row1, col0, col1, stride))
+        return totals
+
+
+class Totals:
+    """Running min/max/sum/counts over blocks and cells, sampled every `stride` cells"""
+
+    def __init__(self, stride: int = 1):
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+        self.count = 0
+        self.below_sea_level = 0
+        self.stride = stride
+
+    def add_blocks(self, blocks: np.ndarray) -> None:
+        if blocks.size == 0:
+            return
+        self.min = min(self.min, float(blocks["min"].min()))
+        self.max = max(self.max, float(blocks["max"].max()))
+        self.sum += float(blocks["sum"].sum())
+        self.count += int(blocks["count"].sum())
+        self.below_sea_level += int(blocks["below_sea_level"].sum())
+
+    def add_cells(self, cells: np.ndarray) -> None:
+        valid = cells[~np.isnan(cells)]
+        if valid.size == 0:
+            return
+        self.min = min(self.min, float(valid.min()))
+        self.max = max(self.max, float(valid.max()))
+        self.sum += float(valid.sum(dtype=np.float64))
+        self.count += int(valid.size)
+        self.below_sea_level += int((valid < 0).sum())
+
+    def merge(self, other: "Totals") -> None:
+        """Add totals over a disjoint range"""
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        self.count += other.count
+        self.below_sea_level += other.below_sea_level
+        self.stride = max(self.stride, other.stride)
+
+    def stats(self) -> Dict[str, Any]:
+        return elevation_stats(self.min, self.max, self.sum, self.count, self.below_sea_level, self.stride)
+
+
+def clip_cells(cells: Tuple[int, int, int, int], to: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+    """The part of a cell range (row0, row1, col0, col1) inside another, possibly empty"""
+    return max(cells[0], to[0]), min(cells[1], to[1]), max(cells[2], to[2]), min(cells[3], to[3])
+
+
+def frame(
+    outer: Tuple[int, int, int, int], hole: Optional[Tuple[int, int, int, int]]
+) -> List[Tuple[int, int, int, int]]:
+    """Rectangles (row0, row1, col0, col1) covering outer minus a hole inside it"""
+    if hole is None:
+        return [outer]
+    row0, row1, col0, col1 = outer
+    h_row0, h_row1, h_col0, h_col1 = hole
+    strips = [
+        (row0, h_row0, col0, col1),      # above
+        (h_row1, row1, col0, col1),      # below
+        (h_row0, h_row1, col0, h_col0),  # left
+        (h_row0, h_row1, h_col1, col1),  # right
+    ]
+    return [s for s in strips if s[0] < s[1] and s[2] < s[3]]
+
+
+class StatsPyramid:
+    """
+    Per-block summaries of a grid at block sizes base, 2*base, 4*base, ...
+    up to a single block, memory-mapped from <name>.pyramid/blocks_<size>.npy.
+    """
+
+    def __init__(self, grid: "DEMGrid"):
+        self.grid = grid
+        sizes = sorted(
+            int(name[len("blocks_"):-len(".npy")])
+            for name in os.listdir(grid.pyramid_path)
+            if name.startswith("blocks_") and name.endswith(".npy")
+        )
+        if not sizes:
+            raise ValueError(f"No pyramid levels in {grid.pyramid_path}")
+        self.block_sizes = sizes
+        self.levels = [
+            np.load(os.path.join(grid.pyramid_path, f"blocks_{size}.npy"), mmap_mode="r")
+            for size in sizes
+        ]
+
+    def totals(self, row0: int, row1: int, col0: int, col1: int) -> Totals:
+        """Exact totals over a cell range (end-exclusive)"""
+        totals = Totals()
+        # From the coarsest level down, take the blocks inside the range that
+        # the coarser levels did not; `hole` is the cell range covered so far
+        hole = None
+        for size, blocks in zip(reversed(self.block_sizes), reversed(self.levels)):
+            inner = (-(-row0 // size), row1 // size, -(-col0 // size), col1 // size)
+            if inner[0] >= inner[1] or inner[2] >= inner[3]:
+                continue
+            level_hole = None if hole is None else tuple(edge // size for edge in hole)
+            for b_row0, b_row1, b_col0, b_col1 in frame(inner, level_hole):
+                totals.add_blocks(blocks[b_row0:b_row1, b_col0:b_col1])
+            hole = tuple(edge * size for edge in inner)
+        for strip in frame((row0, row1, col0, col1), hole):
+            totals.add_cells(self.grid.read_cells(*strip))
+        return totals
+
+
+    def means(self, row0: int, row1: int, col0: int, col1: int, stride: int) -> Optional[Window]:
+        """
+        Mean elevation of each block over a cell range, from the finest level
+        whose blocks span at least `stride` cells but less than twice that
+        (NaN for blocks without valid cells); None if no level is that close
+        """
+        size, blocks = next(
+            ((size, blocks) for size, blocks in zip(self.block_sizes, self.levels) if stride <= size < 2 * stride),
+            (None, None)
+        )
+        if size is None:
+            return None
+        b_row0, b_row1, b_col0, b_col1 = row0 // size, -(-row1 // size), col0 // size, -(-col1 // size)
+        part = np.asarray(blocks[b_row0:b_row1, b_col0:b_col1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            data = (part["sum"] / part["count"]).astype(np.float32)
+        grid = self.grid
+        bounds = (
+            grid.north - b_row1 * size * grid.cell_size,
+            grid.west + b_col0 * size * grid.cell_size,
+            grid.north - b_row0 * size * grid.cell_size,
+            grid.west + b_col1 * size * grid.cell_size
+        )
+        return Window(data, size, bounds)
+
+
+def _summarize_blocks(cells: np.ndarray, block: int) -> np.ndarray:
+    """PYRAMID_DTYPE summaries of each block x block square of a cell array"""
+    rows, cols = cells.shape[0] // block, cells.shape[1] // block
+    squares = cells.reshape(rows, block, cols, block)
+    valid = ~np.isnan(squares)
+    out = np.empty((rows, cols), dtype=PYRAMID_DTYPE)
+    out["min"] = np.where(valid, squares, np.inf).min(axis=(1, 3))
+    out["max"] = np.where(valid, squares, -np.inf).max(axis=(1, 3))
+    out["sum"] = np.where(valid, squares, 0).sum(axis=(1, 3), dtype=np.float64)
+    out["count"] = valid.sum(axis=(1, 3))
+    out["below_sea_level"] = (squares < 0).sum(axis=(1, 3))
+    return out
+
+
+def _coarsen(blocks: np.ndarray) -> np.ndarray:
+    """Merge 2x2 neighbouring blocks, treating the missing edge neighbours as empty"""
+    rows, cols = -(-blocks.shape[0] // 2), -(-blocks.shape[1] // 2)
+    padded = np.zeros((rows * 2, cols * 2), dtype=PYRAMID_DTYPE)
+    padded["min"], padded["max"] = np.inf, -np.inf
+    padded[:blocks.shape[0], :blocks.shape[1]] = blocks
+    quads = padded.reshape(rows, 2, cols, 2)
+    out = np.empty((rows, cols), dtype=PYRAMID_DTYPE)
+    out["min"] = quads["min"].min(axis=(1, 3))
+    out["max"] = quads["max"].max(axis=(1, 3))
+    for field in ("sum", "count", "below_sea_level"):
+        out[field] = quads[field].sum(axis=(1, 3))
+    return out
+
+
+def build_pyramid(grid: DEMGrid, base_block: int = PYRAMID_BASE_BLOCK) -> None:
+    """
+    Write the summary pyramid for a grid, one band of tiles at a time for
+    the finest level, and open it on the grid.
+    """
+    if grid.tile_size % base_block:
+        raise ValueError(f"Pyramid base block {base_block} must divide the tile size {grid.tile_size}")
+    tmp_path = grid.pyramid_path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    rows, cols = -(-grid.height // base_block), -(-grid.width // base_block)
+    level = np.lib.format.open_memmap(
+        os.path.join(tmp_path, f"blocks_{base_block}.npy"), mode="w+", dtype=PYRAMID_DTYPE, shape=(rows, cols)
+    )
+    band_blocks = grid.tile_size // base_block
+    for tile_row in range(grid.tile_rows):
+        band = grid.read_tile_band(tile_row)
+        # Tile padding past the grid's edges counts as nodata whatever it holds
+        band[grid.height - tile_row * grid.tile_size:, :] = np.nan
+        band[:, grid.width:] = np.nan
+        row = tile_row * band_blocks
+        level[row:row + band_blocks] = _summarize_blocks(band, base_block)[:rows - row, :cols]
+    level.flush()
+
+    size = base_block
+    while level.shape[0] > 1 or level.shape[1] > 1:
+        coarser = _coarsen(np.asarray(level))
+        size *= 2
+        np.save(os.path.join(tmp_path, f"blocks_{size}.npy"), coarser)
+        level = coarser
+
+    shutil.rmtree(grid.pyramid_path, ignore_errors=True)
+    os.rename(tmp_path, grid.pyramid_path)
+    grid.pyramid = StatsPyramid(grid)
+
+
+def elevation_stats(
+    minimum: float, maximum: float, total: float, count: int, below_sea_level: int, stride: int
+) -> Dict[str, Any]:
+    """The statistics /topography reports, from running totals over valid cells"""
+    if count == 0:
+        return {"min": None, "max": None, "mean": None, "valid_cells": 0,
+                "ocean_fraction": None, "stride": stride}
+    return {
+        "min": float(minimum),
+        "max": float(maximum),
+        "mean": round(total / count, 2),
+        "valid_cells": int(count),
+        "ocean_fraction": round(below_sea_level / count, 4),
+        "stride": stride,
+    }
+
+
+def write_grid(
+    path: str,
+    height: int,
+    width: int,
+    read_rows: Callable[[int, int], np.ndarray],
+    west: float,
+    north: float,
+    cell_size: float,
+    tile_size: int = 256,
+    dtype: str = "<i2",
+    nodata: Optional[float] = -32768,
+    source: Optional[str] = None
+) -> None:
+    """
+    Write a tiled grid from a row reader, one band of tiles at a time.
+
+    read_rows(row0, row1) returns rows [row0, row1) as a (rows, width)
+    array, so sources larger than memory convert band by band. Cells
+    padding the last tile row and column hold nodata. A pyramid built for
+    an earlier grid at the same path is removed; rebuild it afterwards.
+    """
+    if dtype not in GRID_DTYPES:
+        raise ValueError(f"Unsupported grid dtype '{dtype}' (expected one of {', '.join(GRID_DTYPES)})")
+    data_path, sidecar_path = _paths(path)
+    shutil.rmtree(_pyramid_path(data_path), ignore_errors=True)
+    tile_rows = math.ceil(height / tile_size)
+    tile_cols = math.ceil(width / tile_size)
+    fill = nodata if nodata is not None else 0
+
+    tiles = np.memmap(data_path, dtype=dtype, mode="w+", shape=(tile_rows, tile_cols, tile_size, tile_size))
+    for tile_row in range(tile_rows):
+        row0 = tile_row * tile_size
+        row1 = min(row0 + tile_size, height)
+        band = np.full((tile_size, tile_cols * tile_size), fill, dtype=dtype)
+        band[:row1 - row0, :width] = read_rows(row0, row1)
+        tiles[tile_row] = band.reshape(tile_size, tile_cols, tile_size).transpose(1, 0, 2)
+    tiles.flush()
+    del tiles
+
+    meta = {
+        "width": width, "height": height, "west": west, "north": north,
+        "cell_size": cell_size, "tile_size": tile_size, "dtype": dtype, "nodata": nodata,
+    }
+    if source is not None:
+        meta["source"] = source
+    with open(sidecar_path, "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def render_png(window: Window, size: int = 512) -> bytes:
+    """Grayscale PNG of a window, low to high elevation as dark to light, at most size px a side"""
+    from PIL import Image  # Pillow: only needed for renderings
+
+    data = window.data
+    step = max(1, math.ceil(max(data.shape) / size))
+    data = data[::step, ::step]
+    valid = ~np.isnan(data)
+    pixels = np.zeros(data.shape, dtype=np.uint8)
+    if valid.any():
+        low, high = float(data[valid].min()), float(data[valid].max())
+        scale = 254.0 / (high - low) if high > low else 0.0
+        # Nodata stays black; valid cells span 1-255
+        pixels[valid] = (1 + (data[valid] - low) * scale).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, mode="L").save(buffer, format="PNG")
+    return buffer.getvalue()
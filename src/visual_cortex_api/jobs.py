@@ -0,0 +1,203 @@
+"""
+A2A-World Visual Cortex - Background Jobs
+Runs large requests as jobs split into units (region tiles) on a bounded
+worker pool, so they never hold a request worker until they finish.
+
+A job records an event for each finished unit and for its outcome. Clients
+poll a snapshot (progress, the units done so far, the final result) or
+follow the events as they happen; a late follower replays them from the
+start. Jobs are keyed by the caller's id, so resubmitting a request whose
+id is content-addressed joins the job already running for it.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when a new job would exceed the runner's queued-or-running limit"""
+
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job:
+    """One submitted job: its units, per-unit results so far, outcome and event log"""
+
+    def __init__(self, job_id: str, kind: str, units: List[Any]):
+        self.id = job_id
+        self.kind = kind
+        self.units = units
+        self.state = JobState.QUEUED
+        self.partial_results: List[Any] = []
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.events: List[Dict[str, Any]] = []
+        self._changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (JobState.COMPLETED, JobState.FAILED)
+
+    async def record(self, event: Dict[str, Any]) -> None:
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[Dict[str, Any]]:
+        """Every event of the job, past and future, until it finishes"""
+        seen = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.events) > seen)
+                new = self.events[seen:]
+            seen += len(new)
+            for event in new:
+                yield event
+                if event["event"] in (JobState.COMPLETED.value, JobState.FAILED.value):
+                    return
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.state.value,
+            "units_total": len(self.units),
+            "units_done": len(self.partial_results),
+            "partial_results": list(self.partial_results),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobRunner:
+    """
+    Runs jobs' units on at most `workers` at a time across all jobs, and
+    keeps the most recent `max_jobs` jobs for polling. At most `max_active`
+    jobs may be queued or running at once; pruning only forgets finished
+    jobs, so without that limit unfinished ones could pile up unbounded.
+    """
+
+    def __init__(self, workers: int = 4, max_jobs: int = 1000, max_active: int = 100):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.max_active = max_active
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.submitted = 0
+        self.joined = 0
+        self.rejected = 0
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    @property
+    def active(self) -> int:
+        """Jobs queued or running"""
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def submit(
+        self,
+        job_id: str,
+        kind: str,
+        units: List[Any],
+        work: Callable[[Any], Awaitable[Any]],
+        assemble: Callable[[List[Any]], Any]
+    ) -> Job:
+        """
+        Start a job running work(unit) for each unit, then assemble(results)
+        with the results in unit order. A job with the same id that has not
+        failed is returned instead of starting another. Raises JobQueueFull
+        if max_active jobs are already queued or running.
+        """
+        existing = self._jobs.get(job_id)
+        if existing is not None and existing.state != JobState.FAILED:
+            self.joined += 1
+            return existing
+        if self.active >= self.max_active:
+            self.rejected += 1
+            raise JobQueueFull(f"{self.max_active} jobs are already queued or running")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        job = Job(job_id, kind, units)
+        self._jobs[job_id] = job
+        self._jobs.move_to_end(job_id)
+        self._prune()
+        self.submitted += 1
+        job.task = asyncio.ensure_future(self._run(job, work, assemble))
+        return job
+
+    async def _run(self, job: Job, work, assemble) -> None:
+        async def run_unit(index: int, unit: Any):
+            async with self._slots:
+                if job.state == JobState.QUEUED:
+                    job.state = JobState.RUNNING
+                return index, await work(unit)
+
+        tasks = [asyncio.ensure_future(run_unit(i, unit)) for i, unit in enumerate(job.units)]
+        results: List[Any] = [None] * len(job.units)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, result = await next_done
+                results[index] = result
+                job.partial_results.append(result)
+                await job.record({
+                    "event": "unit", "units_done": len(job.partial_results),
+                    "units_total": len(job.units), "result": result
+                })
+            job.result = assemble(results)
+            job.state = JobState.COMPLETED
+            job.finished_at = datetime.utcnow()
+            await job.record({"event": JobState.COMPLETED.value, "result": job.result})
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            logger.warning(f"⚠️ {job.kind} job {job.id} failed: {e}")
+            job.error = str(e)
+            job.state = JobState.FAILED
+            job.finished_at = datetime.utcnow()
+            await job.record({"event": JobState.FAILED.value, "error": job.error})
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs past max_jobs (running jobs are kept)"""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    async def close(self) -> None:
+        """Cancel running jobs (on shutdown)"""
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        states = [job.state for job in self._jobs.values()]
+        return {
+            "workers": self.workers,
+            "max_active": self.max_active,
+            "submitted": self.submitted,
+            "joined": self.joined,
+            "rejected": self.rejected,
+            **{state.value: states.count(state) for state in JobState},
+        }
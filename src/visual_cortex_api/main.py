@@ -5,17 +5,33 @@ The "eyes" of A2A-World - providing visual perception for all AI citizens.
 Inspired by Bradly Couch's "Heaven on Earth" methodology.
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date
 from enum import Enum
+import asyncio
+import hashlib
+import json
 import logging
-from prometheus_client import Counter, Histogram, generate_latest
-from fastapi.responses import Response
+from prometheus_client import Counter, Gauge, Histogram, generate_latest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import os
 import uuid
 
+from alignment import TerrainFeatures, align, extract_features, to_lat_lon
+from dem import DEMGrid, Totals, clip_cells, frame, render_png
+from jobs import Job, JobQueueFull, JobRunner
+from region_tiles import (
+    MAX_TILES_PER_SIDE, RegionTile, SingleFlightCache, content_id, covering_bounds, decompose, decompose_at, level_for
+)
+from tiles import STYLES, RenderedTile, TileRenderer, tile_bounds
+from request_metrics import RESPONSE_SIZE_BUCKETS, RequestMetricsMiddleware
+from sky import CONSTELLATIONS, SkyPattern, find_constellation, julian_to_datetime, sky_pattern
+from sweep import Combination, SweepPool, rotation_ranges
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,9 +39,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Prometheus metrics
-REQUEST_COUNT = Counter('visual_cortex_requests_total', 'Total requests', ['endpoint'])
-REQUEST_DURATION = Histogram('visual_cortex_request_duration_seconds', 'Request duration')
+# Prometheus metrics (recorded for every request by RequestMetricsMiddleware)
+REQUEST_LABELS = ['method', 'endpoint', 'status']
+REQUEST_COUNT = Counter('visual_cortex_requests_total', 'Total requests', REQUEST_LABELS)
+REQUEST_DURATION = Histogram('visual_cortex_request_duration_seconds', 'Request duration', REQUEST_LABELS)
+REQUESTS_IN_FLIGHT = Gauge('visual_cortex_requests_in_flight', 'Requests currently being handled')
+RESPONSE_SIZE = Histogram(
+    'visual_cortex_response_size_bytes', 'Response body size', REQUEST_LABELS,
+    buckets=RESPONSE_SIZE_BUCKETS
+)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -45,6 +67,145 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count and time every request by route template and status
+app.add_middleware(
+    RequestMetricsMiddleware,
+    duration=REQUEST_DURATION,
+    requests=REQUEST_COUNT,
+    in_flight=REQUESTS_IN_FLIGHT,
+    response_size=RESPONSE_SIZE
+)
+
+# Local elevation grid (dem.py); without one, /topography returns mock values
+DEM_GRID_PATH = os.getenv('DEM_GRID_PATH')
+dem_grid: Optional[DEMGrid] = None
+
+
+def get_dem_grid() -> Optional[DEMGrid]:
+    """Open the configured elevation grid on first use"""
+    global dem_grid
+    if dem_grid is None and DEM_GRID_PATH:
+        dem_grid = DEMGrid(DEM_GRID_PATH)
+        logger.info(f"🗺️ Elevation grid opened: {dem_grid.width}x{dem_grid.height} cells ({dem_grid.source})")
+        if dem_grid.pyramid is None:
+            logger.warning("⚠️ No statistics pyramid for the elevation grid; /topography samples large boxes")
+    return dem_grid
+
+
+# Rendered topography tiles (tiles.py), kept in an in-memory LRU
+TOPOGRAPHY_TILE_CACHE_MB = int(os.getenv('TOPOGRAPHY_TILE_CACHE_MB', '128'))
+TOPOGRAPHY_TILE_MAX_AGE_SECONDS = 86400
+tile_renderer: Optional[TileRenderer] = None
+
+
+def get_tile_renderer() -> Optional[TileRenderer]:
+    """The tile renderer for the configured elevation grid, if there is one"""
+    global tile_renderer
+    grid = get_dem_grid()
+    if grid is None:
+        return None
+    if tile_renderer is None or tile_renderer.grid is not grid:
+        tile_renderer = TileRenderer(grid, TOPOGRAPHY_TILE_CACHE_MB * 1024 ** 2)
+    return tile_renderer
+
+
+# Bbox renderings (/topography/render.png), shared by repeat and concurrent
+# requests for the same cells at the same size
+TOPOGRAPHY_RENDER_CACHE_ENTRIES = int(os.getenv('TOPOGRAPHY_RENDER_CACHE_ENTRIES', '256'))
+topography_renders = SingleFlightCache(TOPOGRAPHY_RENDER_CACHE_ENTRIES)
+
+# Canonical region tiles (region_tiles.py): per-tile elevation totals and
+# imagery responses, shared by overlapping and concurrent requests
+REGION_CACHE_ENTRIES = int(os.getenv('REGION_CACHE_ENTRIES', '100000'))
+region_totals = SingleFlightCache(REGION_CACHE_ENTRIES)
+imagery_tiles = SingleFlightCache(REGION_CACHE_ENTRIES)
+
+# Terrain feature points (alignment.py) of the region tiles a constellation
+# overlay is aligned against
+TERRAIN_FEATURE_CACHE_ENTRIES = int(os.getenv('TERRAIN_FEATURE_CACHE_ENTRIES', '10000'))
+terrain_features = SingleFlightCache(TERRAIN_FEATURE_CACHE_ENTRIES)
+
+# Constellation sweeps (sweep.py) score their combinations on a pool of
+# worker processes; bigger sweeps are refused
+SWEEP_WORKERS = int(os.getenv('SWEEP_WORKERS', str(os.cpu_count() or 1)))
+MAX_SWEEP_COMBINATIONS = int(os.getenv('MAX_SWEEP_COMBINATIONS', '20000'))
+sweep_pool = SweepPool(SWEEP_WORKERS)
+
+# Imagery requests more than this many degrees across run as background jobs
+# (jobs.py), their tiles fetched by a bounded pool shared by all jobs. A job's
+# units are the tiles of one fixed level no bigger than IMAGERY_JOB_MIN_DEGREES,
+# so a unit costs the same however large the bbox. Past MAX_ACTIVE_IMAGERY_JOBS
+# queued or running jobs, new ones are refused with a 503.
+IMAGERY_JOB_MIN_DEGREES = float(os.getenv('IMAGERY_JOB_MIN_DEGREES', '10'))
+IMAGERY_JOB_TILE_LEVEL = level_for(IMAGERY_JOB_MIN_DEGREES)
+IMAGERY_JOB_WORKERS = int(os.getenv('IMAGERY_JOB_WORKERS', '4'))
+MAX_IMAGERY_JOBS = int(os.getenv('MAX_IMAGERY_JOBS', '1000'))
+MAX_ACTIVE_IMAGERY_JOBS = int(os.getenv('MAX_ACTIVE_IMAGERY_JOBS', '32'))
+IMAGERY_JOB_RETRY_AFTER_SECONDS = 30
+job_runner = JobRunner(IMAGERY_JOB_WORKERS, MAX_IMAGERY_JOBS, MAX_ACTIVE_IMAGERY_JOBS)
+
+# Cells sampled per region tile when the grid has no statistics pyramid
+REGION_TILE_MAX_CELLS = 2048 * 2048 // MAX_TILES_PER_SIDE ** 2
+
+
+async def region_statistics(grid: DEMGrid, bbox: "BoundingBox", tiles: List[RegionTile]) -> Dict[str, Any]:
+    """
+    Elevation statistics over the cells a bbox overlaps (as DEMGrid.summarize),
+    totalled tile by tile. Tiles inside the bbox are totalled whole and shared
+    with overlapping requests; edge tiles are clipped to the bbox, and cells
+    straddling the covering tiles' edge are totalled on their own.
+    """
+    try:
+        cells = grid.window_cells(bbox.south, bbox.west, bbox.north, bbox.east)
+    except ValueError:
+        # Off the grid: nothing to total
+        statistics = Totals().stats()
+        statistics["bounds"] = None
+        return statistics
+
+    async def part_totals(key: Any, part: tuple) -> Totals:
+        def compute():
+            # Off the event loop: cold blocks and cells page in from disk
+            return asyncio.to_thread(grid.totals, *part, REGION_TILE_MAX_CELLS)
+
+        if key is None:
+            return await compute()
+        return await region_totals.get(key, compute)
+
+    parts = []
+    for tile in tiles:
+        tile_cells = grid.cell_range(*tile.bounds)
+        clipped = clip_cells(tile_cells, cells)
+        key = (grid.data_path, tile) if clipped == tile_cells else (grid.data_path, tile, clipped)
+        parts.append(part_totals(key, clipped))
+    covered = clip_cells(grid.cell_range(*covering_bounds(tiles)), cells)
+    hole = covered if covered[0] < covered[1] and covered[2] < covered[3] else None
+    parts.extend(part_totals(None, strip) for strip in frame(cells, hole))
+
+    totals = Totals()
+    for part in await asyncio.gather(*parts):
+        totals.merge(part)
+    statistics = totals.stats()
+    row0, row1, col0, col1 = cells
+    statistics["bounds"] = {
+        "south": grid.north - row1 * grid.cell_size, "west": grid.west + col0 * grid.cell_size,
+        "north": grid.north - row0 * grid.cell_size, "east": grid.west + col1 * grid.cell_size
+    }
+    return statistics
+
+
+def region_tiles(bbox: "BoundingBox", level: Optional[int] = None) -> List[RegionTile]:
+    """
+    Canonical tiles covering a request's bbox (all of one level when given);
+    400 for a bbox that runs east to west
+    """
+    try:
+        if level is not None:
+            return decompose_at(level, bbox.south, bbox.west, bbox.north, bbox.east)
+        return decompose(bbox.south, bbox.west, bbox.north, bbox.east)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 # ============================================================================
 # Data Models
@@ -81,6 +242,9 @@ class ImagerySource(str, Enum):
     AUTO = "auto"
 
 
+TileStyle = Enum("TileStyle", {style.upper(): style for style in STYLES}, type=str)
+
+
 class DEMSource(str, Enum):
     """Available Digital Elevation Model sources"""
     SRTM = "srtm"
@@ -131,17 +295,57 @@ class TopographyResponse(BaseModel):
     bathymetry_url: Optional[str] = None
     bbox: BoundingBox
     visualization_url: Optional[str] = None
+    statistics: Optional[Dict[str, Any]] = Field(
+        None, description="Elevation statistics from the local grid, over the cells the bbox overlaps (see bounds)"
+    )
+    tile_url_template: Optional[str] = Field(None, description="XYZ tile URL ({z}/{x}/{y}) for map clients")
 
 
-class ConstellationOverlayRequest(BaseModel):
+class TerrainObservation(BaseModel):
+    """Where stars are observed from, and the terrain they are aligned with"""
+    observation_location: Dict[str, float] = Field(..., description="Latitude and longitude")
+    bbox: Optional[BoundingBox] = Field(None, description="Terrain to align with; defaults to around the observation location")
+    terrain_radius_degrees: float = Field(
+        default=1.0, gt=0, le=10, description="Half-width of the default terrain around the observation location"
+    )
+    
+    @validator('observation_location')
+    def validate_location(cls, location):
+        if "latitude" not in location or "longitude" not in location:
+            raise ValueError('Observation location needs latitude and longitude')
+        if not -90 <= location["latitude"] <= 90 or not -180 <= location["longitude"] <= 180:
+            raise ValueError('Observation location is out of range')
+        return location
+    
+    def terrain_bbox(self) -> BoundingBox:
+        if self.bbox is not None:
+            return self.bbox
+        latitude, longitude = self.observation_location["latitude"], self.observation_location["longitude"]
+        radius = self.terrain_radius_degrees
+        return BoundingBox(
+            north=min(latitude + radius, 90.0), south=max(latitude - radius, -90.0),
+            east=min(longitude + radius, 180.0), west=max(longitude - radius, -180.0)
+        )
+
+
+class ConstellationOverlayRequest(TerrainObservation):
     """Request to apply constellation overlay (Bradly Couch methodology)"""
     base_imagery_id: str = Field(..., description="Reference to base imagery or topography")
     constellation: str = Field(..., description="Constellation name (e.g., Draco, Scorpius)")
     observation_date: date = Field(..., description="Date for star positions")
-    observation_location: Dict[str, float] = Field(..., description="Latitude and longitude")
     alignment_algorithm: str = Field(default="auto_align", description="Alignment method")
 
 
+class ConstellationSweepRequest(TerrainObservation):
+    """Request to score many constellations and dates against one terrain"""
+    constellations: Optional[List[str]] = Field(None, description="Constellation names; all catalogued ones by default")
+    observation_dates: List[date] = Field(..., min_length=1, description="Dates for star positions")
+    rotation_step_degrees: Optional[float] = Field(
+        None, ge=1, le=360, description="Score rotation ranges this wide separately; any rotation if unset"
+    )
+    top_k: int = Field(default=10, ge=1, le=100, description="Alignments to keep")
+
+
 class ConstellationOverlayResponse(BaseModel):
     """Response with constellation overlay"""
     overlay_id: str
@@ -182,47 +386,155 @@ async def health_check():
     return HealthResponse()
 
 
-@app.post("/imagery", response_model=ImageryResponse)
-async def get_satellite_imagery(request: ImageryRequest):
+async def fetch_imagery_tile(tile: RegionTile, source: str, request: ImageryRequest) -> Dict[str, Any]:
+    """One region tile of imagery (mock; in production, a query to the satellite provider)"""
+    south, west, north, east = tile.bounds
+    return {
+        "tile": str(tile),
+        "bbox": {"south": south, "west": west, "north": north, "east": east},
+        "url": f"s3://a2a-visual-data/imagery/tiles/{source}/{request.resolution}/{tile}.tiff",
+        "acquisition_date": datetime.utcnow(),
+        "cloud_cover": 0.05,
+    }
+
+
+async def imagery_tile(tile: RegionTile, source: str, request: ImageryRequest) -> Dict[str, Any]:
+    """A tile of imagery, fetched once for all requests with the same parameters"""
+    key = content_id(
+        "imagery-tile", [tile], source=source, resolution=request.resolution, bands=request.bands,
+        temporal_range=request.temporal_range, cloud_cover_max=request.cloud_cover_max
+    )
+    return await imagery_tiles.get(key, lambda: fetch_imagery_tile(tile, source, request))
+
+
+def mosaic_imagery(
+    imagery_id: str, source: str, request: ImageryRequest, tiles: List[RegionTile], results: List[Dict[str, Any]]
+) -> ImageryResponse:
+    """The response for a request, from its tiles' imagery"""
+    south, west, north, east = covering_bounds(tiles)
+    return ImageryResponse(
+        imagery_id=imagery_id,
+        source=source,
+        acquisition_date=max(result["acquisition_date"] for result in results),
+        resolution=request.resolution,
+        bands=request.bands,
+        url=f"s3://a2a-visual-data/imagery/{imagery_id}.tiff",
+        thumbnail_url=f"https://cdn.a2aworld.org/imagery/{imagery_id}_thumb.jpg",
+        cloud_cover=round(sum(result["cloud_cover"] for result in results) / len(results), 4),
+        bbox=BoundingBox(north=north, south=south, east=east, west=west),
+        metadata={
+            "projection": "EPSG:4326",
+            "tiles": [result["tile"] for result in results],
+            "note": "MOCK DATA - Production will connect to real satellite APIs"
+        }
+    )
+
+
+def imagery_request_id(request: ImageryRequest, source: str, tiles: List[RegionTile]) -> str:
+    """Requests covering the same tiles with the same parameters share an id"""
+    return content_id(
+        "imagery", tiles, source=source, resolution=request.resolution, bands=request.bands,
+        temporal_range=request.temporal_range, cloud_cover_max=request.cloud_cover_max
+    )
+
+
+def imagery_job_response(job: Job, http_request: Request, status_code: int = 200) -> JSONResponse:
+    """A job's snapshot, with links to poll and follow it"""
+    content = job.snapshot()
+    content["status_url"] = str(http_request.url_for("get_imagery_job", job_id=job.id))
+    content["events_url"] = str(http_request.url_for("follow_imagery_job", job_id=job.id))
+    return JSONResponse(status_code=status_code, content=jsonable_encoder(content))
+
+
+def submit_imagery_job(request: ImageryRequest, http_request: Request) -> JSONResponse:
+    tiles = region_tiles(request.bbox, IMAGERY_JOB_TILE_LEVEL)
+    source = request.source.value if request.source != ImagerySource.AUTO else "sentinel2"
+    imagery_id = imagery_request_id(request, source, tiles)
+    try:
+        job = job_runner.submit(
+            imagery_id, "imagery", tiles,
+            work=lambda tile: imagery_tile(tile, source, request),
+            assemble=lambda results: mosaic_imagery(imagery_id, source, request, tiles, results)
+        )
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(IMAGERY_JOB_RETRY_AFTER_SECONDS)}
+        )
+    logger.info(f"Imagery job: {imagery_id} - {len(tiles)} tiles, {job.state.value}")
+    return imagery_job_response(job, http_request, status_code=202)
+
+
+@app.post(
+    "/imagery",
+    response_model=ImageryResponse,
+    responses={202: {"description": "Large bounding box: queued as an imagery job (see /imagery/jobs)"}}
+)
+async def get_satellite_imagery(request: ImageryRequest, http_request: Request):
     """
     Retrieve satellite imagery for a geographic region.
     
     This endpoint provides agents with visual data from satellite sources.
     In production, this will connect to Landsat, Sentinel-2, and other data providers.
+    Bounding boxes more than IMAGERY_JOB_MIN_DEGREES across are queued as a
+    job instead (202, as POST /imagery/jobs).
     
     **Vision-First Principle**: Every AI citizen can SEE the Earth.
     """
-    REQUEST_COUNT.labels(endpoint='/imagery').inc()
-    
-    # Validate bounding box
     bbox = request.bbox
-    if abs(bbox.north - bbox.south) > 10 or abs(bbox.east - bbox.west) > 10:
-        logger.warning("Large bounding box requested - may be slow")
+    if bbox.north - bbox.south > IMAGERY_JOB_MIN_DEGREES or bbox.east - bbox.west > IMAGERY_JOB_MIN_DEGREES:
+        return submit_imagery_job(request, http_request)
     
-    # Mock response (in production, this queries real satellite APIs)
-    imagery_id = str(uuid.uuid4())
+    tiles = region_tiles(bbox)
+    source = request.source.value if request.source != ImagerySource.AUTO else "sentinel2"
+    imagery_id = imagery_request_id(request, source, tiles)
     
     logger.info(f"Imagery request: {imagery_id} - Source: {request.source}, Resolution: {request.resolution}")
     
-    return ImageryResponse(
-        imagery_id=imagery_id,
-        source=request.source.value if request.source != ImagerySource.AUTO else "sentinel2",
-        acquisition_date=datetime.utcnow(),
-        resolution=request.resolution,
-        bands=request.bands,
-        url=f"s3://a2a-visual-data/imagery/{imagery_id}.tiff",
-        thumbnail_url=f"https://cdn.a2aworld.org/imagery/{imagery_id}_thumb.jpg",
-        cloud_cover=0.05,
-        bbox=bbox,
-        metadata={
-            "projection": "EPSG:4326",
-            "note": "MOCK DATA - Production will connect to real satellite APIs"
-        }
-    )
+    results = await asyncio.gather(*(imagery_tile(tile, source, request) for tile in tiles))
+    return mosaic_imagery(imagery_id, source, request, tiles, results)
+
+
+@app.post("/imagery/jobs", status_code=202)
+async def create_imagery_job(request: ImageryRequest, http_request: Request):
+    """
+    Queue an imagery request as a background job, fetched tile by tile.
+    
+    Returns the job (status, progress) with its status_url to poll and
+    events_url to follow. Submitting a request identical to a queued or
+    running one returns that job.
+    """
+    return submit_imagery_job(request, http_request)
+
+
+@app.get("/imagery/jobs/{job_id}", name="get_imagery_job")
+async def get_imagery_job(job_id: str, http_request: Request):
+    """An imagery job's status, the tiles fetched so far and, once completed, the mosaic"""
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Imagery job {job_id} not found")
+    return imagery_job_response(job, http_request)
+
+
+@app.get("/imagery/jobs/{job_id}/events", name="follow_imagery_job")
+async def follow_imagery_job(job_id: str):
+    """
+    An imagery job's progress as NDJSON: one "unit" event per fetched tile,
+    then "completed" with the mosaic or "failed" with the error. Events
+    already past are replayed first.
+    """
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Imagery job {job_id} not found")
+    
+    async def events():
+        async for event in job.follow():
+            yield json.dumps(jsonable_encoder(event)) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
 
 @app.post("/topography", response_model=TopographyResponse)
-async def get_topography(request: TopographyRequest):
+async def get_topography(request: TopographyRequest, http_request: Request):
     """
     Retrieve Digital Elevation Model (DEM) and optional bathymetry.
     
@@ -231,23 +543,47 @@ async def get_topography(request: TopographyRequest):
     
     **As Above, So Below**: See the Earth's surface as Bradly Couch did.
     """
-    REQUEST_COUNT.labels(endpoint='/topography').inc()
-    
-    terrain_id = str(uuid.uuid4())
-    
     # Determine source
-    source = request.dem_source.value if request.dem_source != DEMSource.AUTO else "srtm"
+    grid = get_dem_grid()
+    if grid is not None:
+        source = grid.source
+    else:
+        source = request.dem_source.value if request.dem_source != DEMSource.AUTO else "srtm"
+    
+    # Requests covering the same tiles with the same parameters share an id
+    bbox = request.bbox
+    tiles = region_tiles(bbox)
+    terrain_id = content_id(
+        "topography", tiles, source=source, resolution=request.resolution,
+        include_bathymetry=request.include_bathymetry
+    )
     
     logger.info(f"Topography request: {terrain_id} - Source: {source}, Bathymetry: {request.include_bathymetry}")
     
+    elevation_range = {"min": -200, "max": 4500}  # meters (mock, without a local grid)
+    statistics = None
+    tile_url_template = None
+    visualization_url = f"https://cdn.a2aworld.org/topography/{terrain_id}_hillshade.jpg"
+    
+    if grid is not None:
+        statistics = await region_statistics(grid, bbox, tiles)
+        if statistics["valid_cells"]:
+            elevation_range = {"min": statistics["min"], "max": statistics["max"]}
+        visualization_url = str(http_request.url_for("render_topography").include_query_params(
+            north=bbox.north, south=bbox.south, east=bbox.east, west=bbox.west
+        ))
+        tile_url_template = f"{str(http_request.base_url).rstrip('/')}/topography/tiles/relief/{{z}}/{{x}}/{{y}}.png"
+    
     response = TopographyResponse(
         terrain_id=terrain_id,
         source=source,
         resolution=request.resolution,
-        elevation_range={"min": -200, "max": 4500},  # meters
+        elevation_range=elevation_range,
         url=f"s3://a2a-visual-data/topography/{terrain_id}.tiff",
-        bbox=request.bbox,
-        visualization_url=f"https://cdn.a2aworld.org/topography/{terrain_id}_hillshade.jpg"
+        bbox=bbox,
+        visualization_url=visualization_url,
+        statistics=statistics,
+        tile_url_template=tile_url_template
     )
     
     if request.include_bathymetry:
@@ -256,6 +592,132 @@ async def get_topography(request: TopographyRequest):
     return response
 
 
+@app.get("/topography/render.png", name="render_topography")
+async def render_topography(
+    request: Request,
+    north: float = Query(..., ge=-90, le=90),
+    south: float = Query(..., ge=-90, le=90),
+    east: float = Query(..., ge=-180, le=180),
+    west: float = Query(..., ge=-180, le=180),
+    size: int = Query(512, ge=16, le=2048, description="Longest side in pixels")
+):
+    """
+    Grayscale elevation rendering of a bounding box from the local grid.
+    Large boxes are drawn from the statistics pyramid's block means when
+    there is one; renderings are cached per cell range and size.
+    """
+    grid = get_dem_grid()
+    if grid is None:
+        raise HTTPException(status_code=503, detail="No local elevation grid configured (DEM_GRID_PATH)")
+    try:
+        cells = grid.window_cells(south, west, north, east)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def render() -> RenderedTile:
+        png = render_png(grid.read_overview(south, west, north, east, size * size), size)
+        return RenderedTile(png, hashlib.sha256(png).hexdigest()[:16])
+    
+    rendering = await topography_renders.get((grid.data_path, cells, size), lambda: asyncio.to_thread(render))
+    headers = {
+        "ETag": f'"{rendering.etag}"',
+        "Cache-Control": f"public, max-age={TOPOGRAPHY_TILE_MAX_AGE_SECONDS}"
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=rendering.png, media_type="image/png", headers=headers)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names this (strong or weak) ETag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+@app.get("/topography/tiles/{style}/{z}/{x}/{y}.png", name="get_topography_tile")
+async def get_topography_tile(style: TileStyle, z: int, x: int, y: int, request: Request):
+    """
+    An XYZ (Web Mercator) tile rendered from the local grid: hillshade,
+    bathymetry (depths colour-ramped, land grey) or relief (colour-ramped
+    and hillshaded).
+    """
+    renderer = get_tile_renderer()
+    if renderer is None:
+        raise HTTPException(status_code=503, detail="No local elevation grid configured (DEM_GRID_PATH)")
+    try:
+        tile_bounds(z, x, y)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    tile = await renderer.fetch(style.value, z, x, y)
+    headers = {
+        "ETag": f'"{tile.etag}"',
+        "Cache-Control": f"public, max-age={TOPOGRAPHY_TILE_MAX_AGE_SECONDS}"
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=tile.png, media_type="image/png", headers=headers)
+
+
+async def region_features(grid: DEMGrid, tiles: List[RegionTile]) -> TerrainFeatures:
+    """Feature points of the region tiles covering a bbox, shared by overlays of the same terrain"""
+    try:
+        return await terrain_features.get(
+            (grid.data_path, tuple(tiles)),
+            lambda: asyncio.to_thread(extract_features, grid, *covering_bounds(tiles))
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def catalog_constellation(name: str) -> str:
+    """A constellation's catalog name; 404 for one the star catalog lacks"""
+    try:
+        return find_constellation(name)
+    except KeyError:
+        raise HTTPException(
+            status_code=404, detail=f"Constellation '{name}' is not in the star catalog ({', '.join(CONSTELLATIONS)})"
+        )
+
+
+def star_metadata(pattern: SkyPattern) -> List[Dict[str, Any]]:
+    return [
+        {"name": name, "magnitude": float(magnitude), "altitude": round(float(alt), 2), "azimuth": round(float(az), 2)}
+        for name, magnitude, alt, az in zip(pattern.names, pattern.magnitudes, pattern.altitude, pattern.azimuth)
+    ]
+
+
+def alignment_metadata(pattern: SkyPattern, features: TerrainFeatures, alignment) -> Dict[str, Any]:
+    """Where the aligned stars fall, and the features they land on"""
+    latitudes, longitudes = to_lat_lon(features, alignment.placed)
+    stars = star_metadata(pattern)
+    for star, latitude, longitude, match, offset in zip(
+        stars, latitudes, longitudes, alignment.matches, alignment.offsets_km
+    ):
+        star["latitude"], star["longitude"] = round(float(latitude), 5), round(float(longitude), 5)
+        star["offset_km"] = round(float(offset), 3)
+        star["feature"] = None if match < 0 else {
+            "kind": str(features.kind[match]),
+            "latitude": round(float(features.latitude[match]), 5),
+            "longitude": round(float(features.longitude[match]), 5),
+            "elevation": float(features.elevation[match]),
+        }
+    centre_latitude, centre_longitude = to_lat_lon(features, alignment.placed.mean(keepdims=True))
+    return {
+        "stars": stars,
+        "transform": {
+            "radius_km": round(alignment.radius_km, 3),
+            "rotation_degrees": round(alignment.rotation_degrees, 2),
+            "reflected": alignment.reflected,
+            "centre": {"latitude": round(float(centre_latitude[0]), 5), "longitude": round(float(centre_longitude[0]), 5)},
+        },
+        "matched_stars": int((alignment.matches >= 0).sum()),
+        "terrain_features": len(features.points),
+    }
+
+
 @app.post("/constellation-overlay", response_model=ConstellationOverlayResponse)
 async def apply_constellation_overlay(request: ConstellationOverlayRequest):
     """
@@ -265,34 +727,94 @@ async def apply_constellation_overlay(request: ConstellationOverlayRequest):
     overlaying celestial patterns onto Earth's topography to reveal
     hidden correlations between myths, stars, and landscape.
     
+    The stars are placed as seen from the observation location at local
+    midnight on the observation date, then aligned (scale, rotation,
+    mirroring) with the peaks, seamounts and ridges of the terrain in
+    `bbox` from the local elevation grid.
+    
     **The Heart of Geomythology**: Where the heavens meet the Earth.
     """
-    REQUEST_COUNT.labels(endpoint='/constellation-overlay').inc()
-    
+    constellation = catalog_constellation(request.constellation)
     overlay_id = str(uuid.uuid4())
+    latitude, longitude = request.observation_location["latitude"], request.observation_location["longitude"]
+    pattern = sky_pattern(constellation, request.observation_date, latitude, longitude)
+    
+    metadata = {
+        "star_positions": pattern.names,
+        "observation_date": request.observation_date.isoformat(),
+        "observation_time": julian_to_datetime(pattern.julian_date).isoformat(timespec="seconds") + "Z",
+        "observation_location": request.observation_location,
+        "visible_stars": int((pattern.altitude > 0).sum()),
+        "alignment_algorithm": request.alignment_algorithm,
+        "bradly_couch_methodology": True,
+    }
     
-    # Mock alignment score (in production, calculated via shape-matching algorithms)
-    import random
-    alignment_score = round(random.uniform(0.65, 0.95), 2)
+    alignment_score = 0.0
+    grid = get_dem_grid()
+    if grid is None:
+        metadata["stars"] = star_metadata(pattern)
+        metadata["note"] = "No local elevation grid configured (DEM_GRID_PATH); star positions only, no terrain to align with"
+    else:
+        tiles = region_tiles(request.terrain_bbox())
+        features = await region_features(grid, tiles)
+        alignment = await asyncio.to_thread(align, pattern.points, features)
+        alignment_score = alignment.score
+        metadata.update(alignment_metadata(pattern, features, alignment))
+        metadata["terrain_bounds"] = dict(zip(("south", "west", "north", "east"), covering_bounds(tiles)))
     
-    logger.info(f"Constellation overlay: {request.constellation} on {request.base_imagery_id}")
+    logger.info(f"Constellation overlay: {constellation} on {request.base_imagery_id}")
     logger.info(f"Alignment score: {alignment_score}")
     
     return ConstellationOverlayResponse(
         overlay_id=overlay_id,
-        constellation=request.constellation,
+        constellation=constellation,
         alignment_score=alignment_score,
         overlaid_image_url=f"ipfs://Qm{overlay_id[:20]}",
-        metadata={
-            "star_positions": ["α Dra (Thuban)", "β Dra (Rastaban)", "γ Dra (Eltanin)"],
-            "observation_date": request.observation_date.isoformat(),
-            "observation_location": request.observation_location,
-            "bradly_couch_methodology": True,
-            "note": "MOCK DATA - Production will calculate real star positions and correlations"
-        }
+        metadata=metadata
     )
 
 
+@app.post("/constellation-overlay/sweep")
+async def sweep_constellation_overlays(request: ConstellationSweepRequest):
+    """
+    Score every combination of constellations, observation dates and
+    rotation ranges against one terrain, as NDJSON: a "top_k" event with
+    the best alignments so far whenever they change, then "completed"
+    (or "failed").
+    
+    Which constellation fits a region best, and at which epoch: with
+    rotation_step_degrees set, an alignment may only turn the pattern a
+    limited way from how it stood in the sky, so the date matters.
+    """
+    grid = get_dem_grid()
+    if grid is None:
+        raise HTTPException(status_code=503, detail="No local elevation grid configured (DEM_GRID_PATH)")
+    constellations = [catalog_constellation(name) for name in request.constellations or CONSTELLATIONS]
+    combinations = [
+        Combination(constellation, observation_date, rotation)
+        for constellation in dict.fromkeys(constellations)
+        for observation_date in dict.fromkeys(request.observation_dates)
+        for rotation in rotation_ranges(request.rotation_step_degrees)
+    ]
+    if len(combinations) > MAX_SWEEP_COMBINATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep has {len(combinations)} combinations (at most {MAX_SWEEP_COMBINATIONS})"
+        )
+    
+    tiles = region_tiles(request.terrain_bbox())
+    features = await region_features(grid, tiles)
+    terrain = sweep_pool.publish(content_id("terrain-features", tiles, grid=grid.data_path), features)
+    latitude, longitude = request.observation_location["latitude"], request.observation_location["longitude"]
+    logger.info(f"🔭 Constellation sweep: {len(combinations)} combinations against {len(features.points)} terrain features")
+    
+    async def events():
+        async for event in sweep_pool.sweep(terrain, latitude, longitude, combinations, request.top_k):
+            yield json.dumps(jsonable_encoder(event)) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @app.get("/datasets", response_model=List[Dict[str, Any]])
 async def list_available_datasets(
     dataset_type: Optional[str] = Query(None, description="Filter by type (imagery, topography, bathymetry)"),
@@ -305,8 +827,6 @@ async def list_available_datasets(
     Browse the library of satellite imagery, topographic data, and other
     visual resources available to AI citizens.
     """
-    REQUEST_COUNT.labels(endpoint='/datasets').inc()
-    
     # Mock dataset listing
     datasets = [
         {
@@ -343,6 +863,21 @@ async def list_available_datasets(
     return datasets[:limit]
 
 
+@app.get("/cache/status")
+async def cache_status():
+    """Hit, miss and coalescing counters of the region, feature and rendered tile caches"""
+    renderer = get_tile_renderer()
+    return {
+        "region_totals": region_totals.stats(),
+        "imagery_tiles": imagery_tiles.stats(),
+        "imagery_jobs": job_runner.stats(),
+        "terrain_features": terrain_features.stats(),
+        "constellation_sweeps": sweep_pool.stats(),
+        "topography_tiles": renderer.stats() if renderer is not None else None,
+        "topography_renders": topography_renders.stats()
+    }
+
+
 @app.get("/metrics")
 async def metrics():
     """Prometheus metrics endpoint"""
@@ -371,6 +906,8 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("🛑 Visual Cortex API shutting down...")
+    await job_runner.close()
+    sweep_pool.close()
 
 
 # ============================================================================
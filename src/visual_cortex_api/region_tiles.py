@@ -0,0 +1,165 @@
+"""
+A2A-World Visual Cortex - Canonical Region Tiles
+Tile-aligned decomposition of bboxes, content-addressed ids and
+single-flight caching for /imagery and /topography.
+
+Agents exploring a region send overlapping bboxes whose edges differ by a
+little. Each bbox is covered by tiles from a fixed quadtree (level k tiles
+are 180/2^k degrees square, rows counted from 90°N and columns from
+180°W), at the finest level that needs at most MAX_TILES_PER_SIDE tiles
+across. Nearby requests then land on the same tiles; work is done per tile
+and cached, and concurrent requests for a tile already being computed
+share that computation instead of repeating it. Response ids are hashes of
+the tiles and request parameters, so a repeat request gets the same id.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, NamedTuple, Tuple
+
+MAX_LEVEL = 10  # 0.18° tiles, about 42 GEBCO cells across
+# More tiles per side hug the bbox closer (the cover overhangs each edge by
+# less than a tile) at the cost of more tiles per request
+MAX_TILES_PER_SIDE = 8
+
+
+class RegionTile(NamedTuple):
+    level: int
+    row: int
+    col: int
+
+    @property
+    def size(self) -> float:
+        return 180 / 2 ** self.level
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """(south, west, north, east)"""
+        north = 90 - self.row * self.size
+        west = -180 + self.col * self.size
+        return north - self.size, west, north, west + self.size
+
+    def __str__(self) -> str:
+        return f"{self.level}/{self.row}/{self.col}"
+
+
+def _span(low: float, high: float, size: float, count: int) -> Tuple[int, int]:
+    """Indices [first, last) of the size-wide cells covering [low, high], within [0, count)"""
+    first = min(max(math.floor(low / size), 0), count - 1)
+    return first, min(max(math.ceil(high / size), first + 1), count)
+
+
+def _cover(level: int, south: float, west: float, north: float, east: float) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Row and column spans of the level's tiles covering a bbox"""
+    size = 180 / 2 ** level
+    return _span(90 - north, 90 - south, size, 2 ** level), _span(west + 180, east + 180, size, 2 ** (level + 1))
+
+
+def _check_bbox(south: float, west: float, north: float, east: float) -> None:
+    if south >= north or west >= east:
+        raise ValueError("Bounding box must have south < north and west < east (split boxes crossing the antimeridian)")
+
+
+def decompose(south: float, west: float, north: float, east: float) -> List[RegionTile]:
+    """The tiles covering a bbox, row by row, at the finest level with few enough tiles"""
+    _check_bbox(south, west, north, east)
+    for level in range(MAX_LEVEL, -1, -1):
+        (row0, row1), (col0, col1) = _cover(level, south, west, north, east)
+        if max(row1 - row0, col1 - col0) <= MAX_TILES_PER_SIDE or level == 0:
+            return [RegionTile(level, row, col) for row in range(row0, row1) for col in range(col0, col1)]
+    raise AssertionError("unreachable")
+
+
+def level_for(max_degrees: float) -> int:
+    """The coarsest level whose tiles are at most max_degrees across (MAX_LEVEL at finest)"""
+    level = 0
+    while 180 / 2 ** level > max_degrees and level < MAX_LEVEL:
+        level += 1
+    return level
+
+
+def decompose_at(level: int, south: float, west: float, north: float, east: float) -> List[RegionTile]:
+    """
+    The tiles of one level covering a bbox, row by row, however many that
+    takes: for background jobs, whose units should stay the same size
+    however large the bbox
+    """
+    _check_bbox(south, west, north, east)
+    (row0, row1), (col0, col1) = _cover(level, south, west, north, east)
+    return [RegionTile(level, row, col) for row in range(row0, row1) for col in range(col0, col1)]
+
+
+def covering_bounds(tiles: List[RegionTile]) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of the area a decomposition covers"""
+    bounds = [tile.bounds for tile in tiles]
+    return (
+        min(b[0] for b in bounds), min(b[1] for b in bounds),
+        max(b[2] for b in bounds), max(b[3] for b in bounds)
+    )
+
+
+def content_id(kind: str, tiles: List[RegionTile], **params: Any) -> str:
+    """A stable id for a request: the same tiles and parameters always give the same id"""
+    canonical = json.dumps(
+        {"kind": kind, "tiles": [str(tile) for tile in tiles], **params}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+class SingleFlightCache:
+    """
+    An LRU of computed results where concurrent misses for the same key
+    share one computation. Failures are not cached: every waiter sees the
+    exception and the next request tries again.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._results: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        if key in self._results:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return self._results[key]
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._compute(key, compute))
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+        # Shielded: a caller that goes away does not cancel the others' result
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await compute()
+        finally:
+            del self._in_flight[key]
+        self._results[key] = result
+        if len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "entries": len(self._results),
+            "in_flight": len(self._in_flight),
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,239 @@
+"""
+A2A-World Visual Cortex - Sky Positions
+Where a constellation's stars stand for an observer on a given date, and
+the pattern they make as seen from the ground.
+
+Positions start from J2000 coordinates of each constellation's principal
+stars, are precessed to the observation date (IAU 1976 angles, good to a
+fraction of a degree over a few thousand years) and converted to altitude
+and azimuth at local midnight. The pattern is the stars' gnomonic
+projection about the constellation's centre, oriented as the observer sees
+it: x to the right, y towards the zenith.
+"""
+
+import math
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+# Principal stars: (name, RA degrees, Dec degrees, visual magnitude), J2000
+CONSTELLATIONS: Dict[str, List[Tuple[str, float, float, float]]] = {
+    "Andromeda": [
+        ("α And (Alpheratz)", 2.10, 29.09, 2.06), ("β And (Mirach)", 17.43, 35.62, 2.05),
+        ("γ And (Almach)", 30.97, 42.33, 2.17), ("δ And", 9.83, 30.86, 3.27),
+        ("μ And", 14.19, 38.50, 3.87), ("π And", 9.22, 33.72, 4.34),
+    ],
+    "Aquarius": [
+        ("β Aqr (Sadalsuud)", 322.89, -5.57, 2.87), ("α Aqr (Sadalmelik)", 331.45, -0.32, 2.95),
+        ("δ Aqr (Skat)", 343.66, -15.82, 3.27), ("γ Aqr (Sadachbia)", 335.41, -1.39, 3.84),
+        ("ζ Aqr", 337.21, -0.02, 3.65), ("η Aqr", 338.84, -0.12, 4.02),
+        ("λ Aqr", 343.15, -7.58, 3.74), ("ε Aqr (Albali)", 311.92, -9.50, 3.77),
+    ],
+    "Aries": [
+        ("α Ari (Hamal)", 31.79, 23.46, 2.00), ("β Ari (Sheratan)", 28.66, 20.81, 2.64),
+        ("γ Ari (Mesarthim)", 28.38, 19.29, 3.90), ("41 Ari (Bharani)", 42.50, 27.26, 3.63),
+    ],
+    "Cancer": [
+        ("α Cnc (Acubens)", 134.62, 11.86, 4.25), ("β Cnc (Tarf)", 124.13, 9.19, 3.52),
+        ("γ Cnc (Asellus Borealis)", 130.82, 21.47, 4.66), ("δ Cnc (Asellus Australis)", 131.17, 18.15, 3.94),
+        ("ι Cnc", 131.67, 28.76, 4.02),
+    ],
+    "Cassiopeia": [
+        ("α Cas (Schedar)", 10.13, 56.54, 2.24), ("β Cas (Caph)", 2.29, 59.15, 2.28),
+        ("γ Cas", 14.18, 60.72, 2.47), ("δ Cas (Ruchbah)", 21.45, 60.24, 2.68),
+        ("ε Cas (Segin)", 28.60, 63.67, 3.37),
+    ],
+    "Crux": [
+        ("α Cru (Acrux)", 186.65, -63.10, 0.77), ("β Cru (Mimosa)", 191.93, -59.69, 1.25),
+        ("γ Cru (Gacrux)", 187.79, -57.11, 1.64), ("δ Cru (Imai)", 183.79, -58.75, 2.79),
+        ("ε Cru", 185.34, -60.40, 3.59),
+    ],
+    "Cygnus": [
+        ("α Cyg (Deneb)", 310.36, 45.28, 1.25), ("β Cyg (Albireo)", 292.68, 27.96, 3.08),
+        ("γ Cyg (Sadr)", 305.56, 40.26, 2.23), ("δ Cyg", 296.24, 45.13, 2.87),
+        ("ε Cyg (Aljanah)", 311.55, 33.97, 2.48),
+    ],
+    "Draco": [
+        ("α Dra (Thuban)", 211.10, 64.38, 3.65), ("β Dra (Rastaban)", 262.61, 52.30, 2.79),
+        ("γ Dra (Eltanin)", 269.15, 51.49, 2.24), ("δ Dra (Altais)", 288.14, 67.66, 3.07),
+        ("ζ Dra (Aldhibah)", 257.20, 65.71, 3.17), ("η Dra", 246.00, 61.51, 2.73),
+        ("ι Dra (Edasich)", 231.23, 58.97, 3.29), ("ξ Dra (Grumium)", 268.38, 56.87, 3.75),
+        ("λ Dra (Giausar)", 172.85, 69.33, 3.84),
+    ],
+    "Gemini": [
+        ("α Gem (Castor)", 113.65, 31.89, 1.58), ("β Gem (Pollux)", 116.33, 28.03, 1.14),
+        ("γ Gem (Alhena)", 99.43, 16.40, 1.92), ("δ Gem (Wasat)", 110.03, 21.98, 3.53),
+        ("ε Gem (Mebsuta)", 100.98, 25.13, 2.98), ("ζ Gem (Mekbuda)", 106.03, 20.57, 3.93),
+        ("η Gem (Propus)", 93.72, 22.51, 3.28), ("μ Gem (Tejat)", 95.74, 22.51, 2.87),
+    ],
+    "Leo": [
+        ("α Leo (Regulus)", 152.09, 11.97, 1.35), ("β Leo (Denebola)", 177.26, 14.57, 2.11),
+        ("γ Leo (Algieba)", 154.99, 19.84, 2.08), ("δ Leo (Zosma)", 168.53, 20.52, 2.56),
+        ("θ Leo (Chertan)", 168.56, 15.43, 3.33), ("ε Leo (Ras Elased)", 146.46, 23.77, 2.98),
+        ("ζ Leo (Adhafera)", 154.17, 23.42, 3.44), ("η Leo", 151.83, 16.76, 3.48),
+        ("μ Leo (Rasalas)", 148.19, 26.01, 3.88),
+    ],
+    "Lyra": [
+        ("α Lyr (Vega)", 279.23, 38.78, 0.03), ("β Lyr (Sheliak)", 282.52, 33.36, 3.52),
+        ("γ Lyr (Sulafat)", 284.74, 32.69, 3.25), ("δ2 Lyr", 283.63, 36.90, 4.30),
+        ("ζ1 Lyr", 281.19, 37.61, 4.36),
+    ],
+    "Orion": [
+        ("α Ori (Betelgeuse)", 88.79, 7.41, 0.50), ("β Ori (Rigel)", 78.63, -8.20, 0.13),
+        ("γ Ori (Bellatrix)", 81.28, 6.35, 1.64), ("δ Ori (Mintaka)", 83.00, -0.30, 2.23),
+        ("ε Ori (Alnilam)", 84.05, -1.20, 1.69), ("ζ Ori (Alnitak)", 85.19, -1.94, 1.77),
+        ("κ Ori (Saiph)", 86.94, -9.67, 2.09),
+    ],
+    "Pegasus": [
+        ("α Peg (Markab)", 346.19, 15.21, 2.48), ("β Peg (Scheat)", 345.94, 28.08, 2.42),
+        ("γ Peg (Algenib)", 3.31, 15.18, 2.83), ("ε Peg (Enif)", 326.05, 9.88, 2.39),
+        ("ζ Peg (Homam)", 340.37, 10.83, 3.40), ("η Peg (Matar)", 340.75, 30.22, 2.94),
+    ],
+    "Perseus": [
+        ("α Per (Mirfak)", 51.08, 49.86, 1.79), ("β Per (Algol)", 47.04, 40.96, 2.10),
+        ("ζ Per", 58.53, 31.88, 2.85), ("ε Per", 59.46, 40.01, 2.89),
+        ("γ Per", 46.20, 53.51, 2.93), ("δ Per", 55.73, 47.79, 3.01),
+    ],
+    "Sagittarius": [
+        ("ε Sgr (Kaus Australis)", 276.04, -34.38, 1.85), ("σ Sgr (Nunki)", 283.82, -26.30, 2.05),
+        ("ζ Sgr (Ascella)", 285.65, -29.88, 2.60), ("δ Sgr (Kaus Media)", 275.25, -29.83, 2.70),
+        ("λ Sgr (Kaus Borealis)", 277.00, -25.42, 2.81), ("γ2 Sgr (Alnasl)", 271.45, -30.42, 2.99),
+        ("φ Sgr", 281.41, -26.99, 3.17), ("τ Sgr", 286.74, -27.67, 3.32),
+    ],
+    "Scorpius": [
+        ("α Sco (Antares)", 247.35, -26.43, 1.06), ("β Sco (Acrab)", 241.36, -19.81, 2.62),
+        ("δ Sco (Dschubba)", 240.08, -22.62, 2.29), ("π Sco", 239.71, -26.11, 2.89),
+        ("σ Sco", 245.30, -25.59, 2.89), ("τ Sco", 248.97, -28.22, 2.82),
+        ("ε Sco (Larawag)", 252.54, -34.29, 2.29), ("μ1 Sco", 252.97, -38.05, 3.00),
+        ("ζ2 Sco", 253.65, -42.36, 3.62), ("η Sco", 258.04, -43.24, 3.33),
+        ("θ Sco (Sargas)", 264.33, -43.00, 1.86), ("ι1 Sco", 266.90, -40.13, 2.99),
+        ("κ Sco", 265.62, -39.03, 2.39), ("λ Sco (Shaula)", 263.40, -37.10, 1.62),
+        ("υ Sco (Lesath)", 262.69, -37.30, 2.70),
+    ],
+    "Taurus": [
+        ("α Tau (Aldebaran)", 68.98, 16.51, 0.85), ("β Tau (Elnath)", 81.57, 28.61, 1.65),
+        ("η Tau (Alcyone)", 56.87, 24.11, 2.87), ("ζ Tau", 84.41, 21.14, 3.00),
+        ("θ2 Tau", 67.17, 15.87, 3.40), ("γ Tau", 64.95, 15.63, 3.65),
+        ("ε Tau (Ain)", 67.15, 19.18, 3.53), ("δ1 Tau", 65.73, 17.54, 3.76),
+    ],
+    "Ursa Major": [
+        ("α UMa (Dubhe)", 165.93, 61.75, 1.79), ("β UMa (Merak)", 165.46, 56.38, 2.37),
+        ("γ UMa (Phecda)", 178.46, 53.69, 2.44), ("δ UMa (Megrez)", 183.86, 57.03, 3.31),
+        ("ε UMa (Alioth)", 193.51, 55.96, 1.77), ("ζ UMa (Mizar)", 200.98, 54.93, 2.27),
+        ("η UMa (Alkaid)", 206.89, 49.31, 1.86),
+    ],
+    "Ursa Minor": [
+        ("α UMi (Polaris)", 37.95, 89.26, 1.98), ("β UMi (Kochab)", 222.68, 74.16, 2.08),
+        ("γ UMi (Pherkad)", 230.18, 71.83, 3.05), ("δ UMi (Yildun)", 263.05, 86.59, 4.35),
+        ("ε UMi", 251.49, 82.04, 4.21), ("ζ UMi", 236.01, 77.79, 4.32),
+        ("η UMi", 244.38, 75.76, 4.95),
+    ],
+}
+
+J2000_JD = 2451545.0
+
+
+class SkyPattern(NamedTuple):
+    """A constellation as seen by an observer"""
+    names: List[str]
+    magnitudes: np.ndarray
+    altitude: np.ndarray  # degrees
+    azimuth: np.ndarray  # degrees east of north
+    points: np.ndarray  # (n, 2) gnomonic x (right), y (towards zenith)
+    julian_date: float
+
+
+def find_constellation(name: str) -> str:
+    """The catalog's name for a constellation, matched case-insensitively; KeyError if absent"""
+    for known in CONSTELLATIONS:
+        if known.lower() == name.strip().lower():
+            return known
+    raise KeyError(name)
+
+
+def local_midnight_jd(day: date, longitude: float) -> float:
+    """Julian date of local mean midnight at the end of a (proleptic Gregorian) date"""
+    # date.toordinal() is 1 for 0001-01-01, whose 0h UT is JD 1721425.5
+    return day.toordinal() + 1721424.5 + 1 - longitude / 360
+
+
+def julian_to_datetime(julian_date: float) -> datetime:
+    """UTC datetime of a Julian date (from 0001-01-01)"""
+    return datetime(1, 1, 1) + timedelta(days=julian_date - 1721425.5)
+
+
+def _rotation(axis: int, angle: float) -> np.ndarray:
+    """The frame rotation R1/R2/R3(angle) about axis 0/1/2"""
+    c, s = math.cos(angle), math.sin(angle)
+    i, j = (axis + 1) % 3, (axis + 2) % 3
+    matrix = np.eye(3)
+    matrix[i, i], matrix[i, j], matrix[j, i], matrix[j, j] = c, s, -s, c
+    return matrix
+
+
+def precess(ra: np.ndarray, dec: np.ndarray, julian_date: float) -> Tuple[np.ndarray, np.ndarray]:
+    """J2000 RA/Dec (degrees) precessed to the equator and equinox of a date"""
+    t = (julian_date - J2000_JD) / 36525
+    arcsec = math.pi / (180 * 3600)
+    zeta = (2306.2181 * t + 0.30188 * t ** 2 + 0.017998 * t ** 3) * arcsec
+    z = (2306.2181 * t + 1.09468 * t ** 2 + 0.018203 * t ** 3) * arcsec
+    theta = (2004.3109 * t - 0.42665 * t ** 2 - 0.041833 * t ** 3) * arcsec
+    matrix = _rotation(2, -z) @ _rotation(1, theta) @ _rotation(2, -zeta)
+
+    ra_r, dec_r = np.radians(ra), np.radians(dec)
+    vectors = np.stack([np.cos(dec_r) * np.cos(ra_r), np.cos(dec_r) * np.sin(ra_r), np.sin(dec_r)])
+    x, y, z_ = matrix @ vectors
+    return np.degrees(np.arctan2(y, x)) % 360, np.degrees(np.arcsin(np.clip(z_, -1, 1)))
+
+
+def horizontal(
+    ra: np.ndarray, dec: np.ndarray, julian_date: float, latitude: float, longitude: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Altitude and azimuth (degrees, azimuth east of north) of RA/Dec for an observer"""
+    gmst = 280.46061837 + 360.98564736629 * (julian_date - J2000_JD)
+    hour_angle = np.radians((gmst + longitude - ra) % 360)
+    phi, delta = math.radians(latitude), np.radians(dec)
+    altitude = np.arcsin(
+        math.sin(phi) * np.sin(delta) + math.cos(phi) * np.cos(delta) * np.cos(hour_angle)
+    )
+    azimuth = np.arctan2(
+        -np.sin(hour_angle) * np.cos(delta),
+        math.cos(phi) * np.sin(delta) - math.sin(phi) * np.cos(delta) * np.cos(hour_angle)
+    )
+    return np.degrees(altitude), np.degrees(azimuth) % 360
+
+
+def gnomonic(altitude: np.ndarray, azimuth: np.ndarray) -> np.ndarray:
+    """(n, 2) tangent-plane coordinates about the points' mean direction, y towards the zenith"""
+    alt, az = np.radians(altitude), np.radians(azimuth)
+    # East, north, up
+    vectors = np.stack([np.cos(alt) * np.sin(az), np.cos(alt) * np.cos(az), np.sin(alt)], axis=1)
+    centre = vectors.mean(axis=0)
+    centre /= np.linalg.norm(centre)
+    zenith = np.array([0.0, 0.0, 1.0])
+    # Up on the sky; due north for a pattern at the zenith
+    up = zenith - centre * (zenith @ centre)
+    if np.linalg.norm(up) < 1e-9:
+        up = np.array([0.0, 1.0, 0.0])
+    up /= np.linalg.norm(up)
+    right = np.cross(centre, up)
+    projected = vectors / (vectors @ centre)[:, None]
+    return np.stack([projected @ right, projected @ up], axis=1)
+
+
+def sky_pattern(constellation: str, day: date, latitude: float, longitude: float) -> SkyPattern:
+    """A constellation's stars for an observer at local midnight on a date"""
+    stars = CONSTELLATIONS[find_constellation(constellation)]
+    ra = np.array([star[1] for star in stars])
+    dec = np.array([star[2] for star in stars])
+    julian_date = local_midnight_jd(day, longitude)
+    altitude, azimuth = horizontal(*precess(ra, dec, julian_date), julian_date, latitude, longitude)
+    return SkyPattern(
+        names=[star[0] for star in stars],
+        magnitudes=np.array([star[3] for star in stars]),
+        altitude=altitude,
+        azimuth=azimuth,
+        points=gnomonic(altitude, azimuth),
+        julian_date=julian_date
+    )
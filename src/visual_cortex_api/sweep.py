@@ -0,0 +1,248 @@
+"""
+A2A-World Visual Cortex - Constellation Sweeps
+Scores a grid of constellations x observation dates x rotation ranges
+against one region's terrain on a pool of worker processes, keeping the
+best alignments as they come in.
+
+A region's feature points (alignment.py) are written once to a .npy file
+that workers memory-map read-only, so they share one copy however many
+batches they score, and keep open for the sweeps that follow. Batches of
+combinations are scored as workers free up, with no more batches of one
+sweep submitted than there are workers, so sweeps running side by side
+take turns on the pool; the caller sees the running top k each time it
+changes.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from alignment import TerrainFeatures, align, to_lat_lon
+from sky import sky_pattern
+
+logger = logging.getLogger(__name__)
+
+# Combinations scored per task sent to a worker
+SWEEP_BATCH = 16
+
+# Published feature files kept, and feature files each worker keeps open
+MAX_TERRAINS = 256
+WORKER_TERRAINS = 8
+
+FEATURE_DTYPE = np.dtype([
+    ("point", "<c16"), ("latitude", "<f8"), ("longitude", "<f8"),
+    ("elevation", "<f4"), ("relief", "<f4"), ("kind", "<U8")
+])
+
+
+class Terrain(NamedTuple):
+    """A published feature file and the frame its points are in"""
+    path: str
+    centre: Tuple[float, float]
+    span_km: float
+
+
+class Combination(NamedTuple):
+    constellation: str
+    observation_date: date
+    rotation: Optional[Tuple[float, float]]  # (centre, half-width) degrees; None for any rotation
+
+
+def rotation_ranges(step: Optional[float]) -> List[Optional[Tuple[float, float]]]:
+    """Ranges centred every `step` degrees around the circle; a single unlimited range without a step"""
+    if step is None:
+        return [None]
+    return [(i * step, step / 2) for i in range(math.ceil(360 / step))]
+
+
+# ============================================================================
+# Worker processes
+# ============================================================================
+
+_opened: "OrderedDict[str, TerrainFeatures]" = OrderedDict()
+
+
+def _open(terrain: Terrain) -> TerrainFeatures:
+    """A published region's features, mapped on first use by this worker"""
+    features = _opened.get(terrain.path)
+    if features is None:
+        table = np.load(terrain.path, mmap_mode="r")
+        features = TerrainFeatures(
+            latitude=table["latitude"], longitude=table["longitude"], elevation=table["elevation"],
+            relief=table["relief"], kind=table["kind"], points=table["point"],
+            centre=terrain.centre, span_km=terrain.span_km
+        )
+        _opened[terrain.path] = features
+        while len(_opened) > WORKER_TERRAINS:
+            _opened.popitem(last=False)
+    _opened.move_to_end(terrain.path)
+    return features
+
+
+def score_batch(
+    terrain: Terrain, latitude: float, longitude: float, combinations: List[Combination]
+) -> List[Dict[str, Any]]:
+    """Align each combination with a region's features (runs in a worker process)"""
+    features = _open(terrain)
+    patterns = {}
+    results = []
+    for combination in combinations:
+        key = (combination.constellation, combination.observation_date)
+        if key not in patterns:
+            patterns[key] = sky_pattern(*key, latitude, longitude)
+        pattern = patterns[key]
+        alignment = align(pattern.points, features, combination.rotation)
+        centre_latitude, centre_longitude = to_lat_lon(features, alignment.placed.mean(keepdims=True))
+        results.append({
+            "constellation": combination.constellation,
+            "observation_date": combination.observation_date.isoformat(),
+            "rotation_range": None if combination.rotation is None else list(combination.rotation),
+            "alignment_score": alignment.score,
+            "rotation_degrees": round(alignment.rotation_degrees, 2),
+            "reflected": alignment.reflected,
+            "radius_km": round(alignment.radius_km, 3),
+            "centre": {"latitude": round(float(centre_latitude[0]), 5), "longitude": round(float(centre_longitude[0]), 5)},
+            "matched_stars": int((alignment.matches >= 0).sum()),
+            "visible_stars": int((pattern.altitude > 0).sum()),
+        })
+    return results
+
+
+# ============================================================================
+# Pool
+# ============================================================================
+
+class SweepPool:
+    """
+    A pool of `workers` processes for sweeps, started on first use, and the
+    directory of feature files published to them.
+    """
+
+    def __init__(self, workers: int, max_terrains: int = MAX_TERRAINS):
+        self.workers = workers
+        self.max_terrains = max_terrains
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._directory: Optional[str] = None
+        self._published: "OrderedDict[str, Terrain]" = OrderedDict()
+        self.sweeps = 0
+        self.combinations = 0
+
+    def publish(self, key: str, features: TerrainFeatures) -> Terrain:
+        """Write a region's features for the workers, once per key"""
+        terrain = self._published.get(key)
+        if terrain is not None:
+            self._published.move_to_end(key)
+            return terrain
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="a2a-sweep-")
+
+        table = np.empty(len(features.points), FEATURE_DTYPE)
+        table["point"], table["latitude"], table["longitude"] = features.points, features.latitude, features.longitude
+        table["elevation"], table["relief"], table["kind"] = features.elevation, features.relief, features.kind
+        path = os.path.join(self._directory, f"{key}.npy")
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, table)
+        os.replace(path + ".tmp", path)
+
+        terrain = Terrain(path, tuple(features.centre), features.span_km)
+        self._published[key] = terrain
+        while len(self._published) > self.max_terrains:
+            # Workers that still map an evicted file keep their copy
+            _, evicted = self._published.popitem(last=False)
+            os.remove(evicted.path)
+        return terrain
+
+    async def sweep(
+        self,
+        terrain: Terrain,
+        latitude: float,
+        longitude: float,
+        combinations: List[Combination],
+        top_k: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Score every combination, yielding a "top_k" event whenever the best
+        top_k change and "completed" (or "failed") at the end. Batches not
+        yet submitted are never sent if the caller stops listening.
+        """
+        if self._executor is None:
+            # Spawned, not forked: the server process has threads running
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self.sweeps += 1
+        self.combinations += len(combinations)
+
+        loop = asyncio.get_running_loop()
+        batches = (combinations[start:start + SWEEP_BATCH] for start in range(0, len(combinations), SWEEP_BATCH))
+        pending: Set[asyncio.Future] = set()
+
+        def submit() -> None:
+            # One batch per worker: the executor's queue holds no more of this sweep than it can start
+            for batch in itertools.islice(batches, self.workers - len(pending)):
+                pending.add(loop.run_in_executor(self._executor, score_batch, terrain, latitude, longitude, batch))
+
+        # Min-heap of (score, -arrival, result): the weakest of the best on top
+        best: List[Tuple[float, int, Dict[str, Any]]] = []
+        evaluated = 0
+
+        def ranked() -> List[Dict[str, Any]]:
+            return [result for _, _, result in sorted(best, reverse=True)]
+
+        try:
+            submit()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending -= done
+                submit()
+                for future in done:
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        logger.warning(f"⚠️ Constellation sweep failed: {e}")
+                        yield {"event": "failed", "error": str(e) or type(e).__name__}
+                        return
+                    changed = False
+                    for result in results:
+                        entry = (result["alignment_score"], -evaluated, result)
+                        evaluated += 1
+                        if len(best) < top_k:
+                            heapq.heappush(best, entry)
+                            changed = True
+                        elif entry[:2] > best[0][:2]:
+                            heapq.heapreplace(best, entry)
+                            changed = True
+                    if changed:
+                        yield {"event": "top_k", "evaluated": evaluated, "total": len(combinations), "top": ranked()}
+            yield {"event": "completed", "evaluated": evaluated, "total": len(combinations), "top": ranked()}
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        """Stop the workers and remove published features (on shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+            self._published.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "sweeps": self.sweeps,
+            "combinations": self.combinations,
+            "terrains": len(self._published),
+        }
@@ -0,0 +1,161 @@
+"""
+Visual Cortex API - Constellation Alignment Tests
+Star positions, terrain features, the similarity search and the
+/constellation-overlay endpoint
+"""
+
+import math
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from alignment import align, extract_features
+from dem import DEMGrid, write_grid
+from sky import find_constellation, local_midnight_jd, precess, sky_pattern
+
+CELL = 0.01
+
+
+def normalised(points):
+    z = points[:, 0] + 1j * points[:, 1]
+    z = z - z.mean()
+    return z / np.sqrt((np.abs(z) ** 2).mean())
+
+
+def hills_grid(tmp_path, placed, distractors=20, seed=1):
+    """A 2°x2° grid around (6°S, 105°E) with hills at `placed` (degrees from the centre) and elsewhere"""
+    n = 200
+    latitude = -5.0 - (np.arange(n) + 0.5) * CELL
+    longitude = 104.0 + (np.arange(n) + 0.5) * CELL
+    lon, lat = np.meshgrid(longitude - 105.0, latitude + 6.0)
+    rng = np.random.default_rng(seed)
+    hills = list(placed) + list(rng.uniform(-0.95, 0.95, distractors) + 1j * rng.uniform(-0.95, 0.95, distractors))
+    elevations = rng.normal(0, 5, (n, n))
+    for hill in hills:
+        elevations += 700 * np.exp(-((lon - hill.real) ** 2 + (lat - hill.imag) ** 2) / (2 * 0.03 ** 2))
+    elevations = elevations.astype(np.int16)
+    path = str(tmp_path / "hills")
+    write_grid(path, n, n, lambda row0, row1: elevations[row0:row1], west=104.0, north=-5.0, cell_size=CELL)
+    return DEMGrid(path)
+
+
+def test_polaris_stands_at_the_observers_latitude():
+    pattern = sky_pattern("Ursa Minor", date(2025, 1, 1), 40.0, -75.0)
+
+    assert pattern.names[0].startswith("α UMi")
+    assert pattern.altitude[0] == pytest.approx(40.0, abs=1.0)
+
+
+def test_precession_brings_thuban_to_the_pole():
+    around_2800_bc = local_midnight_jd(date(1, 1, 1), 0.0) - 2800 * 365.25
+
+    _, dec = precess(np.array([211.10]), np.array([64.38]), around_2800_bc)
+
+    assert dec[0] > 89.5
+
+
+def test_constellation_names_match_case_insensitively():
+    assert find_constellation(" ursa major") == "Ursa Major"
+    with pytest.raises(KeyError):
+        find_constellation("Atlantis")
+
+
+def test_a_planted_pattern_is_found_mirrored_and_rotated(tmp_path):
+    pattern = sky_pattern("Orion", date(2025, 1, 1), -6.0, 105.0)
+    placed = 0.4 * np.exp(1j * math.radians(30)) * normalised(pattern.points).conj()
+    grid = hills_grid(tmp_path, placed)
+
+    features = extract_features(grid, -7.0, 104.0, -5.0, 106.0)
+    alignment = align(pattern.points, features)
+
+    assert set(features.kind) <= {"peak", "ridge"}  # no seamounts on land
+    assert alignment.score > 0.95
+    assert alignment.reflected
+    assert alignment.rotation_degrees == pytest.approx(30.0, abs=2.0)
+    assert (alignment.matches >= 0).all()
+    assert len(set(alignment.matches)) == len(placed)
+
+
+def test_rotation_can_be_limited(tmp_path):
+    pattern = sky_pattern("Orion", date(2025, 1, 1), -6.0, 105.0)
+    grid = hills_grid(tmp_path, 0.4 * np.exp(1j * math.radians(30)) * normalised(pattern.points))
+    features = extract_features(grid, -7.0, 104.0, -5.0, 106.0)
+
+    around = align(pattern.points, features, rotation=(45.0, 30.0))
+    opposite = align(pattern.points, features, rotation=(210.0, 30.0))
+
+    assert around.score > 0.95 and around.rotation_degrees == pytest.approx(30.0, abs=2.0)
+    assert opposite.score < around.score - 0.2
+    assert abs(opposite.rotation_degrees % 360 - 210.0) <= 30.0 + 1e-6
+
+
+def test_unrelated_patterns_score_lower(tmp_path):
+    orion = sky_pattern("Orion", date(2025, 1, 1), -6.0, 105.0)
+    grid = hills_grid(tmp_path, 0.4 * normalised(orion.points))
+    features = extract_features(grid, -7.0, 104.0, -5.0, 106.0)
+
+    planted = align(orion.points, features).score
+    for constellation in ("Scorpius", "Leo", "Cassiopeia"):
+        assert align(sky_pattern(constellation, date(2025, 1, 1), -6.0, 105.0).points, features).score < planted - 0.2
+
+
+def test_flat_terrain_has_nothing_to_align_with(tmp_path):
+    elevations = np.full((50, 50), 100, dtype=np.int16)
+    path = str(tmp_path / "flat")
+    write_grid(path, 50, 50, lambda row0, row1: elevations[row0:row1], west=0.0, north=1.0, cell_size=0.02)
+
+    features = extract_features(DEMGrid(path), 0.0, 0.0, 1.0, 1.0)
+
+    assert len(features.points) == 0
+    assert align(sky_pattern("Leo", date(2025, 1, 1), 0.0, 0.0).points, features).score == 0.0
+
+
+OVERLAY = {
+    "base_imagery_id": "test_imagery_123",
+    "constellation": "orion",
+    "observation_date": "2025-01-01",
+    "observation_location": {"latitude": -6.0, "longitude": 105.0},
+}
+
+
+def test_overlay_aligns_with_the_local_grid(tmp_path, monkeypatch):
+    pattern = sky_pattern("Orion", date(2025, 1, 1), -6.0, 105.0)
+    monkeypatch.setattr(main, "dem_grid", hills_grid(tmp_path, 0.4 * normalised(pattern.points)))
+    client = TestClient(main.app)
+
+    response = client.post("/constellation-overlay", json=OVERLAY)
+    misses = main.terrain_features.misses
+    again = client.post("/constellation-overlay", json=OVERLAY)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["constellation"] == "Orion"
+    assert data["alignment_score"] > 0.95
+    assert data["metadata"]["matched_stars"] == len(pattern.names)
+    assert all(star["feature"] is not None for star in data["metadata"]["stars"])
+    assert data["metadata"]["observation_time"] == "2025-01-01T17:00:00Z"
+    assert again.json()["alignment_score"] == data["alignment_score"]
+    assert main.terrain_features.misses == misses
+
+
+def test_overlay_without_a_grid_reports_star_positions_only(monkeypatch):
+    monkeypatch.setattr(main, "dem_grid", None)
+    monkeypatch.setattr(main, "DEM_GRID_PATH", None)
+
+    data = TestClient(main.app).post("/constellation-overlay", json=OVERLAY).json()
+
+    assert data["alignment_score"] == 0.0
+    assert len(data["metadata"]["stars"]) == len(data["metadata"]["star_positions"]) == 7
+    assert "DEM_GRID_PATH" in data["metadata"]["note"]
+
+
+def test_overlay_rejects_unknown_constellations_and_locations():
+    client = TestClient(main.app)
+
+    assert client.post("/constellation-overlay", json={**OVERLAY, "constellation": "Atlantis"}).status_code == 404
+    assert client.post(
+        "/constellation-overlay", json={**OVERLAY, "observation_location": {"latitude": -6.0}}
+    ).status_code == 422
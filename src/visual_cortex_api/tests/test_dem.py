@@ -0,0 +1,226 @@
+"""
+Visual Cortex API - Local Elevation Grid Tests
+Tiled grid round trips, window reads and the /topography integration
+"""
+
+import os
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from dem import DEMGrid, build_pyramid, write_grid
+
+
+def build_grid(tmp_path, elevations, tile_size=4, nodata=-32768):
+    """A 1°-per-cell grid whose top-left corner is (10°N, 20°E)"""
+    height, width = elevations.shape
+    path = str(tmp_path / "grid")
+    write_grid(
+        path, height, width, lambda row0, row1: elevations[row0:row1],
+        west=20.0, north=10.0, cell_size=1.0, tile_size=tile_size, nodata=nodata
+    )
+    return DEMGrid(path)
+
+
+@pytest.fixture
+def elevations():
+    # Odd sizes, so the last tile row and column are padded
+    return (np.arange(11 * 13, dtype=np.int16).reshape(11, 13) - 40)
+
+
+def test_window_matches_source_cells(tmp_path, elevations):
+    grid = build_grid(tmp_path, elevations)
+
+    window = grid.read_window(south=2.0, west=23.0, north=7.0, east=32.0)
+
+    np.testing.assert_array_equal(window.data, elevations[3:8, 3:12].astype(np.float32))
+    assert window.stride == 1
+    assert window.bounds == (2.0, 23.0, 7.0, 32.0)
+
+
+def test_window_is_clipped_to_the_grid(tmp_path, elevations):
+    grid = build_grid(tmp_path, elevations)
+
+    window = grid.read_window(south=-50.0, west=0.0, north=50.0, east=100.0)
+
+    np.testing.assert_array_equal(window.data, elevations.astype(np.float32))
+    with pytest.raises(ValueError):
+        grid.read_window(south=40.0, west=0.0, north=50.0, east=10.0)
+
+
+def test_large_windows_are_sampled(tmp_path, elevations):
+    grid = build_grid(tmp_path, elevations)
+
+    window = grid.read_window(south=-1.0, west=20.0, north=10.0, east=33.0, max_cells=20)
+
+    assert window.stride == 3
+    np.testing.assert_array_equal(window.data, elevations[::3, ::3].astype(np.float32))
+
+
+def test_stats_skip_nodata(tmp_path, elevations):
+    elevations[0, :] = -32768
+    grid = build_grid(tmp_path, elevations)
+
+    stats = grid.stats(grid.read_window(south=-1.0, west=20.0, north=10.0, east=33.0))
+
+    valid = elevations[1:].astype(np.float64)
+    assert stats["min"] == valid.min()
+    assert stats["max"] == valid.max()
+    assert stats["mean"] == round(valid.mean(), 2)
+    assert stats["valid_cells"] == valid.size
+    assert stats["ocean_fraction"] == round((valid < 0).mean(), 4)
+
+
+def brute_force_stats(cells):
+    valid = cells[cells != -32768].astype(np.float64)
+    return {
+        "min": valid.min(), "max": valid.max(), "mean": pytest.approx(valid.mean(), abs=0.006),
+        "valid_cells": valid.size, "ocean_fraction": round((valid < 0).mean(), 4), "stride": 1,
+    }
+
+
+def test_pyramid_stats_match_a_full_scan(tmp_path):
+    rng = np.random.default_rng(7)
+    elevations = rng.integers(-6000, 5000, size=(45, 61)).astype(np.int16)
+    elevations[rng.random(elevations.shape) < 0.1] = -32768
+    grid = build_grid(tmp_path, elevations, tile_size=8)
+    build_pyramid(grid, base_block=2)
+
+    assert grid.pyramid.block_sizes == [2, 4, 8, 16, 32, 64]
+    for _ in range(200):
+        row0, row1 = sorted(rng.choice(46, size=2, replace=False))
+        col0, col1 = sorted(rng.choice(62, size=2, replace=False))
+        stats = grid.summarize(south=10.0 - row1, west=20.0 + col0, north=10.0 - row0, east=20.0 + col1)
+        assert stats == brute_force_stats(elevations[row0:row1, col0:col1])
+
+
+def test_pyramid_reports_empty_boxes(tmp_path, elevations):
+    elevations[:8, :8] = -32768
+    grid = build_grid(tmp_path, elevations)
+    build_pyramid(grid, base_block=2)
+
+    stats = grid.summarize(south=2.0, west=20.0, north=10.0, east=28.0)
+
+    assert stats["valid_cells"] == 0 and stats["min"] is None
+
+
+def test_rewriting_a_grid_drops_its_pyramid(tmp_path, elevations):
+    grid = build_grid(tmp_path, elevations)
+    build_pyramid(grid, base_block=2)
+    assert DEMGrid(str(tmp_path / "grid")).pyramid is not None
+
+    assert build_grid(tmp_path, elevations).pyramid is None
+    assert not os.path.exists(tmp_path / "grid.pyramid")
+
+
+def overlapped_cells(grid, elevations, bbox):
+    row0, row1, col0, col1 = grid.window_cells(bbox["south"], bbox["west"], bbox["north"], bbox["east"])
+    return elevations[row0:row1, col0:col1]
+
+
+def test_topography_uses_the_local_grid(tmp_path, elevations, monkeypatch):
+    grid = build_grid(tmp_path, elevations)
+    monkeypatch.setattr(main, "dem_grid", grid)
+    client = TestClient(main.app)
+    bbox = {"north": 7.0, "south": 2.5, "east": 31.5, "west": 23.0}
+
+    response = client.post("/topography", json={"bbox": bbox})
+
+    assert response.status_code == 200
+    data = response.json()
+    # Statistics cover the cells the bbox overlaps, not the region tiles around it
+    assert data["statistics"]["bounds"] == {"south": 2.0, "west": 23.0, "north": 7.0, "east": 32.0}
+    cells = overlapped_cells(grid, elevations, bbox)
+    assert data["elevation_range"] == {"min": float(cells.min()), "max": float(cells.max())}
+    assert data["statistics"]["valid_cells"] == cells.size
+    assert "/topography/render.png?" in data["visualization_url"]
+
+
+def test_topography_statistics_are_exact_with_a_pyramid(tmp_path, elevations, monkeypatch):
+    grid = build_grid(tmp_path, elevations)
+    build_pyramid(grid, base_block=2)
+    monkeypatch.setattr(main, "dem_grid", grid)
+    client = TestClient(main.app)
+    bbox = {"north": 9.0, "south": -1.0, "east": 32.0, "west": 21.0}
+
+    response = client.post("/topography", json={"bbox": bbox})
+
+    assert response.status_code == 200
+    statistics = response.json()["statistics"]
+    statistics.pop("bounds")
+    assert statistics == brute_force_stats(overlapped_cells(grid, elevations, bbox))
+
+
+def test_topography_statistics_match_summarize_off_the_tile_lines(tmp_path, monkeypatch):
+    # 0.37° cells never line up with region tile edges, so edge tiles are
+    # clipped and some cells straddle the edge of the covering tiles
+    elevations = (np.arange(120 * 150, dtype=np.int16).reshape(120, 150) * 37) % 3000 - 500
+    path = str(tmp_path / "unaligned")
+    write_grid(path, 120, 150, lambda row0, row1: elevations[row0:row1], west=-30.0, north=40.0, cell_size=0.37)
+    grid = DEMGrid(path)
+    build_pyramid(grid, base_block=4)
+    monkeypatch.setattr(main, "dem_grid", grid)
+    client = TestClient(main.app)
+    rng = np.random.default_rng(3)
+    # Boxes on tile edges, and random ones
+    bboxes = [(0.0, 0.0, 22.5, 22.5), (-2.8125, -11.25, 11.25, 5.625), (5.625, -22.5, 33.75, 0.0)]
+    for _ in range(20):
+        (south, north), (west, east) = np.sort(rng.uniform(-5.0, 40.0, 2)), np.sort(rng.uniform(-30.0, 26.0, 2))
+        bboxes.append((south, west, north, east))
+
+    for south, west, north, east in bboxes:
+        bbox = {"south": south, "west": west, "north": north, "east": east}
+
+        statistics = client.post("/topography", json={"bbox": bbox}).json()["statistics"]
+
+        statistics.pop("bounds")
+        assert statistics == pytest.approx(grid.summarize(south, west, north, east), abs=0.006)
+        assert statistics == brute_force_stats(overlapped_cells(grid, elevations, bbox))
+
+
+def test_render_topography_png(tmp_path, elevations, monkeypatch):
+    pytest.importorskip("PIL")
+    monkeypatch.setattr(main, "dem_grid", build_grid(tmp_path, elevations))
+    client = TestClient(main.app)
+
+    response = client.get("/topography/render.png?north=7&south=2&east=32&west=23&size=64")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content.startswith(b"\x89PNG")
+
+
+def test_render_topography_is_cached_with_an_etag(tmp_path, elevations, monkeypatch):
+    pytest.importorskip("PIL")
+    monkeypatch.setattr(main, "dem_grid", build_grid(tmp_path, elevations))
+    monkeypatch.setattr(main, "topography_renders", main.SingleFlightCache(8))
+    client = TestClient(main.app)
+    url = "/topography/render.png?north=7&south=2&east=32&west=23&size=64"
+
+    first = client.get(url)
+    # A bbox inside the same cells shares the rendering
+    again = client.get("/topography/render.png?north=6.9&south=2.1&east=31.5&west=23.2&size=64")
+    revalidated = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+
+    assert again.content == first.content and again.headers["etag"] == first.headers["etag"]
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert main.topography_renders.stats()["misses"] == 1
+
+
+def test_coarse_overviews_come_from_the_pyramid(tmp_path, elevations):
+    grid = build_grid(tmp_path, elevations)
+    build_pyramid(grid, base_block=2)
+
+    # 11 x 13 cells in at most 40: a stride of 2, one base block per value
+    overview = grid.read_overview(south=-1.0, west=20.0, north=10.0, east=33.0, max_cells=40)
+
+    assert overview.stride == 2
+    assert overview.data.shape == (6, 7)
+    padded = np.full((12, 14), np.nan)
+    padded[:11, :13] = elevations
+    np.testing.assert_allclose(overview.data, np.nanmean(padded.reshape(6, 2, 7, 2), axis=(1, 3)), rtol=1e-6)
+    assert overview.bounds == (-2.0, 20.0, 10.0, 34.0)
+    # Fine strides still read the cells themselves
+    assert grid.read_overview(south=2.0, west=23.0, north=7.0, east=32.0).stride == 1
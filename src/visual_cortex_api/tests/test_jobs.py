@@ -0,0 +1,194 @@
+"""
+Visual Cortex API - Background Job Tests
+The bounded job runner, event streams, and large-bbox imagery jobs
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from jobs import Job, JobQueueFull, JobRunner, JobState
+
+LARGE_BBOX = {"north": 20.0, "south": 0.0, "east": 30.0, "west": 10.0}
+
+
+def test_units_run_on_a_bounded_pool():
+    running, peak = 0, 0
+
+    async def work(unit):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * (5 - unit))
+        running -= 1
+        return unit * 10
+
+    async def scenario():
+        runner = JobRunner(workers=2)
+        job = runner.submit("job", "test", [1, 2, 3, 4], work, assemble=lambda results: results)
+        events = [event async for event in job.follow()]
+        return job, events
+
+    job, events = asyncio.run(scenario())
+    assert peak == 2
+    assert job.state == JobState.COMPLETED
+    assert job.result == [10, 20, 30, 40]  # assembled in unit order
+    assert [e["units_done"] for e in events[:-1]] == [1, 2, 3, 4]
+    assert events[-1] == {"event": "completed", "result": [10, 20, 30, 40]}
+
+
+def test_resubmitting_joins_the_running_job():
+    async def work(unit):
+        await asyncio.sleep(0.01)
+        return unit
+
+    async def scenario():
+        runner = JobRunner()
+        first = runner.submit("same", "test", [1, 2], work, assemble=sum)
+        again = runner.submit("same", "test", [1, 2], work, assemble=sum)
+        await first.task
+        return runner, first, again
+
+    runner, first, again = asyncio.run(scenario())
+    assert first is again and first.result == 3
+    assert runner.stats()["submitted"] == 1 and runner.stats()["joined"] == 1
+
+
+def test_failed_jobs_report_and_can_be_retried():
+    attempts = []
+
+    async def work(unit):
+        attempts.append(unit)
+        if len(attempts) == 1:
+            raise RuntimeError("provider unavailable")
+        return unit
+
+    async def scenario():
+        runner = JobRunner(workers=1)
+        failed = runner.submit("job", "test", [1], work, assemble=sum)
+        events = [event async for event in failed.follow()]
+        retried = runner.submit("job", "test", [1], work, assemble=sum)
+        await retried.task
+        return failed, events, retried
+
+    failed, events, retried = asyncio.run(scenario())
+    assert failed.state == JobState.FAILED and failed.error == "provider unavailable"
+    assert events == [{"event": "failed", "error": "provider unavailable"}]
+    assert retried is not failed and retried.state == JobState.COMPLETED
+
+
+def test_finished_jobs_are_pruned():
+    async def work(unit):
+        return unit
+
+    async def scenario():
+        runner = JobRunner(max_jobs=2)
+        for i in range(3):
+            await runner.submit(f"job-{i}", "test", [i], work, assemble=sum).task
+        runner.submit("job-3", "test", [3], work, assemble=sum)
+        return runner
+
+    runner = asyncio.run(scenario())
+    assert runner.get("job-0") is None and runner.get("job-1") is None
+    assert runner.get("job-2") is not None and runner.get("job-3") is not None
+
+
+def test_unfinished_jobs_are_capped():
+    """Past max_active queued or running jobs, new ones are refused but identical ones still join"""
+    release = None
+
+    async def work(unit):
+        await release.wait()
+        return unit
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        runner = JobRunner(max_active=2)
+        first = runner.submit("job-0", "test", [0], work, assemble=sum)
+        runner.submit("job-1", "test", [1], work, assemble=sum)
+        with pytest.raises(JobQueueFull):
+            runner.submit("job-2", "test", [2], work, assemble=sum)
+        assert runner.submit("job-0", "test", [0], work, assemble=sum) is first
+        release.set()
+        await first.task
+        runner.submit("job-2", "test", [2], work, assemble=sum)
+        await asyncio.gather(*(runner.get(f"job-{i}").task for i in range(1, 3)))
+        return runner
+
+    stats = asyncio.run(scenario()).stats()
+    assert stats["rejected"] == 1 and stats["joined"] == 1 and stats["completed"] == 3
+
+
+@pytest.fixture
+def job_runner(monkeypatch):
+    runner = JobRunner(workers=2)
+    monkeypatch.setattr(main, "job_runner", runner)
+    return runner
+
+
+def test_large_imagery_requests_become_jobs(job_runner):
+    with TestClient(main.app) as client:
+        response = client.post("/imagery", json={"bbox": LARGE_BBOX})
+        assert response.status_code == 202
+        job = response.json()
+        assert job["units_total"] == len(main.region_tiles(main.BoundingBox(**LARGE_BBOX), main.IMAGERY_JOB_TILE_LEVEL))
+
+        deadline = time.monotonic() + 5
+        while job["status"] != "completed" and time.monotonic() < deadline:
+            time.sleep(0.01)
+            job = client.get(job["status_url"]).json()
+
+        assert job["status"] == "completed"
+        assert job["units_done"] == job["units_total"] == len(job["partial_results"])
+        mosaic = job["result"]
+        assert mosaic["imagery_id"] == job["job_id"]
+        assert mosaic["bbox"]["north"] >= 20.0 and mosaic["bbox"]["west"] <= 10.0
+
+        events = [json.loads(line) for line in client.get(job["events_url"]).text.splitlines()]
+        assert [e["event"] for e in events] == ["unit"] * job["units_total"] + ["completed"]
+
+
+def test_imagery_job_units_stay_small_however_large_the_bbox(job_runner):
+    """A whole-world job is split into more units, not bigger ones"""
+    world_bbox = {"north": 90.0, "south": -90.0, "east": 180.0, "west": -180.0}
+    with TestClient(main.app) as client:
+        world = client.post("/imagery/jobs", json={"bbox": world_bbox}).json()
+        large = client.post("/imagery/jobs", json={"bbox": LARGE_BBOX}).json()
+
+    tiles = main.region_tiles(main.BoundingBox(**world_bbox), main.IMAGERY_JOB_TILE_LEVEL)
+    assert world["units_total"] == len(tiles) > large["units_total"]
+    assert tiles[0].size <= main.IMAGERY_JOB_MIN_DEGREES
+
+
+def test_imagery_jobs_past_the_cap_are_refused(monkeypatch):
+    runner = JobRunner(max_active=1)
+    runner._jobs["busy"] = Job("busy", "imagery", [])  # queued, never started
+    monkeypatch.setattr(main, "job_runner", runner)
+    client = TestClient(main.app)
+
+    response = client.post("/imagery/jobs", json={"bbox": LARGE_BBOX})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(main.IMAGERY_JOB_RETRY_AFTER_SECONDS)
+    assert runner.stats()["rejected"] == 1
+
+
+def test_small_imagery_requests_stay_inline(job_runner):
+    with TestClient(main.app) as client:
+        response = client.post("/imagery", json={"bbox": {"north": 1.0, "south": 0.0, "east": 1.0, "west": 0.0}})
+
+    assert response.status_code == 200
+    assert "imagery_id" in response.json()
+    assert job_runner.stats()["submitted"] == 0
+
+
+def test_unknown_jobs_are_not_found(job_runner):
+    client = TestClient(main.app)
+
+    assert client.get("/imagery/jobs/nope").status_code == 404
+    assert client.get("/imagery/jobs/nope/events").status_code == 404
@@ -242,6 +242,18 @@ def test_metrics_endpoint():
     assert "visual_cortex_requests_total" in response.text
 
 
+def test_metrics_record_every_request_by_route():
+    """Test that requests are counted and timed by route template and status"""
+    client.get("/datasets?limit=1")
+    client.post("/imagery", json={"bbox": {"north": 100.0, "south": -7.0, "east": 106.0, "west": 104.0}})
+    
+    text = client.get("/metrics").text
+    assert 'visual_cortex_requests_total{endpoint="/datasets",method="GET",status="200"}' in text
+    assert 'visual_cortex_request_duration_seconds_count{endpoint="/imagery",method="POST",status="422"}' in text
+    assert 'visual_cortex_response_size_bytes_count{endpoint="/datasets",method="GET",status="200"}' in text
+    assert "visual_cortex_requests_in_flight" in text
+
+
 # ============================================================================
 # Integration Tests
 # ============================================================================
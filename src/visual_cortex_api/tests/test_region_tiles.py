@@ -0,0 +1,157 @@
+"""
+Visual Cortex API - Canonical Region Tile Tests
+Bbox decomposition, content-addressed ids, single-flight caching and their
+use by /imagery and /topography
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from dem import DEMGrid, Totals, write_grid
+from region_tiles import (
+    MAX_TILES_PER_SIDE, SingleFlightCache, content_id, covering_bounds, decompose, decompose_at, level_for
+)
+
+
+def test_decomposition_covers_the_bbox():
+    for south, west, north, east in [(-7.0, 104.0, -5.0, 106.0), (10.1, -3.3, 10.2, -3.25), (-90, -180, 90, 180)]:
+        tiles = decompose(south, west, north, east)
+        c_south, c_west, c_north, c_east = covering_bounds(tiles)
+
+        assert c_south <= south and c_west <= west and c_north >= north and c_east >= east
+        assert len({tile.level for tile in tiles}) == 1
+        assert len(tiles) <= MAX_TILES_PER_SIDE ** 2
+
+
+def test_fixed_level_decomposition_covers_the_bbox_with_small_tiles():
+    level = level_for(10.0)
+    assert 180 / 2 ** level <= 10.0 < 180 / 2 ** (level - 1)
+    for south, west, north, east in [(0.0, 10.0, 20.0, 30.0), (-90, -180, 90, 180)]:
+        tiles = decompose_at(level, south, west, north, east)
+        c_south, c_west, c_north, c_east = covering_bounds(tiles)
+
+        assert c_south <= south and c_west <= west and c_north >= north and c_east >= east
+        assert {tile.level for tile in tiles} == {level}
+    assert len(tiles) == 2 ** level * 2 ** (level + 1)
+    with pytest.raises(ValueError):
+        decompose_at(level, 0.0, 10.0, 1.0, 5.0)
+
+
+def test_nearby_bboxes_share_tiles_and_ids():
+    first = decompose(-7.0, 104.0, -5.0, 106.0)
+    nudged = decompose(-7.02, 104.01, -4.99, 105.98)
+
+    assert first == nudged
+    assert content_id("imagery", first, source="sentinel2") == content_id("imagery", nudged, source="sentinel2")
+    assert content_id("imagery", first, source="sentinel2") != content_id("imagery", first, source="landsat8")
+
+
+def test_decomposition_rejects_inverted_bboxes():
+    with pytest.raises(ValueError):
+        decompose(0.0, 10.0, 1.0, 5.0)
+
+
+def test_single_flight_shares_concurrent_computations():
+    cache = SingleFlightCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        results = await asyncio.gather(*(cache.get("key", compute) for _ in range(10)))
+        return results + [await cache.get("key", compute)]
+
+    assert asyncio.run(scenario()) == ["result"] * 11
+    assert len(calls) == 1
+    assert cache.stats() == {
+        "hits": 1, "misses": 1, "coalesced": 9, "hit_ratio": round(10 / 11, 4),
+        "entries": 1, "in_flight": 0, "max_entries": 100_000,
+    }
+
+
+def test_single_flight_does_not_cache_failures():
+    cache = SingleFlightCache()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def succeed():
+        return "ok"
+
+    async def scenario():
+        results = await asyncio.gather(cache.get("key", fail), cache.get("key", fail), return_exceptions=True)
+        return results, await cache.get("key", succeed)
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert retried == "ok"
+
+
+def test_adjacent_tiles_total_without_double_counting(tmp_path):
+    elevations = np.random.default_rng(3).integers(-500, 500, size=(180, 360)).astype(np.int16)
+    path = str(tmp_path / "world")
+    write_grid(
+        path, 180, 360, lambda row0, row1: elevations[row0:row1],
+        west=-180.0, north=90.0, cell_size=1.0, tile_size=16
+    )
+    grid = DEMGrid(path)
+    tiles = decompose(-33.3, 10.7, -20.1, 31.9)
+
+    totals = Totals()
+    for tile in tiles:
+        totals.merge(grid.totals(*grid.cell_range(*tile.bounds)))
+
+    row0, row1, col0, col1 = grid.cell_range(*covering_bounds(tiles))
+    assert totals.count == (row1 - row0) * (col1 - col0)
+    assert totals.sum == elevations[row0:row1, col0:col1].sum(dtype=np.int64)
+
+
+def test_repeat_imagery_requests_share_an_id_and_response():
+    client = TestClient(main.app)
+    request = {"bbox": {"north": -5.0, "south": -7.0, "east": 106.0, "west": 104.0}}
+    nudged = {"bbox": {"north": -4.99, "south": -7.02, "east": 105.98, "west": 104.01}}
+
+    first = client.post("/imagery", json=request).json()
+    again = client.post("/imagery", json=nudged).json()
+
+    assert first == again
+    assert first["metadata"]["tiles"]
+    assert first["bbox"]["south"] <= -7.02 and first["bbox"]["north"] >= -4.99
+    assert client.post("/imagery", json={**request, "source": "landsat8"}).json()["imagery_id"] != first["imagery_id"]
+
+
+def test_overlapping_topography_requests_reuse_tile_totals(tmp_path, monkeypatch):
+    elevations = np.arange(180 * 360, dtype=np.int16).reshape(180, 360) % 1000
+    path = str(tmp_path / "world")
+    write_grid(path, 180, 360, lambda row0, row1: elevations[row0:row1], west=-180.0, north=90.0, cell_size=1.0)
+    monkeypatch.setattr(main, "dem_grid", DEMGrid(path))
+    client = TestClient(main.app)
+
+    first = client.post("/topography", json={"bbox": {"north": 40.0, "south": 30.0, "east": 20.0, "west": 5.0}})
+    misses = main.region_totals.misses
+    again = client.post("/topography", json={"bbox": {"north": 39.8, "south": 30.2, "east": 19.9, "west": 5.1}})
+
+    assert again.json()["terrain_id"] == first.json()["terrain_id"]
+    assert again.json()["statistics"] == first.json()["statistics"]
+    assert main.region_totals.misses == misses
+
+
+def test_antimeridian_bboxes_are_rejected():
+    # West of east is refused, as the grid's window_cells always did: a
+    # box across the antimeridian has to be requested as its two halves
+    client = TestClient(main.app)
+    bbox = {"north": 1.0, "south": 0.0, "east": -175.0, "west": 175.0}
+
+    for path in ("/topography", "/imagery"):
+        response = client.post(path, json={"bbox": bbox})
+
+        assert response.status_code == 400
+        assert "antimeridian" in response.json()["detail"]
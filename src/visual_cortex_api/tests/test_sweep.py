@@ -0,0 +1,125 @@
+"""
+Visual Cortex API - Constellation Sweep Tests
+Rotation ranges, the shared-terrain worker pool and the
+/constellation-overlay/sweep endpoint
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import sweep
+from sky import sky_pattern
+from sweep import Combination, SweepPool, Terrain, rotation_ranges
+
+from .test_alignment import hills_grid, normalised
+
+
+def test_rotation_ranges_cover_the_circle():
+    assert rotation_ranges(None) == [None]
+    assert rotation_ranges(90) == [(0, 45.0), (90, 45.0), (180, 45.0), (270, 45.0)]
+    assert len(rotation_ranges(7)) == 52
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Threads standing in for worker processes, recording the most batches submitted and unfinished"""
+
+    def __init__(self, workers):
+        super().__init__(workers)
+        self.lock = threading.Lock()
+        self.outstanding = self.peak = 0
+
+    def submit(self, fn, *args):
+        with self.lock:
+            self.outstanding += 1
+            self.peak = max(self.peak, self.outstanding)
+        future = super().submit(fn, *args)
+        future.add_done_callback(lambda _: self.finished())
+        return future
+
+    def finished(self):
+        with self.lock:
+            self.outstanding -= 1
+
+
+def test_sweeps_keep_one_batch_per_worker_outstanding(monkeypatch):
+    def score_batch(terrain, latitude, longitude, combinations):
+        return [{"alignment_score": 0.5, "constellation": c.constellation} for c in combinations]
+
+    monkeypatch.setattr(sweep, "score_batch", score_batch)
+    pool = SweepPool(workers=2)
+    pool._executor = executor = CountingExecutor(2)
+    combinations = [Combination("Orion", date(2025, 1, 1), (i, 0.5)) for i in range(20 * sweep.SWEEP_BATCH)]
+
+    async def run():
+        return [event async for event in pool.sweep(Terrain("unused", (0.0, 0.0), 1.0), 0.0, 0.0, combinations, 3)]
+
+    try:
+        events = asyncio.run(run())
+    finally:
+        pool.close()
+
+    assert events[-1]["event"] == "completed" and events[-1]["evaluated"] == len(combinations)
+    assert executor.peak == 2
+
+
+@pytest.fixture
+def sweep_pool(monkeypatch):
+    pool = SweepPool(workers=2)
+    monkeypatch.setattr(main, "sweep_pool", pool)
+    yield pool
+    pool.close()
+
+
+SWEEP = {
+    "constellations": ["Leo", "Orion", "Scorpius"],
+    "observation_dates": ["2025-01-01", "2025-07-01"],
+    "observation_location": {"latitude": -6.0, "longitude": 105.0},
+    "rotation_step_degrees": 90,
+    "top_k": 3,
+}
+
+
+def test_sweep_streams_the_best_alignments(tmp_path, monkeypatch, sweep_pool):
+    pattern = sky_pattern("Orion", date(2025, 1, 1), -6.0, 105.0)
+    monkeypatch.setattr(main, "dem_grid", hills_grid(tmp_path, 0.4 * normalised(pattern.points)))
+
+    with TestClient(main.app) as client:
+        response = client.post("/constellation-overlay/sweep", json=SWEEP)
+        again = client.post("/constellation-overlay/sweep", json={**SWEEP, "top_k": 1})
+        assert sweep_pool.stats()["terrains"] == 1  # published once, shared by both sweeps
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["event"] for e in events[:-1]] == ["top_k"] * (len(events) - 1)
+    completed = events[-1]
+    assert completed["event"] == "completed"
+    assert completed["evaluated"] == completed["total"] == 3 * 2 * 4
+    top = completed["top"]
+    scores = [result["alignment_score"] for result in top]
+    assert len(top) == 3 and scores == sorted(scores, reverse=True)
+    assert top[0]["constellation"] == "Orion" and scores[0] > 0.95
+    assert top[0]["observation_date"] == "2025-01-01" and top[0]["rotation_range"] == [0, 45.0]
+
+    assert json.loads(again.text.splitlines()[-1])["top"] == top[:1]
+
+
+def test_sweep_rejects_what_it_cannot_score(tmp_path, monkeypatch, sweep_pool):
+    client = TestClient(main.app)
+    monkeypatch.setattr(main, "dem_grid", None)
+    monkeypatch.setattr(main, "DEM_GRID_PATH", None)
+    assert client.post("/constellation-overlay/sweep", json=SWEEP).status_code == 503
+
+    monkeypatch.setattr(main, "dem_grid", hills_grid(tmp_path, []))
+    assert client.post(
+        "/constellation-overlay/sweep", json={**SWEEP, "constellations": ["Orion", "Atlantis"]}
+    ).status_code == 404
+    monkeypatch.setattr(main, "MAX_SWEEP_COMBINATIONS", 23)
+    assert client.post("/constellation-overlay/sweep", json=SWEEP).status_code == 400
+    assert client.post("/constellation-overlay/sweep", json={**SWEEP, "observation_dates": []}).status_code == 422
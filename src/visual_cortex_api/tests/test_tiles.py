@@ -0,0 +1,160 @@
+"""
+Visual Cortex API - Topography Tile Tests
+Tile geometry, hillshading, colour ramps, the rendered-tile cache and the
+tile endpoint
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from dem import DEMGrid, write_grid
+from tiles import (
+    BATHYMETRY_LUT, LAND_GREY, RELIEF_LUT, TileRenderer, colourize, hillshade,
+    render_pixels, sample_tile, tile_bounds
+)
+
+
+@pytest.fixture
+def world(tmp_path):
+    """A global 1° grid whose elevation is the cell's column index minus 180"""
+    elevations = np.tile(np.arange(360, dtype=np.int16) - 180, (180, 1))
+    elevations[:10] = -32768  # no data north of 80°N
+    path = str(tmp_path / "world")
+    write_grid(
+        path, 180, 360, lambda row0, row1: elevations[row0:row1],
+        west=-180.0, north=90.0, cell_size=1.0, tile_size=16
+    )
+    return DEMGrid(path)
+
+
+def test_tile_bounds():
+    south, west, north, east = tile_bounds(0, 0, 0)
+    assert (west, east) == (-180.0, 180.0)
+    assert north == pytest.approx(85.0511, abs=1e-4) and south == -north
+    assert tile_bounds(1, 1, 0)[:2] == (0.0, 0.0)
+    for z, x, y in [(1, 2, 0), (-1, 0, 0), (20, 0, 0)]:
+        with pytest.raises(ValueError):
+            tile_bounds(z, x, y)
+
+
+def test_sample_tile_reads_pixel_centres(world):
+    elevations, pixel_metres = sample_tile(world, 1, 1, 1)
+
+    assert elevations.shape == (258, 258)
+    # Column j of z1/x1 is centred on longitude (j + 0.5) * 180 / 256
+    assert elevations[100, 1] == np.floor(0.5 * 180 / 256)
+    assert elevations[100, 256] == np.floor(255.5 * 180 / 256)
+    # The halo wraps around the antimeridian
+    assert elevations[100, 257] == -180
+    assert pixel_metres[1] == pytest.approx(20037508.34 / 256, rel=1e-3)
+
+
+def test_pixels_without_data_are_transparent(world):
+    pixels = render_pixels(world, "relief", 1, 0, 0)
+
+    assert pixels.shape == (256, 256, 4)
+    assert (pixels[0, :, 3] == 0).all()  # above 80°N
+    assert (pixels[-1, :, 3] == 255).all()
+
+
+def test_hillshade_lights_slopes_facing_the_sun():
+    rising_east = np.tile(np.arange(5.0) * 100, (5, 1))
+    rising_south = rising_east.T
+    pixel_metres = np.full(5, 100.0)
+
+    flat = hillshade(np.zeros((5, 5)), pixel_metres)
+    assert flat.shape == (3, 3)
+    # Default sun in the north-west
+    assert hillshade(rising_east, pixel_metres)[1, 1] > flat[1, 1] > hillshade(-rising_east, pixel_metres)[1, 1]
+    assert hillshade(rising_south, pixel_metres)[1, 1] > flat[1, 1] > hillshade(-rising_south, pixel_metres)[1, 1]
+
+
+def test_colour_ramps():
+    elevations = np.array([-11000, -3000, 0, 2000, 9000, 12000])
+    relief = colourize(elevations)
+
+    assert tuple(relief[0]) == (8, 16, 48)
+    assert tuple(relief[1]) == (32, 96, 168)
+    assert (relief[-2] == relief[-1]).all()  # clamped past the table
+    assert tuple(colourize(elevations, BATHYMETRY_LUT)[3]) == LAND_GREY
+    assert len(RELIEF_LUT) == 20001
+
+
+def test_renderer_caches_tiles(world):
+    pytest.importorskip("PIL")
+    renderer = TileRenderer(world, max_bytes=10 ** 6)
+
+    first = renderer.get("hillshade", 2, 1, 1)
+    again = renderer.get("hillshade", 2, 1, 1)
+    renderer.get("relief", 2, 1, 1)
+
+    assert first == again and first.png.startswith(b"\x89PNG")
+    assert renderer.stats()["hits"] == 1 and renderer.stats()["tiles"] == 2
+
+
+def test_renderer_evicts_least_recently_used(world):
+    pytest.importorskip("PIL")
+    renderer = TileRenderer(world, max_bytes=1)
+
+    renderer.get("relief", 2, 1, 1)
+    renderer.get("relief", 2, 2, 1)
+
+    assert renderer.stats()["tiles"] == 1 and renderer.evictions == 1
+    assert renderer.cached("relief", 2, 2, 1) is not None
+
+
+def test_concurrent_misses_share_one_render(world, monkeypatch):
+    pytest.importorskip("PIL")
+    renderer = TileRenderer(world, max_bytes=10 ** 6)
+    rendered = []
+    render = renderer.render
+    monkeypatch.setattr(renderer, "render", lambda *key: rendered.append(key) or render(*key))
+
+    async def burst():
+        return await asyncio.gather(*(renderer.fetch("relief", 2, 1, 1) for _ in range(8)))
+
+    tiles = asyncio.run(burst())
+
+    assert rendered == [("relief", 2, 1, 1)] and len(set(tiles)) == 1
+    assert renderer.stats()["misses"] == 1 and renderer.stats()["coalesced"] == 7
+    assert asyncio.run(renderer.fetch("relief", 2, 1, 1)) == tiles[0] and renderer.hits == 1
+    assert renderer.stats()["in_flight"] == 0
+
+
+def test_tile_endpoint(world, monkeypatch):
+    pytest.importorskip("PIL")
+    monkeypatch.setattr(main, "dem_grid", world)
+    client = TestClient(main.app)
+
+    response = client.get("/topography/tiles/bathymetry/3/4/3.png")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    etag = response.headers["etag"]
+
+    revalidated = client.get("/topography/tiles/bathymetry/3/4/3.png", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert client.get("/cache/status").json()["topography_tiles"]["hit_ratio"] == 0.5
+
+
+def test_tile_endpoint_errors(world, monkeypatch):
+    client = TestClient(main.app)
+    assert client.get("/topography/tiles/relief/1/0/0.png").status_code == 503
+
+    monkeypatch.setattr(main, "dem_grid", world)
+    assert client.get("/topography/tiles/relief/1/2/0.png").status_code == 404
+    assert client.get("/topography/tiles/sepia/1/0/0.png").status_code == 422
+
+
+def test_topography_links_relief_tiles(world, monkeypatch):
+    monkeypatch.setattr(main, "dem_grid", world)
+    client = TestClient(main.app)
+
+    response = client.post("/topography", json={
+        "bbox": {"north": 10.0, "south": 0.0, "east": 10.0, "west": 0.0}
+    })
+
+    assert response.json()["tile_url_template"] == "http://testserver/topography/tiles/relief/{z}/{x}/{y}.png"
@@ -0,0 +1,242 @@
+"""
+A2A-World Visual Cortex - Topography Tiles
+Hillshade and colour-ramp PNG tiles rendered from the local elevation grid.
+
+Tiles follow the XYZ scheme web maps use (Web Mercator, 256 px, z/x/y), so
+any slippy-map client can display them. Each tile is rendered on its own
+from a (256 + 2)-pixel sample of the grid; the one-pixel halo lets slope
+and aspect use central differences right up to the tile's edge, so
+neighbouring tiles shade seamlessly. Colours come from a lookup table with
+one entry per metre of elevation, built once. Rendered tiles are kept in a
+size-bounded LRU keyed by (source, style, z, x, y); agents working a
+hotspot keep requesting the same few tiles, which are then served from memory,
+and concurrent requests for a tile not yet cached share one render.
+"""
+
+import asyncio
+import hashlib
+import io
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from dem import DEMGrid
+
+TILE_PIXELS = 256
+MAX_ZOOM = 12  # ~38 m pixels at the equator, already finer than GEBCO's 15" cells
+STYLES = ("hillshade", "bathymetry", "relief")
+
+EARTH_RADIUS_M = 6378137.0  # Web Mercator sphere
+SUN_AZIMUTH_DEGREES = 315.0
+SUN_ALTITUDE_DEGREES = 45.0
+
+# Colour ramps as (elevation m, RGB) stops, sampled into the lookup table
+LUT_MIN_M, LUT_MAX_M = -11000, 9000
+OCEAN_STOPS = [
+    (-11000, (8, 16, 48)), (-6000, (16, 48, 112)), (-3000, (32, 96, 168)),
+    (-200, (96, 160, 208)), (0, (168, 212, 236)),
+]
+LAND_STOPS = [
+    (1, (64, 128, 72)), (500, (148, 176, 96)), (1500, (196, 168, 112)),
+    (3000, (140, 100, 72)), (5000, (236, 236, 236)), (9000, (255, 255, 255)),
+]
+LAND_GREY = (208, 208, 200)  # land in the bathymetry style, which only ramps depths
+
+
+def _ramp(stops) -> np.ndarray:
+    elevations = np.arange(LUT_MIN_M, LUT_MAX_M + 1)
+    heights = [h for h, _ in stops]
+    return np.stack([
+        np.interp(elevations, heights, [rgb[channel] for _, rgb in stops]) for channel in range(3)
+    ], axis=1).astype(np.uint8)
+
+
+RELIEF_LUT = _ramp(OCEAN_STOPS + LAND_STOPS)
+BATHYMETRY_LUT = RELIEF_LUT.copy()
+BATHYMETRY_LUT[1 - LUT_MIN_M:] = LAND_GREY
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of an XYZ tile; raises ValueError for tiles that do not exist"""
+    n = 2 ** z
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < n and 0 <= y < n):
+        raise ValueError(f"Tile {z}/{x}/{y} does not exist (zoom 0-{MAX_ZOOM})")
+
+    def latitude(row: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return latitude(y + 1), x / n * 360 - 180, latitude(y), (x + 1) / n * 360 - 180
+
+
+def sample_tile(grid: DEMGrid, z: int, x: int, y: int, halo: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Elevations at the tile's pixel centres plus `halo` pixels around it (NaN
+    off the grid or where nodata), and each pixel row's ground size in metres.
+    """
+    tile_bounds(z, x, y)
+    world_pixels = TILE_PIXELS * 2 ** z
+    offsets = np.arange(-halo, TILE_PIXELS + halo) + 0.5
+    latitudes = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y * TILE_PIXELS + offsets) / world_pixels))))
+    longitudes = ((x * TILE_PIXELS + offsets) / world_pixels * 360) % 360 - 180
+
+    rows = np.floor((grid.north - latitudes) / grid.cell_size).astype(np.int64)
+    cols = np.floor((longitudes - grid.west) / grid.cell_size).astype(np.int64)
+    row_ok = (rows >= 0) & (rows < grid.height)
+    col_ok = (cols >= 0) & (cols < grid.width)
+    elevations = grid.sample(np.clip(rows, 0, grid.height - 1), np.clip(cols, 0, grid.width - 1))
+    elevations[~row_ok, :] = np.nan
+    elevations[:, ~col_ok] = np.nan
+
+    pixel_metres = 2 * math.pi * EARTH_RADIUS_M / world_pixels * np.cos(np.radians(latitudes))
+    return elevations, pixel_metres
+
+
+def hillshade(
+    elevations: np.ndarray,
+    pixel_metres: np.ndarray,
+    azimuth: float = SUN_AZIMUTH_DEGREES,
+    altitude: float = SUN_ALTITUDE_DEGREES
+) -> np.ndarray:
+    """
+    Illumination (0-1) of the cells inside a one-cell halo, from slope and
+    aspect by central differences; cells next to nodata are lit as if flat.
+    """
+    spacing = 2 * pixel_metres[1:-1, None]
+    dz_dx = (elevations[1:-1, 2:] - elevations[1:-1, :-2]) / spacing
+    dz_dy = (elevations[2:, 1:-1] - elevations[:-2, 1:-1]) / spacing  # rows run south
+    slope = np.arctan(np.hypot(dz_dx, dz_dy))
+    aspect = np.arctan2(dz_dy, -dz_dx)
+
+    zenith = math.radians(90 - altitude)
+    sun = math.radians(90 - azimuth)  # compass bearing to the maths angle the aspect uses
+    shade = math.cos(zenith) * np.cos(slope) + math.sin(zenith) * np.sin(slope) * np.cos(sun - aspect)
+    shade = np.where(np.isnan(shade), math.cos(zenith), shade)
+    return np.clip(shade, 0, 1).astype(np.float32)
+
+
+def colourize(elevations: np.ndarray, lut: np.ndarray = RELIEF_LUT) -> np.ndarray:
+    """RGB for each elevation by table lookup (NaN gets the colour of 0 m)"""
+    index = np.nan_to_num(elevations, nan=0.0).astype(np.int64) - LUT_MIN_M
+    return lut[np.clip(index, 0, len(lut) - 1)]
+
+
+def render_pixels(grid: DEMGrid, style: str, z: int, x: int, y: int) -> np.ndarray:
+    """
+    A tile's pixels in a style from STYLES: (256, 256, 2) grey + alpha for
+    hillshade, (256, 256, 4) RGBA otherwise. Nodata and off-grid pixels are transparent.
+    """
+    if style not in STYLES:
+        raise ValueError(f"Unknown tile style '{style}' (expected one of {', '.join(STYLES)})")
+    elevations, pixel_metres = sample_tile(grid, z, x, y)
+    inner = elevations[1:-1, 1:-1]
+    alpha = np.where(np.isnan(inner), 0, 255).astype(np.uint8)
+
+    if style == "hillshade":
+        return np.dstack([(hillshade(elevations, pixel_metres) * 255).astype(np.uint8), alpha])
+    if style == "bathymetry":
+        return np.dstack([colourize(inner, BATHYMETRY_LUT), alpha])
+    shade = 0.4 + 0.6 * hillshade(elevations, pixel_metres)
+    return np.dstack([(colourize(inner) * shade[:, :, None]).astype(np.uint8), alpha])
+
+
+def render_tile(grid: DEMGrid, style: str, z: int, x: int, y: int) -> bytes:
+    """PNG of a tile (see render_pixels)"""
+    from PIL import Image  # Pillow: only needed for renderings
+
+    pixels = render_pixels(grid, style, z, x, y)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, mode="LA" if pixels.shape[2] == 2 else "RGBA").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class RenderedTile(NamedTuple):
+    png: bytes
+    etag: str
+
+
+class TileRenderer:
+    """Renders tiles from a grid through an in-memory LRU bounded by bytes"""
+
+    def __init__(self, grid: DEMGrid, max_bytes: int = 128 * 1024 ** 2):
+        self.grid = grid
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._tiles: "OrderedDict[Tuple[str, str, int, int, int], RenderedTile]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str, int, int, int], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._lock = threading.Lock()  # renders finish on worker threads
+
+    def cached(self, style: str, z: int, x: int, y: int) -> Optional[RenderedTile]:
+        """The cached rendering of a tile, counting the lookup"""
+        key = (self.grid.source, style, z, x, y)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                self.misses += 1
+                return None
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+
+    def render(self, style: str, z: int, x: int, y: int) -> RenderedTile:
+        """Render a tile and cache it (blocking: run off the event loop)"""
+        png = render_tile(self.grid, style, z, x, y)
+        tile = RenderedTile(png, hashlib.sha256(png).hexdigest()[:16])
+        key = (self.grid.source, style, z, x, y)
+        with self._lock:
+            if key not in self._tiles:
+                self._tiles[key] = tile
+                self.total_bytes += len(png)
+                while self.total_bytes > self.max_bytes and len(self._tiles) > 1:
+                    _, evicted = self._tiles.popitem(last=False)
+                    self.total_bytes -= len(evicted.png)
+                    self.evictions += 1
+        return tile
+
+    def get(self, style: str, z: int, x: int, y: int) -> RenderedTile:
+        return self.cached(style, z, x, y) or self.render(style, z, x, y)
+
+    async def fetch(self, style: str, z: int, x: int, y: int) -> RenderedTile:
+        """The cached tile, or a render on a worker thread shared by every concurrent miss"""
+        key = (self.grid.source, style, z, x, y)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._render_once(key))
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+        # Shielded: a client that disconnects does not cancel the others' tile
+        return await asyncio.shield(task)
+
+    async def _render_once(self, key: Tuple[str, str, int, int, int]) -> RenderedTile:
+        try:
+            return await asyncio.to_thread(self.render, *key[1:])
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "in_flight": len(self._in_flight),
+            "evictions": self.evictions,
+            "tiles": len(self._tiles),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }